@@ -6,26 +6,19 @@ Pipeline: WhisperX STT + Diarization → LLM Translation → Translation Summary
 """
 
 import argparse
-import json
+import hashlib
 import os
+import queue
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 from pathlib import Path
 
-import torch
+import orjson
 from dotenv import load_dotenv
 
-# PyTorch >=2.6 defaults weights_only=True in torch.load, but pyannote
-# checkpoints contain omegaconf objects that fail strict unpickling.
-# Force weights_only=False for compatibility.
-_original_torch_load = torch.load
-def _patched_torch_load(*args, **kwargs):
-    kwargs["weights_only"] = False
-    return _original_torch_load(*args, **kwargs)
-torch.load = _patched_torch_load
-
 load_dotenv()
 
 from tools import (
@@ -34,16 +27,34 @@ from tools import (
     translate_segments,
     summarize_translated_segments,
     summarize_translated_segments_detailed,
+    submit_summary_batch,
+    collect_summary_batch,
     synthesize_segments,
     concatenate_audio,
     download_youtube_mp3,
     is_youtube_url,
+    TTSClipCache,
+    file_sha256,
 )
 
 
+def _orjson_default(obj):
+    # numpy scalars from WhisperX alignment (e.g. float32 scores)
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
 def save_intermediate(data: dict, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    Path(path).write_bytes(
+        orjson.dumps(
+            data,
+            default=_orjson_default,
+            option=orjson.OPT_INDENT_2
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    )
 
 
 def save_text(text: str, path: str) -> None:
@@ -53,6 +64,132 @@ def save_text(text: str, path: str) -> None:
         f.write(text.strip() + "\n")
 
 
+def load_reassemble_inputs(work_dir: str) -> tuple[list[dict], list[str]]:
+    """Load segments and synthesized clip paths kept by a previous run."""
+    translation_path = os.path.join(work_dir, "translation.json")
+    if not os.path.isfile(translation_path):
+        raise FileNotFoundError(f"未找到 {translation_path}，请先完整运行一次")
+    segments = orjson.loads(Path(translation_path).read_bytes())["segments"]
+
+    tts_dir = os.path.join(work_dir, "tts_clips")
+    wav_paths = [
+        os.path.join(tts_dir, f"seg_{i:04d}.wav") for i in range(len(segments))
+    ]
+    missing = [path for path in wav_paths if not os.path.isfile(path)]
+    if missing:
+        raise FileNotFoundError(
+            f"缺少 {len(missing)} 个已合成片段（首个: {missing[0]}），请先完整运行一次"
+        )
+    return segments, wav_paths
+
+
+def summary_digest(segments: list[dict], args: argparse.Namespace) -> str:
+    """SHA-256 over the translated segments and the summary model settings."""
+    payload = orjson.dumps(
+        {
+            "provider": args.translation_provider,
+            "model": args.translation_model,
+            "segments": segments,
+        },
+        default=_orjson_default,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def summary_is_cached(path: str, digest: str) -> bool:
+    sha_path = Path(f"{path}.sha")
+    if not os.path.isfile(path) or not sha_path.is_file():
+        return False
+    return sha_path.read_text(encoding="utf-8").strip() == digest
+
+
+def save_summary(text: str, path: str, digest: str) -> None:
+    save_text(text, path)
+    Path(f"{path}.sha").write_text(digest + "\n", encoding="utf-8")
+
+
+def run_summaries(
+    segments: list[dict],
+    args: argparse.Namespace,
+    summary_output_path: str,
+    detailed_summary_output_path: str,
+) -> dict | None:
+    """Run Step 3.5/3.6. Returns a pending Batch API job, or None when done inline.
+
+    Summaries whose ``.sha`` sidecar matches the current segments are kept as-is
+    unless --force-summary is given.
+    """
+    digest = summary_digest(segments, args)
+    want_short = args.summary_mode in {"short", "both"}
+    want_detailed = args.summary_mode in {"detailed", "both"}
+    if not args.force_summary:
+        if want_short and summary_is_cached(summary_output_path, digest):
+            print(f"[Step 3.5] 使用缓存的总结: {summary_output_path}")
+            want_short = False
+        if want_detailed and summary_is_cached(detailed_summary_output_path, digest):
+            print(f"[Step 3.6] 使用缓存的总结: {detailed_summary_output_path}")
+            want_detailed = False
+    if not want_short and not want_detailed:
+        return None
+
+    summary_job = None
+    if args.use_batch_api:
+        if args.translation_provider != "openai":
+            print(
+                "[Step 3.5] 警告: --use-batch-api 仅支持 openai，改为同步生成总结",
+                file=sys.stderr,
+            )
+        else:
+            try:
+                summary_job = submit_summary_batch(
+                    segments,
+                    provider=args.translation_provider,
+                    model=args.translation_model,
+                    summary_mode=(
+                        "both"
+                        if want_short and want_detailed
+                        else ("short" if want_short else "detailed")
+                    ),
+                )
+            except Exception as exc:
+                print(
+                    f"[Step 3.5] 警告: Batch API 提交失败，改为同步生成总结: {exc}",
+                    file=sys.stderr,
+                )
+
+    if summary_job is None and want_short:
+        try:
+            summary_text = summarize_translated_segments(
+                segments,
+                provider=args.translation_provider,
+                model=args.translation_model,
+            )
+            save_summary(summary_text, summary_output_path, digest)
+            print(f"[Step 3.5] 简短总结已写入: {summary_output_path}")
+        except Exception as exc:
+            print(
+                f"[Step 3.5] 警告: 简短总结生成失败，将继续后续流程: {exc}",
+                file=sys.stderr,
+            )
+
+    if summary_job is None and want_detailed:
+        try:
+            detailed_summary_text = summarize_translated_segments_detailed(
+                segments,
+                provider=args.translation_provider,
+                model=args.translation_model,
+            )
+            save_summary(detailed_summary_text, detailed_summary_output_path, digest)
+            print(f"[Step 3.6] 详细总结已写入: {detailed_summary_output_path}")
+        except Exception as exc:
+            print(
+                f"[Step 3.6] 警告: 详细总结生成失败，将继续后续流程: {exc}",
+                file=sys.stderr,
+            )
+    return summary_job
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Babel - 英语播客转中文播客",
@@ -70,6 +207,12 @@ def main() -> None:
         "--whisper-model", default="large-v3",
         help="Whisper 模型大小（默认 large-v3）",
     )
+    parser.add_argument(
+        "--compute-type",
+        default=None,
+        choices=["float16", "int8_float16", "int8", "int8_float32", "float32"],
+        help="WhisperX (CTranslate2) 计算精度（默认 CUDA 为 float16，CPU 为 int8）",
+    )
     parser.add_argument(
         "--translation-provider",
         default="openai",
@@ -90,6 +233,27 @@ def main() -> None:
         choices=["short", "detailed", "both"],
         help="总结模式：short（简短）/ detailed（详细）/ both（两者，默认）",
     )
+    parser.add_argument(
+        "--use-batch-api",
+        action="store_true",
+        help=(
+            "总结通过 OpenAI Batch API 提交（约半价），与第4步语音合成并行，"
+            "合成完成后再等待结果（仅 openai）"
+        ),
+    )
+    parser.add_argument(
+        "--translation-batch-api",
+        action="store_true",
+        help=(
+            "翻译通过 OpenAI Batch API 一次性提交（约半价，最长 24 小时完成），"
+            "适合离线批量处理；第4步会等待全部翻译完成（仅 openai）"
+        ),
+    )
+    parser.add_argument(
+        "--force-summary",
+        action="store_true",
+        help="忽略已有总结的校验缓存，强制重新生成总结",
+    )
     parser.add_argument(
         "--keep-intermediate",
         dest="keep_intermediate",
@@ -131,6 +295,23 @@ def main() -> None:
         "--index-tts-cfg-path", default=None,
         help="IndexTTS2 配置文件路径（默认 <index-tts-model-dir>/config.yaml）",
     )
+    parser.add_argument(
+        "--index-tts-compile",
+        action="store_true",
+        help="用 torch.compile 编译 IndexTTS2 解码器（首批片段较慢，长音频整体更快；需 indextts 支持）",
+    )
+    parser.add_argument(
+        "--tts-batch-size", type=int, default=None, metavar="N",
+        help="每次送入 TTS 模型的同一说话人片段数（默认 8；显存不足时调小）",
+    )
+    parser.add_argument(
+        "--reassemble",
+        action="store_true",
+        help=(
+            "跳过第1-4步，直接用上次保留的 translation.json 和 tts_clips 重新拼接"
+            "（调整停顿参数时使用）"
+        ),
+    )
     concat_group = parser.add_mutually_exclusive_group()
     concat_group.add_argument(
         "--concatenate-without-timestamps",
@@ -156,6 +337,9 @@ def main() -> None:
     if args.download_only and not source_is_youtube:
         print("错误: --download-only 仅支持 YouTube 链接输入", file=sys.stderr)
         sys.exit(1)
+    if args.reassemble and not args.keep_intermediate:
+        print("错误: --reassemble 需要保留的中间文件，不能与 --no-keep-intermediate 同用", file=sys.stderr)
+        sys.exit(1)
     if args.concatenate_fixed_gap_ms is not None and args.concatenate_fixed_gap_ms < 0:
         print("错误: --concatenate-fixed-gap-ms 必须 >= 0", file=sys.stderr)
         sys.exit(1)
@@ -209,72 +393,128 @@ def main() -> None:
         print(f"输出: {output_path}")
         print()
 
-        # Step 1: Transcribe + diarize
-        segments = transcribe(input_path, model_size=args.whisper_model)
-        if args.keep_intermediate:
-            save_intermediate(
-                {"segments": segments},
-                os.path.join(work_dir, "transcription.json"),
+        if args.reassemble:
+            # Reuse translation.json + tts_clips from a previous run; only redo Step 5
+            try:
+                segments, wav_paths = load_reassemble_inputs(work_dir)
+            except FileNotFoundError as exc:
+                print(f"错误: {exc}", file=sys.stderr)
+                sys.exit(1)
+            print(f"[Reassemble] 复用 {len(wav_paths)} 个已合成片段: {work_dir}")
+            print()
+        else:
+            # Step 1: Transcribe + diarize
+            segments = transcribe(
+                input_path,
+                model_size=args.whisper_model,
+                compute_type=args.compute_type,
             )
-        print()
-
-        # Step 2: Extract reference audio per speaker
-        ref_paths = extract_reference_audio(input_path, segments, work_dir)
-        print()
+            if args.keep_intermediate:
+                save_intermediate(
+                    {"segments": segments},
+                    os.path.join(work_dir, "transcription.json"),
+                )
+            print()
 
-        # Step 3: Translate
-        segments = translate_segments(
-            segments,
-            provider=args.translation_provider,
-            model=args.translation_model,
-        )
-        if args.keep_intermediate:
-            save_intermediate(
-                {"segments": segments},
-                os.path.join(work_dir, "translation.json"),
+            # Step 2: Extract reference audio per speaker
+            source_sha256 = file_sha256(input_path) if args.keep_intermediate else None
+            ref_paths = extract_reference_audio(
+                input_path, segments, work_dir, source_sha256=source_sha256
             )
+            print()
 
-        if args.summary_mode in {"short", "both"}:
-            try:
-                summary_text = summarize_translated_segments(
-                    segments,
-                    provider=args.translation_provider,
-                    model=args.translation_model,
-                )
-                save_text(summary_text, summary_output_path)
-                print(f"[Step 3.5] 简短总结已写入: {summary_output_path}")
-            except Exception as exc:
-                print(
-                    f"[Step 3.5] 警告: 简短总结生成失败，将继续后续流程: {exc}",
-                    file=sys.stderr,
-                )
+            # Step 3 + 4: Translate in a background thread while synthesizing the
+            # batches that are already translated
+            ready_batches: queue.Queue[list[int] | None] = queue.Queue()
+            translation_result: dict = {}
+            # Set when synthesis fails, so no more paid LLM calls are made.
+            translation_cancel = threading.Event()
+
+            def _translate_worker() -> None:
+                try:
+                    translate_segments(
+                        segments,
+                        provider=args.translation_provider,
+                        model=args.translation_model,
+                        on_batch_done=ready_batches.put,
+                        use_batch_api=args.translation_batch_api,
+                        cancel=translation_cancel,
+                    )
+                except BaseException as exc:
+                    # Recorded before the end marker, so synthesis stopping
+                    # early can be traced back to it.
+                    translation_result["error"] = exc
+                    return
+                finally:
+                    ready_batches.put(None)
+                try:
+                    if translation_cancel.is_set():
+                        return
+                    if args.keep_intermediate:
+                        save_intermediate(
+                            {"segments": segments},
+                            os.path.join(work_dir, "translation.json"),
+                        )
+                    translation_result["summary_job"] = run_summaries(
+                        segments,
+                        args,
+                        summary_output_path,
+                        detailed_summary_output_path,
+                    )
+                except BaseException as exc:
+                    translation_result["error"] = exc
+
+            translation_thread = threading.Thread(target=_translate_worker, daemon=True)
+            translation_thread.start()
 
-        if args.summary_mode in {"detailed", "both"}:
             try:
-                detailed_summary_text = summarize_translated_segments_detailed(
+                wav_paths = synthesize_segments(
                     segments,
-                    provider=args.translation_provider,
-                    model=args.translation_model,
-                )
-                save_text(detailed_summary_text, detailed_summary_output_path)
-                print(f"[Step 3.6] 详细总结已写入: {detailed_summary_output_path}")
-            except Exception as exc:
-                print(
-                    f"[Step 3.6] 警告: 详细总结生成失败，将继续后续流程: {exc}",
-                    file=sys.stderr,
+                    ref_paths,
+                    work_dir,
+                    tts_backend=args.tts_backend,
+                    index_tts_model_dir=args.index_tts_model_dir,
+                    index_tts_cfg_path=args.index_tts_cfg_path,
+                    index_tts_compile=args.index_tts_compile,
+                    batch_size=args.tts_batch_size,
+                    ready_batches=iter(ready_batches.get, None),
+                    clip_cache=(
+                        TTSClipCache(work_dir, source_sha256) if source_sha256 else None
+                    ),
                 )
-        print()
+            except BaseException as exc:
+                # Report the synthesis error. A translation error from before
+                # the cancel (e.g. the one that ended the queue early) is its cause.
+                translation_error = translation_result.get("error")
+                translation_cancel.set()
+                translation_thread.join()
+                if translation_error is not None:
+                    raise exc from translation_error
+                raise
+            translation_thread.join()
+            if "error" in translation_result:
+                raise translation_result["error"]
+            print()
 
-        # Step 4: Synthesize with voice cloning
-        wav_paths = synthesize_segments(
-            segments,
-            ref_paths,
-            work_dir,
-            tts_backend=args.tts_backend,
-            index_tts_model_dir=args.index_tts_model_dir,
-            index_tts_cfg_path=args.index_tts_cfg_path,
-        )
-        print()
+            summary_job = translation_result.get("summary_job")
+            if summary_job is not None:
+                try:
+                    summaries = collect_summary_batch(summary_job)
+                    digest = summary_digest(segments, args)
+                    if "short" in summaries:
+                        save_summary(summaries["short"], summary_output_path, digest)
+                        print(f"[Step 3.5] 简短总结已写入: {summary_output_path}")
+                    if "detailed" in summaries:
+                        save_summary(
+                            summaries["detailed"], detailed_summary_output_path, digest
+                        )
+                        print(f"[Step 3.6] 详细总结已写入: {detailed_summary_output_path}")
+                except Exception as exc:
+                    print(
+                        f"[Step 3.5] 警告: Batch API 总结生成失败，将继续后续流程: {exc}",
+                        file=sys.stderr,
+                    )
+                print()
 
         # Step 5: Concatenate
         use_timestamps_for_concat = True
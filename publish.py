@@ -8,23 +8,31 @@ import argparse
 import json
 import os
 import re
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from site_tools.build import build_site
+from site_tools.episodes import prepare_episodes, record_episodes
+
 # 配置
 R2_BUCKET = "babel-podcast"
 CDN_BASE = "https://cdn.jaylab.io"
 PAGES_PROJECT = "babel-podcast"
 
+_NON_WORD_RE = re.compile(r"[^\w\s-]")
+# Whitespace, underscores and existing dashes collapse to one dash in a single pass.
+_SEPARATOR_RE = re.compile(r"[-\s_]+")
+
 
 def slugify(title: str) -> str:
     """Generate URL-safe slug from title."""
     # 移除非ASCII字符，转小写，替换空格和特殊字符
     slug = title.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug)
+    slug = _NON_WORD_RE.sub("", slug)
+    slug = _SEPARATOR_RE.sub("-", slug)
     slug = slug.strip("-")
     if not slug or len(slug) < 3:
         # 如果 slug 太短，用文件名
@@ -68,41 +76,69 @@ def upload_to_r2(local_path: Path, r2_key: str) -> bool:
     return True
 
 
-def add_episode(site_dir: Path, title: str, slug: str, zh_audio: Path, en_audio: Path = None):
-    """调用 site.py add 添加剧集."""
-    cmd = [
-        "python", "site.py", "add",
-        "--title", title,
-        "--slug", slug,
-        "--zh-audio", str(zh_audio),
-    ]
-    if en_audio and en_audio.exists():
-        cmd.extend(["--en-audio", str(en_audio)])
-    
-    # 查找 summary 文件
-    babel_dir = zh_audio.parent / f"{zh_audio.stem.replace(_zh, )}_babel"
-    summary_file = babel_dir / f"{zh_audio.stem.replace(_zh, )}.summary.txt"
-    detailed_file = babel_dir / f"{zh_audio.stem.replace(_zh, )}.summary.detailed.md"
-    
-    if summary_file.exists():
-        cmd.extend(["--summary", str(summary_file)])
-    if detailed_file.exists():
-        cmd.extend(["--detailed-summary", str(detailed_file)])
-    
-    result = run_cmd(cmd, check=False)
-    if result.returncode != 0:
-        print(f"  ❌ 添加剧集失败: {result.stderr}")
+def find_summary_files(zh_audio: Path) -> tuple[Path | None, Path | None]:
+    """查找 babel.py 生成的总结文件（与输出音频同目录，或旧版的 _babel 目录）."""
+    name = extract_title_from_path(zh_audio)
+    search_dirs = [zh_audio.parent, zh_audio.parent / f"{name}_babel"]
+    summary_names = [f"{zh_audio.stem}.summary.txt", f"{name}.summary.txt"]
+    detailed_names = [f"{zh_audio.stem}.summary.detailed.md", f"{name}.summary.detailed.md"]
+
+    def _first_existing(names: list[str]) -> Path | None:
+        for directory in search_dirs:
+            for file_name in names:
+                path = directory / file_name
+                if path.exists():
+                    return path
+        return None
+
+    return _first_existing(summary_names), _first_existing(detailed_names)
+
+
+def prepare_episode(
+    site_dir: Path, title: str, slug: str, zh_audio: Path, en_audio: Path = None
+) -> dict | None:
+    """在进程内调用 site_tools 复制音频并生成剧集条目（暂不写入 episodes.json）."""
+    summary_file, detailed_file = find_summary_files(zh_audio)
+    site_args = argparse.Namespace(
+        site_dir=str(site_dir),
+        title=title,
+        slug=slug,
+        zh_audio=str(zh_audio),
+        en_audio=str(en_audio) if en_audio and en_audio.exists() else None,
+        summary=str(summary_file) if summary_file else None,
+        detailed_summary=str(detailed_file) if detailed_file else None,
+        pub_date=None,
+    )
+    try:
+        return prepare_episodes([site_args])[0]
+    except Exception as exc:
+        print(f"  ❌ 准备剧集失败: {exc}")
+        return None
+
+
+def save_episode(site_dir: Path, episode: dict) -> bool:
+    """写入 episodes.json；仅在上传全部成功后调用，失败的发布可直接重试."""
+    try:
+        record_episodes(site_dir, [episode])
+    except Exception as exc:
+        print(f"  ❌ 添加剧集失败: {exc}")
         return False
-    print(f"  ✅ 已添加: {title}")
+    print(f"  ✅ 已添加: {episode['title']}")
     return True
 
 
+def discard_episode_audio(site_dir: Path, slug: str) -> None:
+    """删除已复制到站点的音频（该 slug 尚未写入 episodes.json）."""
+    shutil.rmtree(site_dir / "audio" / slug, ignore_errors=True)
+
+
 def build_and_deploy(site_dir: Path) -> bool:
     """构建并部署网站."""
     # Build
-    result = run_cmd(["python", "site.py", "build"], check=False)
-    if result.returncode != 0:
-        print(f"  ❌ 构建失败: {result.stderr}")
+    try:
+        build_site(argparse.Namespace(site_dir=str(site_dir)))
+    except Exception as exc:
+        print(f"  ❌ 构建失败: {exc}")
         return False
     print("  ✅ 构建完成")
     
@@ -173,20 +209,36 @@ def main():
     os.chdir(babel_dir)
     site_dir = babel_dir / "site"
     
-    # Step 1: 上传到 R2
-    if not args.skip_upload:
-        print("[1/3] 上传到 R2...")
-        if not upload_to_r2(zh_audio, f"audio/{slug}/zh.mp3"):
-            sys.exit(1)
-        if en_audio:
-            if not upload_to_r2(en_audio, f"audio/{slug}/en.mp3"):
-                sys.exit(1)
-    else:
-        print("[1/3] 跳过 R2 上传")
-    
-    # Step 2: 添加剧集
-    print("[2/3] 添加剧集...")
-    if not add_episode(site_dir, title, slug, zh_audio, en_audio):
+    # Step 1 + 2: R2 上传与复制音频并行；上传全部成功后才写入 episodes.json
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        upload_futures = []
+        if not args.skip_upload:
+            print("[1/3] 上传到 R2（并行）...")
+            upload_futures.append(
+                executor.submit(upload_to_r2, zh_audio, f"audio/{slug}/zh.mp3")
+            )
+            if en_audio:
+                upload_futures.append(
+                    executor.submit(upload_to_r2, en_audio, f"audio/{slug}/en.mp3")
+                )
+        else:
+            print("[1/3] 跳过 R2 上传")
+
+        print("[2/3] 添加剧集...")
+        prepare_future = executor.submit(
+            prepare_episode, site_dir, title, slug, zh_audio, en_audio
+        )
+
+        uploads_ok = all([future.result() for future in upload_futures])
+        episode = prepare_future.result()
+
+    if not uploads_ok or episode is None:
+        if episode is not None:
+            discard_episode_audio(site_dir, slug)
+        if not uploads_ok:
+            print("❌ R2 上传失败，已停止发布（未写入剧集，未部署）")
+        sys.exit(1)
+    if not save_episode(site_dir, episode):
         sys.exit(1)
     
     # Step 3: 构建并部署
@@ -4,12 +4,13 @@
 from __future__ import annotations
 
 import argparse
-import json
 import shutil
 import subprocess
 import sys
 from pathlib import Path
 
+import orjson
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
@@ -27,7 +28,7 @@ def load_segments(work_dir: Path) -> tuple[list[dict], Path]:
         meta_path = work_dir / name
         if not meta_path.is_file():
             continue
-        payload = json.loads(meta_path.read_text(encoding="utf-8"))
+        payload = orjson.loads(meta_path.read_bytes())
         segments = payload.get("segments")
         if isinstance(segments, list):
             return segments, meta_path
@@ -57,12 +58,15 @@ def clamp_same_length(segments: list[dict], wav_paths: list[str]) -> tuple[list[
     return segments[:min_n], wav_paths[:min_n]
 
 
-def maybe_render_video(mp3_path: Path) -> Path | None:
+def maybe_render_videos(mp3_paths: list[Path]) -> list[Path]:
+    """Render all MP4s in one ffmpeg process sharing a single black video source."""
+    if not mp3_paths:
+        return []
     if shutil.which("ffmpeg") is None:
         print("警告: 未找到 ffmpeg，跳过 MP4 生成", file=sys.stderr)
-        return None
+        return []
 
-    mp4_path = mp3_path.with_suffix(".mp4")
+    n = len(mp3_paths)
     cmd = [
         "ffmpeg",
         "-y",
@@ -70,21 +74,36 @@ def maybe_render_video(mp3_path: Path) -> Path | None:
         "lavfi",
         "-i",
         "color=size=1280x720:rate=30:color=black",
-        "-i",
-        str(mp3_path),
-        "-shortest",
-        "-c:v",
-        "libx264",
-        "-pix_fmt",
-        "yuv420p",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "192k",
-        str(mp4_path),
     ]
+    for mp3_path in mp3_paths:
+        cmd.extend(["-i", str(mp3_path)])
+    video_labels = "".join(f"[v{i}]" for i in range(n))
+    cmd.extend(["-filter_complex", f"[0:v]split={n}{video_labels}"])
+
+    mp4_paths: list[Path] = []
+    for i, mp3_path in enumerate(mp3_paths):
+        mp4_path = mp3_path.with_suffix(".mp4")
+        cmd.extend(
+            [
+                "-map",
+                f"[v{i}]",
+                "-map",
+                f"{i + 1}:a",
+                "-shortest",
+                "-c:v",
+                "libx264",
+                "-pix_fmt",
+                "yuv420p",
+                "-c:a",
+                "aac",
+                "-b:a",
+                "192k",
+                str(mp4_path),
+            ]
+        )
+        mp4_paths.append(mp4_path)
     subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    return mp4_path
+    return mp4_paths
 
 
 def main() -> None:
@@ -143,7 +162,7 @@ def main() -> None:
         (f"03_no_timestamps_fixed_gap_{args.fixed_gap_ms}ms", False, args.fixed_gap_ms),
     ]
 
-    generated: list[tuple[Path, Path | None]] = []
+    mp3_paths: list[Path] = []
     for name, use_timestamps, fixed_gap_ms in tasks:
         mp3_path = output_dir / f"{name}.mp3"
         print(f"[Generate] {mp3_path.name}")
@@ -154,20 +173,20 @@ def main() -> None:
             use_timestamps=use_timestamps,
             fixed_gap_ms=fixed_gap_ms,
         )
+        mp3_paths.append(mp3_path)
+        print()
 
-        mp4_path = None
-        if args.with_video:
-            print(f"[Render ] {mp3_path.with_suffix('.mp4').name}")
-            mp4_path = maybe_render_video(mp3_path)
-
-        generated.append((mp3_path, mp4_path))
+    mp4_paths: list[Path] = []
+    if args.with_video:
+        print(f"[Render ] {', '.join(p.with_suffix('.mp4').name for p in mp3_paths)}")
+        mp4_paths = maybe_render_videos(mp3_paths)
         print()
 
     print("生成完成：")
-    for mp3_path, mp4_path in generated:
+    for i, mp3_path in enumerate(mp3_paths):
         print(f"- MP3: {mp3_path}")
-        if mp4_path is not None:
-            print(f"  MP4: {mp4_path}")
+        if i < len(mp4_paths):
+            print(f"  MP4: {mp4_paths[i]}")
 
 
 if __name__ == "__main__":
@@ -6,11 +6,6 @@ Commands: init / add / build / serve
 
 import argparse
 
-from site_tools.config import init_site
-from site_tools.episodes import add_episode
-from site_tools.build import build_site
-from site_tools.serve import serve_site
-
 
 def main() -> None:
     parser = argparse.ArgumentParser(
@@ -48,13 +43,18 @@ def main() -> None:
 
     args = parser.parse_args()
 
+    # Import per command so e.g. `init` does not pay for jinja2 / markdown-it.
     if args.command == "init":
+        from site_tools.config import init_site
         init_site(args)
     elif args.command == "add":
+        from site_tools.episodes import add_episode
         add_episode(args)
     elif args.command == "build":
+        from site_tools.build import build_site
         build_site(args)
     elif args.command == "serve":
+        from site_tools.serve import serve_site
         serve_site(args)
 
 
@@ -1,39 +1,105 @@
 """Build static site from templates and episode data."""
 
+import functools
 import os
 import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from email.utils import format_datetime
 from pathlib import Path
-
-import markdown as md
-from jinja2 import Environment, FileSystemLoader
+from typing import TYPE_CHECKING
 
 from .config import load_config, load_episodes
+from .rss import format_duration, rfc2822, render_rss
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
 
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 STATIC_DIR = Path(__file__).parent / "static"
 
+PARALLEL_RENDER_MIN_EPISODES = 8  # below this, render pages in-process
+STAGING_DIR_NAME = ".build.tmp"
+OLD_BUILD_DIR_NAME = ".build.old"
 
-def _format_duration(seconds: int) -> str:
-    """Convert seconds to HH:MM:SS."""
-    h = seconds // 3600
-    m = (seconds % 3600) // 60
-    s = seconds % 60
-    if h > 0:
-        return f"{h}:{m:02d}:{s:02d}"
-    return f"{m}:{s:02d}"
 
+@functools.cache
+def _markdown_parser():
+    # Imported here so site.py commands other than build skip loading it.
+    from markdown_it import MarkdownIt
 
-def _rfc2822(date_str: str) -> str:
-    """Convert YYYY-MM-DD to RFC 2822 format for RSS."""
-    dt = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-    return format_datetime(dt)
+    # CommonMark already covers fenced code blocks; tables are the only extension used.
+    return MarkdownIt("commonmark").enable("table")
 
 
+@functools.lru_cache(maxsize=256)
 def _render_markdown(text: str) -> str:
     """Render Markdown text to HTML."""
-    return md.markdown(text, extensions=["tables", "fenced_code"])
+    return _markdown_parser().render(text)
+
+
+def _templates_mtime_ns() -> int:
+    return max(path.stat().st_mtime_ns for path in TEMPLATE_DIR.iterdir())
+
+
+@functools.lru_cache(maxsize=4)
+def _get_env(bytecode_cache_dir: str, templates_mtime_ns: int) -> "Environment":
+    """Return the Jinja2 environment, reused while the templates are unchanged.
+
+    Compiled templates are also kept on disk, so a fresh process skips parsing.
+    templates_mtime_ns is only part of the cache key.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    os.makedirs(bytecode_cache_dir, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        autoescape=True,
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+    )
+    env.filters["format_duration"] = format_duration
+    env.filters["rfc2822"] = rfc2822
+    env.filters["markdown"] = _render_markdown
+    return env
+
+
+def _render_episode_page(
+    ep: dict,
+    config: dict,
+    bytecode_cache_dir: str,
+    templates_mtime_ns: int,
+) -> tuple[str, str]:
+    """Render one episode page; returns (slug, html).
+
+    Module-level so it can run in a worker process, where _get_env builds the
+    Environment once and reuses it for every page that worker renders.
+    """
+    tpl = _get_env(bytecode_cache_dir, templates_mtime_ns).get_template("episode.html")
+    return ep["slug"], tpl.render(config=config, episode=ep, root="..")
+
+
+def _render_episode_pages(
+    episodes: list[dict],
+    config: dict,
+    bytecode_cache_dir: str,
+    templates_mtime_ns: int,
+) -> list[tuple[str, str]]:
+    render_args = (
+        episodes,
+        [config] * len(episodes),
+        [bytecode_cache_dir] * len(episodes),
+        [templates_mtime_ns] * len(episodes),
+    )
+    if len(episodes) < PARALLEL_RENDER_MIN_EPISODES:
+        # Pool startup costs more than rendering a handful of pages.
+        return list(map(_render_episode_page, *render_args))
+
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(episodes) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_episode_page, *render_args, chunksize=chunksize))
 
 
 def build_site(args):
@@ -47,59 +113,73 @@ def build_site(args):
     # Sort episodes by pub_date descending
     episodes.sort(key=lambda ep: (ep["pub_date"], ep.get("added_at", "")), reverse=True)
 
-    # Set up Jinja2
-    env = Environment(
-        loader=FileSystemLoader(str(TEMPLATE_DIR)),
-        autoescape=True,
-    )
-    env.filters["format_duration"] = _format_duration
-    env.filters["rfc2822"] = _rfc2822
-    env.filters["markdown"] = _render_markdown
+    # Set up Jinja2 (cached per process, bytecode cached under site/.jinja_cache)
+    bytecode_cache_dir = str(site_dir / ".jinja_cache")
+    templates_mtime_ns = _templates_mtime_ns()
+    env = _get_env(bytecode_cache_dir, templates_mtime_ns)
 
     base_url = config.get("base_url", "").rstrip("/")
 
-    # Clean and recreate build dir (except audio symlink target)
-    if build_dir.exists():
-        shutil.rmtree(build_dir)
-    build_dir.mkdir(parents=True)
+    # Build into a staging dir next to build/ and swap it in at the end, so
+    # build/ is never half-written and the old tree is deleted off the hot path.
+    staging_dir = site_dir / STAGING_DIR_NAME
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
 
     # Render index.html (root="." for same-directory relative paths)
     tpl = env.get_template("index.html")
     html = tpl.render(config=config, episodes=episodes, root=".")
-    (build_dir / "index.html").write_text(html, encoding="utf-8")
+    (staging_dir / "index.html").write_bytes(html.encode("utf-8"))
     print(f"已生成: {build_dir / 'index.html'}")
 
     # Render episode pages (root=".." since pages live in episodes/)
-    episodes_dir = build_dir / "episodes"
+    episodes_dir = staging_dir / "episodes"
     episodes_dir.mkdir(exist_ok=True)
-    tpl = env.get_template("episode.html")
-    for ep in episodes:
-        html = tpl.render(config=config, episode=ep, root="..")
-        ep_path = episodes_dir / f"{ep['slug']}.html"
-        ep_path.write_text(html, encoding="utf-8")
+    pages = _render_episode_pages(episodes, config, bytecode_cache_dir, templates_mtime_ns)
+    for slug, html in pages:
+        (episodes_dir / f"{slug}.html").write_bytes(html.encode("utf-8"))
     print(f"已生成: {len(episodes)} 个剧集页面")
 
     # Render RSS feed
-    tpl = env.get_template("rss.xml")
-    rss = tpl.render(
-        config=config,
-        episodes=episodes,
+    rss = render_rss(
+        config,
+        episodes,
         base_url=base_url,
         build_date=format_datetime(datetime.now(timezone.utc)),
     )
-    (build_dir / "feed.xml").write_text(rss, encoding="utf-8")
+    (staging_dir / "feed.xml").write_bytes(rss.encode("utf-8"))
     print(f"已生成: {build_dir / 'feed.xml'}")
 
     # Copy static assets
-    css_dest = build_dir / "style.css"
-    shutil.copy2(STATIC_DIR / "style.css", css_dest)
-    print(f"已复制: {css_dest}")
+    shutil.copy2(STATIC_DIR / "style.css", staging_dir / "style.css")
+    print(f"已复制: {build_dir / 'style.css'}")
 
-    # Create audio symlink
-    audio_link = build_dir / "audio"
+    # Create audio symlink (staging and build dirs share a parent, so the
+    # relative target stays valid after the swap)
+    audio_link = staging_dir / "audio"
     audio_target = site_dir / "audio"
     if audio_target.exists():
         os.symlink(os.path.relpath(audio_target, build_dir), audio_link)
-        print(f"已创建符号链接: {audio_link} → {audio_target}")
+        print(f"已创建符号链接: {build_dir / 'audio'} → {audio_target}")
 
+    _swap_build_dir(staging_dir, build_dir)
     print("站点构建完成！")
+
+
+def _swap_build_dir(staging_dir: Path, build_dir: Path) -> None:
+    """Move staging_dir into place as build_dir and delete the old tree in the background."""
+    old_dir = build_dir.parent / OLD_BUILD_DIR_NAME
+    if old_dir.exists():
+        # Left over when a previous process exited before its cleanup thread finished.
+        shutil.rmtree(old_dir)
+    if build_dir.exists():
+        os.rename(build_dir, old_dir)
+    os.replace(staging_dir, build_dir)
+    if old_dir.exists():
+        threading.Thread(
+            target=shutil.rmtree,
+            args=(old_dir,),
+            kwargs={"ignore_errors": True},
+            daemon=True,
+        ).start()
@@ -1,8 +1,10 @@
 """Site configuration and data management."""
 
-import json
+import os
 from pathlib import Path
 
+import orjson
+
 DEFAULT_CONFIG = {
     "title": "Babel 播客",
     "description": "英语播客的中文翻译版",
@@ -12,6 +14,19 @@ DEFAULT_CONFIG = {
     "cover_url": "",
 }
 
+# episodes.json path -> (st_mtime_ns, parsed episodes)
+_EPISODES_CACHE: dict[Path, tuple[int, list[dict]]] = {}
+
+
+def _write_bytes_atomic(path: Path, data: bytes) -> None:
+    """Write data to path via a fsynced temp file, so readers never see a partial file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 
 def init_site(args):
     """Create site/ directory structure, config.json, and empty episodes.json."""
@@ -20,30 +35,30 @@ def init_site(args):
     (site_dir / "audio").mkdir(exist_ok=True)
     (site_dir / "build").mkdir(exist_ok=True)
 
-    config = dict(DEFAULT_CONFIG)
-    if args.title:
-        config["title"] = args.title
-    if args.base_url:
-        config["base_url"] = args.base_url.rstrip("/")
-    if args.description:
-        config["description"] = args.description
-    if args.author:
-        config["author"] = args.author
+    overrides = {
+        key: value
+        for key, value in (
+            ("title", args.title),
+            ("base_url", args.base_url.rstrip("/") if args.base_url else None),
+            ("description", args.description),
+            ("author", args.author),
+        )
+        if value
+    }
+    config = DEFAULT_CONFIG | overrides
 
     config_path = site_dir / "config.json"
     if config_path.exists():
         print(f"config.json 已存在，跳过: {config_path}")
     else:
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        _write_bytes_atomic(config_path, orjson.dumps(config, option=orjson.OPT_INDENT_2))
         print(f"已创建: {config_path}")
 
     episodes_path = site_dir / "episodes.json"
     if episodes_path.exists():
         print(f"episodes.json 已存在，跳过: {episodes_path}")
     else:
-        with open(episodes_path, "w", encoding="utf-8") as f:
-            json.dump([], f)
+        _write_bytes_atomic(episodes_path, b"[]")
         print(f"已创建: {episodes_path}")
 
     print("站点初始化完成！")
@@ -51,17 +66,30 @@ def init_site(args):
 
 def load_config(site_dir: str | Path) -> dict:
     config_path = Path(site_dir) / "config.json"
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(config_path.read_bytes())
 
 
 def load_episodes(site_dir: str | Path) -> list[dict]:
+    """Load episodes.json, reusing the parsed list while the file is unchanged.
+
+    Callers sort and append to the result, so each call gets its own copies.
+    """
     episodes_path = Path(site_dir) / "episodes.json"
-    with open(episodes_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    mtime_ns = episodes_path.stat().st_mtime_ns
+    cached = _EPISODES_CACHE.get(episodes_path)
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, orjson.loads(episodes_path.read_bytes()))
+        _EPISODES_CACHE[episodes_path] = cached
+    return [dict(ep) for ep in cached[1]]
 
 
 def save_episodes(site_dir: str | Path, episodes: list[dict]) -> None:
     episodes_path = Path(site_dir) / "episodes.json"
-    with open(episodes_path, "w", encoding="utf-8") as f:
-        json.dump(episodes, f, ensure_ascii=False, indent=2)
+    _write_bytes_atomic(
+        episodes_path,
+        orjson.dumps(episodes, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+    )
+    _EPISODES_CACHE[episodes_path] = (
+        episodes_path.stat().st_mtime_ns,
+        [dict(ep) for ep in episodes],
+    )
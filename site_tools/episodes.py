@@ -1,52 +1,183 @@
 """Add episodes to the site."""
 
-import json
+import hashlib
+import mmap
+import os
 import re
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 from .config import load_episodes, save_episodes
 
+MAX_ADD_WORKERS = 8  # concurrent episodes in add_episodes
+
+_NON_WORD_RE = re.compile(r"[^\w\s-]")
+# Whitespace, underscores and existing dashes collapse to one dash in a single pass.
+_SEPARATOR_RE = re.compile(r"[-\s_]+")
+
 
 def _get_duration_seconds(audio_path: Path) -> int:
+    """Get audio duration in seconds from the MP3 header, falling back to ffprobe."""
+    try:
+        from mutagen.mp3 import MP3
+    except ImportError:
+        return _ffprobe_duration_seconds(audio_path)
+    try:
+        return round(MP3(str(audio_path)).info.length)
+    except Exception:
+        # Non-standard MP3 that mutagen cannot parse.
+        return _ffprobe_duration_seconds(audio_path)
+
+
+def _ffprobe_duration_seconds(audio_path: Path) -> int:
     """Get audio duration in seconds via ffprobe."""
+    # Ask only for format.duration as a bare number: no JSON payload to decode.
     result = subprocess.run(
         [
-            "ffprobe", "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=nokey=1:noprint_wrappers=1",
             str(audio_path),
         ],
-        capture_output=True, text=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    info = json.loads(result.stdout)
-    return round(float(info["format"]["duration"]))
+    return round(float(result.stdout))
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Copy file contents only, preferring a copy-on-write clone.
+
+    ``cp --reflink=auto`` clones in O(1) on btrfs/XFS and otherwise copies in
+    the kernel; shutil.copyfile (sendfile on Linux) covers systems without GNU cp.
+    """
+    try:
+        subprocess.run(
+            ["cp", "--reflink=auto", str(src), str(dst)],
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        shutil.copyfile(src, dst)
+
+
+def _file_digest(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, hashlib.blake2b).hexdigest()
+
+
+def _copy_audio(src: Path, dst: Path) -> bool:
+    """Copy src to dst unless dst already holds the same bytes.
+
+    The source digest is kept in a hidden sidecar next to dst, so re-running
+    ``add`` after a failure hashes the source instead of copying it again.
+    Returns True if the file was copied.
+    """
+    digest_path = dst.with_name(f".{dst.name}.b2")
+    digest = _file_digest(src)
+    if (
+        dst.is_file()
+        and digest_path.is_file()
+        and digest_path.read_text(encoding="utf-8").strip() == digest
+    ):
+        return False
+    _fast_copy(src, dst)
+    digest_path.write_text(digest, encoding="utf-8")
+    return True
+
+
+def _read_summary(path: str) -> str:
+    """Read a UTF-8 summary file through a read-only mmap and strip it."""
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8").strip()
 
 
 def _slugify(title: str) -> str:
     """Generate a URL-safe slug from a title."""
     slug = title.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug)
+    slug = _NON_WORD_RE.sub("", slug)
+    slug = _SEPARATOR_RE.sub("-", slug)
     return slug.strip("-")
 
 
 def add_episode(args):
     """Add an episode: copy audio, read summaries, update episodes.json."""
-    site_dir = Path(args.site_dir)
+    add_episodes([args])
+
+
+def add_episodes(args_list: list) -> None:
+    """Add several episodes to one site, saving episodes.json once at the end."""
+    if not args_list:
+        return
+    record_episodes(Path(args_list[0].site_dir), prepare_episodes(args_list))
+
+
+def prepare_episodes(args_list: list) -> list[dict]:
+    """Copy audio and build episodes.json entries without saving them.
+
+    Callers that must finish other work first (e.g. uploads) pass the result
+    to record_episodes afterwards.
+    """
+    if not args_list:
+        return []
+    site_dir = Path(args_list[0].site_dir)
+    existing_slugs = {ep["slug"] for ep in load_episodes(site_dir)}
+
+    # Validate every slug before touching the filesystem.
+    slugs = []
+    for args in args_list:
+        slug = _resolve_slug(args, existing_slugs)
+        existing_slugs.add(slug)
+        slugs.append(slug)
+
+    # Copies, duration probes and summary reads are I/O-bound and independent
+    # per episode, so overlap them across episodes.
+    if len(args_list) == 1:
+        return [_build_episode(args_list[0], site_dir, slugs[0])]
+    workers = min(MAX_ADD_WORKERS, len(args_list))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(_build_episode, args_list, [site_dir] * len(args_list), slugs)
+        )
+
+
+def record_episodes(site_dir: Path, new_episodes: list[dict]) -> None:
+    """Append prepared entries to episodes.json."""
     episodes = load_episodes(site_dir)
+    existing_slugs = {ep["slug"] for ep in episodes}
+    for episode in new_episodes:
+        # Another add may have taken the slug since prepare_episodes ran.
+        if episode["slug"] in existing_slugs:
+            raise ValueError(f"slug 已存在: {episode['slug']}")
+        existing_slugs.add(episode["slug"])
+
+    episodes.extend(new_episodes)
+    save_episodes(site_dir, episodes)
+    for episode in new_episodes:
+        print(f"已添加剧集: {episode['title']} (slug: {episode['slug']})")
+
 
+def _resolve_slug(args, existing_slugs: set[str]) -> str:
     slug = args.slug if args.slug else _slugify(args.title)
     if not slug:
         raise ValueError("无法从标题生成 slug，请用 --slug 指定")
 
     # Check for duplicate slug
-    if any(ep["slug"] == slug for ep in episodes):
+    if slug in existing_slugs:
         raise ValueError(f"slug 已存在: {slug}")
+    return slug
 
+
+def _build_episode(args, site_dir: Path, slug: str) -> dict:
+    """Copy one episode's audio and return its episodes.json entry."""
     # Create audio directory for this episode
     audio_dir = site_dir / "audio" / slug
     audio_dir.mkdir(parents=True, exist_ok=True)
@@ -54,17 +185,21 @@ def add_episode(args):
     # Copy Chinese audio (required)
     zh_src = Path(args.zh_audio)
     zh_dest = audio_dir / "zh.mp3"
-    shutil.copy2(zh_src, zh_dest)
-    print(f"已复制中文音频: {zh_dest}")
+    if _copy_audio(zh_src, zh_dest):
+        print(f"已复制中文音频: {zh_dest}")
+    else:
+        print(f"中文音频未变化，跳过复制: {zh_dest}")
 
     # Copy English audio (optional)
     en_audio_path = None
     if args.en_audio:
         en_src = Path(args.en_audio)
         en_dest = audio_dir / "en.mp3"
-        shutil.copy2(en_src, en_dest)
+        if _copy_audio(en_src, en_dest):
+            print(f"已复制英文音频: {en_dest}")
+        else:
+            print(f"英文音频未变化，跳过复制: {en_dest}")
         en_audio_path = f"audio/{slug}/en.mp3"
-        print(f"已复制英文音频: {en_dest}")
 
     # Get audio metadata via ffprobe
     duration_seconds = _get_duration_seconds(zh_dest)
@@ -73,13 +208,13 @@ def add_episode(args):
     # Read summaries
     summary = ""
     if args.summary:
-        summary = Path(args.summary).read_text(encoding="utf-8").strip()
+        summary = _read_summary(args.summary)
 
     detailed_summary_md = ""
     if args.detailed_summary:
-        detailed_summary_md = Path(args.detailed_summary).read_text(encoding="utf-8").strip()
+        detailed_summary_md = _read_summary(args.detailed_summary)
 
-    episode = {
+    return {
         "slug": slug,
         "title": args.title,
         "pub_date": args.pub_date or datetime.now(timezone.utc).strftime("%Y-%m-%d"),
@@ -91,7 +226,3 @@ def add_episode(args):
         "summary": summary,
         "detailed_summary_md": detailed_summary_md,
     }
-
-    episodes.append(episode)
-    save_episodes(site_dir, episodes)
-    print(f"已添加剧集: {args.title} (slug: {slug})")
@@ -0,0 +1,89 @@
+"""Render the podcast RSS feed."""
+
+import functools
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+
+@functools.lru_cache(maxsize=1024)
+def format_duration(seconds: int) -> str:
+    """Convert seconds to HH:MM:SS."""
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+    if h > 0:
+        return f"{h}:{m:02d}:{s:02d}"
+    return f"{m}:{s:02d}"
+
+
+@functools.lru_cache(maxsize=1024)
+def rfc2822(date_str: str) -> str:
+    """Convert YYYY-MM-DD to RFC 2822 format for RSS."""
+    dt = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return format_datetime(dt)
+
+
+def _text(value) -> str:
+    return escape(str(value or ""))
+
+
+def _render_item(config: dict, ep: dict, base_url: str) -> str:
+    page_url = _text(f"{base_url}/episodes/{ep['slug']}.html")
+    audio_url = f"{config.get('audio_base_url', '')}/{ep['zh_audio']}"
+    summary = _text(ep.get("summary"))
+    return (
+        "    <item>\n"
+        f"        <title>{_text(ep['title'])}</title>\n"
+        f"        <link>{page_url}</link>\n"
+        f'        <guid isPermaLink="true">{page_url}</guid>\n'
+        f"        <pubDate>{rfc2822(ep['pub_date'])}</pubDate>\n"
+        f"        <description>{summary}</description>\n"
+        f"        <enclosure url={quoteattr(audio_url)}"
+        f' length="{int(ep["zh_audio_size_bytes"])}" type="audio/mpeg"/>\n'
+        f"        <itunes:duration>{format_duration(ep['zh_audio_duration_seconds'])}</itunes:duration>\n"
+        f"        <itunes:summary>{summary}</itunes:summary>\n"
+        "    </item>\n"
+    )
+
+
+def render_rss(config: dict, episodes: list[dict], base_url: str, build_date: str) -> str:
+    """Build feed.xml as a string.
+
+    The feed layout is fixed, so it is assembled directly with escaped
+    f-strings instead of going through Jinja. The channel carries the iTunes
+    (author, summary, optional cover image) and Atom self-link elements; each
+    item links to its episode page and encloses the Chinese MP3 with its size
+    and itunes:duration.
+    """
+    title = _text(config.get("title"))
+    description = _text(config.get("description"))
+    home_url = _text(f"{base_url}/")
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0"\n'
+        '     xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"\n'
+        '     xmlns:atom="http://www.w3.org/2005/Atom">\n'
+        "<channel>\n"
+        f"    <title>{title}</title>\n"
+        f"    <link>{home_url}</link>\n"
+        f"    <description>{description}</description>\n"
+        f"    <language>{_text(config.get('language'))}</language>\n"
+        f"    <lastBuildDate>{_text(build_date)}</lastBuildDate>\n"
+        f"    <atom:link href={quoteattr(f'{base_url}/feed.xml')}"
+        ' rel="self" type="application/rss+xml"/>\n'
+        f"    <itunes:author>{_text(config.get('author'))}</itunes:author>\n"
+        f"    <itunes:summary>{description}</itunes:summary>\n"
+    ]
+    cover_url = config.get("cover_url")
+    if cover_url:
+        parts.append(
+            f"    <itunes:image href={quoteattr(cover_url)}/>\n"
+            "    <image>\n"
+            f"        <url>{_text(cover_url)}</url>\n"
+            f"        <title>{title}</title>\n"
+            f"        <link>{home_url}</link>\n"
+            "    </image>\n"
+        )
+    parts.extend(_render_item(config, ep, base_url) for ep in episodes)
+    parts.append("</channel>\n</rss>\n")
+    return "".join(parts)
@@ -5,6 +5,19 @@ import http.server
 from pathlib import Path
 
 
+class _PreviewHandler(http.server.SimpleHTTPRequestHandler):
+    """Quiet static handler that streams file bodies with sendfile."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        # socket.sendfile copies in the kernel and falls back to send() itself
+        # when os.sendfile is unavailable.
+        self.wfile.flush()
+        self.connection.sendfile(source)
+
+
 def serve_site(args):
     """Start a local HTTP server serving site/build/."""
     build_dir = Path(args.site_dir) / "build"
@@ -15,10 +28,10 @@ def serve_site(args):
 
     port = args.port
     handler = functools.partial(
-        http.server.SimpleHTTPRequestHandler,
+        _PreviewHandler,
         directory=str(build_dir),
     )
-    with http.server.HTTPServer(("", port), handler) as httpd:
+    with http.server.ThreadingHTTPServer(("", port), handler) as httpd:
         print(f"预览服务器已启动: http://localhost:{port}")
         print("按 Ctrl+C 停止。")
         try:
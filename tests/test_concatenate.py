@@ -1,17 +1,33 @@
 """Tests for tools.concatenate."""
 
+import io
 import os
+from types import SimpleNamespace
 
+import numpy as np
 from pydub import AudioSegment
-from pydub.generators import Sine
 import pytest
 
 from tools.concatenate import concatenate_audio
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _warmup_ffmpeg(tmp_path_factory):
+    """Run one tiny MP3 encode so ffmpeg start-up is not billed to the first test."""
+    warm_dir = tmp_path_factory.mktemp("ffmpeg_warmup")
+    AudioSegment.silent(duration=100).export(str(warm_dir / "warm.mp3"), format="mp3")
+
+
+def _sine_segment(duration_ms: int, sr: int = 44100) -> AudioSegment:
+    """440 Hz sine at pydub's default 0 dBFS, generated with numpy."""
+    n = int(sr * duration_ms / 1000)
+    x = (np.sin(2 * np.pi * 440 * np.arange(n) / sr) * 32767).astype("<i2")
+    return AudioSegment(x.tobytes(), sample_width=2, frame_rate=sr, channels=1)
+
+
 def _make_wav(tmp_path, name: str, duration_ms: int = 1000) -> str:
     """Create a short WAV file and return its path."""
-    audio = Sine(440).to_audio_segment(duration=duration_ms)
+    audio = _sine_segment(duration_ms)
     path = str(tmp_path / name)
     audio.export(path, format="wav")
     return path
@@ -149,6 +165,21 @@ class TestGapCalculation:
         # 500 + 500 + 200ms fixed gap = 1200ms
         assert 1150 <= len(result) <= 1300
 
+    def test_gaps_are_clamped_per_boundary(self):
+        from tools.concatenate import _gaps_ms
+
+        segments = [
+            {"start": 0.0, "end": 1.0},
+            {"start": 1.0, "end": 2.0},  # 0ms -> 100ms
+            {"start": 11.0, "end": 12.0},  # 9s -> 3000ms
+            {"start": 12.25, "end": 13.0},  # kept as-is
+            {"start": 12.5, "end": 14.0},  # overlap -> 100ms
+        ]
+
+        assert _gaps_ms(segments, 5, True, None) == [0, 100, 3000, 250, 100]
+        assert _gaps_ms(segments, 5, False, 200) == [0, 200, 200, 200, 200]
+        assert _gaps_ms(segments, 5, False, None) == [0, 0, 0, 0, 0]
+
     def test_negative_fixed_gap_raises(self, tmp_path):
         """Negative fixed gap should be rejected."""
         wav1 = _make_wav(tmp_path, "a.wav", 300)
@@ -181,3 +212,121 @@ class TestOutputFormat:
         # Verify it's a valid MP3 by loading it
         result = AudioSegment.from_mp3(output)
         assert len(result) > 0
+
+
+class TestBufferAssembly:
+    """Test the PCM stream handed to the encoder."""
+
+    def test_mixed_sample_rates_share_one_stream(self, tmp_path, monkeypatch):
+        import tools.concatenate as mod
+
+        wav1 = _make_wav(tmp_path, "a.wav", 500)
+        slow = _sine_segment(500, sr=16000)
+        wav2 = str(tmp_path / "b.wav")
+        slow.export(wav2, format="wav")
+
+        opened: list[tuple[int, int]] = []
+        written: list[bytes] = []
+
+        def _fake_encoder(output_path, sample_rate, channels):
+            opened.append((sample_rate, channels))
+            return SimpleNamespace(
+                stdin=SimpleNamespace(write=written.append, close=lambda: None),
+                stderr=io.BytesIO(),
+                wait=lambda: 0,
+            )
+
+        monkeypatch.setattr(mod, "_open_mp3_encoder", _fake_encoder)
+        segments = [
+            {"start": 0.0, "end": 1.0},
+            {"start": 1.3, "end": 2.0},
+        ]
+
+        concatenate_audio([wav1, wav2], segments, str(tmp_path / "out.mp3"))
+
+        assert opened == [(44100, 1)]
+        pcm = np.frombuffer(b"".join(written), dtype="<i2")
+        # 500 + 300ms gap + 500
+        assert abs(len(pcm) / 44.1 - 1300) <= 2
+        gap = pcm[int(510 * 44.1):int(790 * 44.1)]
+        assert not gap.any()
+
+    def test_mono_clip_is_upmixed_and_resampled(self, tmp_path):
+        import soundfile as sf
+
+        from tools.concatenate import _read_clip
+
+        path = str(tmp_path / "mono.wav")
+        _sine_segment(500, sr=16000).export(path, format="wav")
+
+        clip = _read_clip(path, sf.info(path), 32000, 2)
+
+        assert clip.dtype == np.int16
+        assert clip.shape == (16000, 2)
+        assert np.array_equal(clip[:, 0], clip[:, 1])
+        # Every other output frame lands on an input sample.
+        source = sf.read(path, dtype="int16")[0]
+        assert np.abs(clip[::2, 0].astype(int) - source).max() <= 1
+
+    def test_encoder_failure_raises(self, tmp_path, monkeypatch):
+        import tools.concatenate as mod
+
+        wav = _make_wav(tmp_path, "a.wav", 300)
+
+        def _failing_encoder(output_path, sample_rate, channels):
+            return SimpleNamespace(
+                stdin=SimpleNamespace(write=lambda data: None, close=lambda: None),
+                stderr=io.BytesIO(b"Unknown encoder"),
+                wait=lambda: 1,
+            )
+
+        monkeypatch.setattr(mod, "_open_mp3_encoder", _failing_encoder)
+
+        with pytest.raises(RuntimeError, match="Unknown encoder"):
+            concatenate_audio([wav], [{"start": 0.0, "end": 0.3}], str(tmp_path / "out.mp3"))
+
+
+class TestStreamCopy:
+    """Test joining MP3 clips without re-encoding."""
+
+    def test_mp3_clips_are_joined_without_decoding(self, tmp_path, monkeypatch):
+        import soundfile as sf
+
+        import tools.concatenate as mod
+
+        mp3_paths = []
+        for name in ("a.mp3", "b.mp3", "c.mp3"):
+            path = str(tmp_path / name)
+            _sine_segment(500, sr=24000).export(path, format="mp3")
+            mp3_paths.append(path)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("MP3 clips should not be decoded")
+
+        monkeypatch.setattr(mod, "_load_clip", _fail)
+        segments = [
+            {"start": 0.0, "end": 0.5},
+            {"start": 0.8, "end": 1.3},
+            {"start": 1.6, "end": 2.1},
+        ]
+        output = str(tmp_path / "out.mp3")
+
+        concatenate_audio(mp3_paths, segments, output)
+
+        # 3 x 500ms + 2 x 300ms gaps, plus per-file MP3 encoder padding.
+        duration_ms = 1000 * sf.info(output).duration
+        assert 2100 <= duration_ms <= 2500
+
+    def test_mixed_extensions_use_reencode_path(self, tmp_path, monkeypatch):
+        import tools.concatenate as mod
+
+        mp3 = str(tmp_path / "a.mp3")
+        _sine_segment(300).export(mp3, format="mp3")
+        wav = _make_wav(tmp_path, "b.wav", 300)
+
+        monkeypatch.setattr(mod, "_concatenate_stream_copy", lambda *a, **kw: pytest.fail())
+        output = str(tmp_path / "out.mp3")
+
+        concatenate_audio([mp3, wav], [{"start": 0.0, "end": 0.3}, {"start": 0.4, "end": 0.7}], output)
+
+        assert os.path.isfile(output)
@@ -0,0 +1,40 @@
+"""Tests for tools._llm_cache."""
+
+import pytest
+
+import tools._llm_cache as llm_cache
+
+
+@pytest.fixture(autouse=True)
+def _cache_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_cache, "CACHE_PATH", str(tmp_path / "babel" / "llm.sqlite"))
+
+
+class TestLlmCache:
+    """Test sqlite-backed get/put."""
+
+    def test_put_then_get(self):
+        key = llm_cache.make_key("deepseek", "deepseek-chat", "sys", "你好")
+        assert llm_cache.get(key) is None
+
+        llm_cache.put(key, "回复")
+
+        assert llm_cache.get(key) == "回复"
+
+    def test_key_depends_on_every_part(self):
+        base = llm_cache.make_key("deepseek", "m", "sys", "msg")
+        assert llm_cache.make_key("openai", "m", "sys", "msg") != base
+        assert llm_cache.make_key("deepseek", "m2", "sys", "msg") != base
+        assert llm_cache.make_key("deepseek", "m", "sys2", "msg") != base
+        assert llm_cache.make_key("deepseek", "m", "sys", "msg2") != base
+
+    def test_reopens_when_path_changes(self, monkeypatch, tmp_path):
+        llm_cache.put("k", "v1")
+        monkeypatch.setattr(llm_cache, "CACHE_PATH", str(tmp_path / "other.sqlite"))
+
+        assert llm_cache.get("k") is None
+
+    def test_disabled_by_env(self, monkeypatch):
+        assert llm_cache.enabled()
+        monkeypatch.setenv("BABEL_LLM_CACHE", "0")
+        assert not llm_cache.enabled()
@@ -0,0 +1,40 @@
+"""Tests for tools._model_cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+import tools._model_cache as model_cache
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    model_cache.clear()
+    yield
+    model_cache.clear()
+
+
+class TestModelCache:
+    """Test opt-in reuse of loaded models."""
+
+    def test_disabled_by_default_always_loads(self, monkeypatch):
+        monkeypatch.delenv("BABEL_MODEL_CACHE", raising=False)
+        loader = MagicMock(side_effect=[object(), object()])
+
+        first = model_cache.get_or_load("whisperx", loader)
+        second = model_cache.get_or_load("whisperx", loader)
+
+        assert first is not second
+        assert loader.call_count == 2
+
+    def test_enabled_reuses_model_per_key(self, monkeypatch):
+        monkeypatch.setenv("BABEL_MODEL_CACHE", "1")
+        loader = MagicMock(side_effect=lambda: object())
+
+        first = model_cache.get_or_load(("whisperx", "cpu"), loader)
+        again = model_cache.get_or_load(("whisperx", "cpu"), loader)
+        other = model_cache.get_or_load(("whisperx", "cuda"), loader)
+
+        assert first is again
+        assert other is not first
+        assert loader.call_count == 2
@@ -1,43 +1,103 @@
 """Tests for tools.reference_audio."""
 
 import json
+import math
 import os
-import tempfile
+import shutil
+import wave
+from types import SimpleNamespace
 
-from pydub import AudioSegment
-from pydub.generators import Sine
+import numpy as np
+import pytest
+import soundfile as sf
 
 from tools.reference_audio import extract_reference_audio
 
+SAMPLE_RATE = 24000
 
-def _make_audio(duration_ms: int = 15000) -> AudioSegment:
-    """Generate a simple sine wave audio segment."""
-    return Sine(440).to_audio_segment(duration=duration_ms)
+
+def _sine(duration_ms: int, sr: int = SAMPLE_RATE, freq: int = 440) -> np.ndarray:
+    """Full-scale sine samples, matching pydub's 0 dBFS Sine generator."""
+    t = np.arange(int(sr * duration_ms / 1000)) / sr
+    return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+
+def _write_sine_wav(path: str, duration_ms: int, sr: int = SAMPLE_RATE, freq: int = 440) -> None:
+    sf.write(path, _sine(duration_ms, sr, freq), sr, subtype="PCM_16")
+
+
+@pytest.fixture(scope="session")
+def _sine_wav_cache(tmp_path_factory):
+    """Return a lookup that writes each sine WAV duration once per session."""
+    cache_dir = tmp_path_factory.mktemp("sine_cache")
+    cache: dict[int, str] = {}
+
+    def _get(duration_ms: int) -> str:
+        if duration_ms not in cache:
+            path = str(cache_dir / f"sine_{duration_ms}.wav")
+            _write_sine_wav(path, duration_ms)
+            cache[duration_ms] = path
+        return cache[duration_ms]
+
+    return _get
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """String paths used by every test, computed once per test."""
+    return SimpleNamespace(
+        dir=str(tmp_path),
+        input=str(tmp_path / "input.wav"),
+        metadata=str(tmp_path / "ref_audio" / "ref_metadata.json"),
+    )
+
+
+@pytest.fixture
+def sine_wav(paths, _sine_wav_cache):
+    """Place a cached sine WAV at paths.input and return its path."""
+
+    def _place(duration_ms: int) -> str:
+        dest = paths.input
+        src = _sine_wav_cache(duration_ms)
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
+        return dest
+
+    return _place
+
+
+def _duration_ms(path: str) -> float:
+    """WAV duration from the header alone; no sample decode."""
+    with wave.open(path, "rb") as w:
+        return 1000 * w.getnframes() / w.getframerate()
+
+
+def _dbfs(path: str) -> float:
+    data, _ = sf.read(path)
+    return 20 * math.log10(math.sqrt(np.mean(data ** 2)) + 1e-12)
 
 
 class TestSpeakerGrouping:
     """Test that segments are grouped correctly by speaker."""
 
-    def test_single_speaker(self, tmp_path):
-        audio = _make_audio(10000)
-        audio_path = str(tmp_path / "input.wav")
-        audio.export(audio_path, format="wav")
+    def test_single_speaker(self, paths, sine_wav):
+        audio_path = sine_wav(10000)
 
         segments = [
             {"start": 0.0, "end": 5.0, "text": "Hello", "speaker": "SPEAKER_00"},
             {"start": 5.0, "end": 8.0, "text": "World", "speaker": "SPEAKER_00"},
         ]
 
-        result = extract_reference_audio(audio_path, segments, str(tmp_path))
+        result = extract_reference_audio(audio_path, segments, paths.dir)
 
         assert len(result) == 1
         assert "SPEAKER_00" in result
         assert os.path.isfile(result["SPEAKER_00"])
 
-    def test_multiple_speakers(self, tmp_path):
-        audio = _make_audio(15000)
-        audio_path = str(tmp_path / "input.wav")
-        audio.export(audio_path, format="wav")
+    def test_multiple_speakers(self, paths, sine_wav):
+        audio_path = sine_wav(15000)
 
         segments = [
             {"start": 0.0, "end": 5.0, "text": "Hi", "speaker": "SPEAKER_00"},
@@ -45,7 +105,7 @@ class TestSpeakerGrouping:
             {"start": 10.0, "end": 14.0, "text": "Bye", "speaker": "SPEAKER_00"},
         ]
 
-        result = extract_reference_audio(audio_path, segments, str(tmp_path))
+        result = extract_reference_audio(audio_path, segments, paths.dir)
 
         assert len(result) == 2
         assert "SPEAKER_00" in result
@@ -55,10 +115,8 @@ class TestSpeakerGrouping:
 class TestBestSegmentSelection:
     """Test the 3-10s selection logic."""
 
-    def test_selects_segment_in_3_to_10s_range(self, tmp_path):
-        audio = _make_audio(20000)
-        audio_path = str(tmp_path / "input.wav")
-        audio.export(audio_path, format="wav")
+    def test_selects_segment_in_3_to_10s_range(self, paths, sine_wav):
+        audio_path = sine_wav(20000)
 
         segments = [
             {"start": 0.0, "end": 2.0, "text": "Short", "speaker": "SPEAKER_00"},  # 2s - too short
@@ -66,29 +124,23 @@ class TestBestSegmentSelection:
             {"start": 7.0, "end": 19.0, "text": "Long", "speaker": "SPEAKER_00"},  # 12s - too long
         ]
 
-        result = extract_reference_audio(audio_path, segments, str(tmp_path))
-        ref_audio = AudioSegment.from_wav(result["SPEAKER_00"])
+        result = extract_reference_audio(audio_path, segments, paths.dir)
         # The 5s segment should be selected
-        assert abs(len(ref_audio) - 5000) < 100  # ~5s with some tolerance
+        assert abs(_duration_ms(result["SPEAKER_00"]) - 5000) < 100  # ~5s with some tolerance
 
-    def test_clamps_long_segment_to_10s(self, tmp_path):
-        audio = _make_audio(20000)
-        audio_path = str(tmp_path / "input.wav")
-        audio.export(audio_path, format="wav")
+    def test_clamps_long_segment_to_10s(self, paths, sine_wav):
+        audio_path = sine_wav(20000)
 
         # Only one segment, longer than 10s - should be clamped
         segments = [
             {"start": 0.0, "end": 15.0, "text": "Very long", "speaker": "SPEAKER_00"},
         ]
 
-        result = extract_reference_audio(audio_path, segments, str(tmp_path))
-        ref_audio = AudioSegment.from_wav(result["SPEAKER_00"])
-        assert len(ref_audio) <= 10100  # 10s + small tolerance
+        result = extract_reference_audio(audio_path, segments, paths.dir)
+        assert _duration_ms(result["SPEAKER_00"]) <= 10100  # 10s + small tolerance
 
-    def test_composes_short_segments_when_no_3_to_10s_segment(self, tmp_path):
-        audio = _make_audio(5000)
-        audio_path = str(tmp_path / "input.wav")
-        audio.export(audio_path, format="wav")
+    def test_composes_short_segments_when_no_3_to_10s_segment(self, paths, sine_wav):
+        audio_path = sine_wav(5000)
 
         # All segments are shorter than 3s
         segments = [
@@ -97,13 +149,13 @@ class TestBestSegmentSelection:
             {"start": 2.5, "end": 3.5, "text": "C", "speaker": "SPEAKER_00"},
         ]
 
-        result = extract_reference_audio(audio_path, segments, str(tmp_path))
-        ref_audio = AudioSegment.from_wav(result["SPEAKER_00"])
+        result = extract_reference_audio(audio_path, segments, paths.dir)
         # Should compose multiple short segments with tiny gaps to get a longer ref.
         # 1.0s + 1.5s + 1.0s + 2*50ms gap = ~3.6s
-        assert abs(len(ref_audio) - 3600) < 150
+        assert abs(_duration_ms(result["SPEAKER_00"]) - 3600) < 150
 
-        metadata = json.loads((tmp_path / "ref_audio" / "ref_metadata.json").read_text(encoding="utf-8"))
+        with open(paths.metadata, encoding="utf-8") as f:
+            metadata = json.load(f)
         speaker_meta = metadata["speakers"]["SPEAKER_00"]
         assert speaker_meta["mode"].startswith("composed/")
         assert speaker_meta["ref_text"] == "A B C"
@@ -112,23 +164,81 @@ class TestBestSegmentSelection:
 class TestQualitySelection:
     """Test quality-based scoring for reference clip selection."""
 
-    def test_prefers_higher_quality_clip_when_duration_equal(self, tmp_path):
+    def test_prefers_higher_quality_clip_when_duration_equal(self, paths):
         # Poor clip first (mostly silence), good clip second (continuous voiced tone).
-        poor = AudioSegment.silent(duration=4500) + Sine(440).to_audio_segment(duration=500)
-        good = Sine(440).to_audio_segment(duration=5000)
-        audio = poor + good
-
-        audio_path = str(tmp_path / "input.wav")
-        audio.export(audio_path, format="wav")
+        silent = np.zeros(int(SAMPLE_RATE * 4.5), dtype=np.float32)
+        audio_path = paths.input
+        sf.write(
+            audio_path,
+            np.concatenate([silent, _sine(500), _sine(5000)]),
+            SAMPLE_RATE,
+            subtype="PCM_16",
+        )
 
         segments = [
             {"start": 0.0, "end": 5.0, "text": "Poor", "speaker": "SPEAKER_00"},
             {"start": 5.0, "end": 10.0, "text": "Good", "speaker": "SPEAKER_00"},
         ]
 
-        result = extract_reference_audio(audio_path, segments, str(tmp_path))
-        ref_audio = AudioSegment.from_wav(result["SPEAKER_00"])
-
+        result = extract_reference_audio(audio_path, segments, paths.dir)
         # If scoring works, it should pick the second segment (much louder on average).
-        assert abs(len(ref_audio) - 5000) < 100
-        assert ref_audio.dBFS > -8.0
+        assert abs(_duration_ms(result["SPEAKER_00"]) - 5000) < 100
+        assert _dbfs(result["SPEAKER_00"]) > -8.0
+
+
+class TestSourceDecoding:
+    """Test decoding the source audio once into mono samples."""
+
+    def test_stereo_source_gives_mono_reference(self, paths):
+        stereo = np.stack([_sine(6000), _sine(6000)], axis=1)
+        sf.write(paths.input, stereo, SAMPLE_RATE, subtype="PCM_16")
+        segments = [{"start": 0.0, "end": 5.0, "text": "Hi", "speaker": "SPEAKER_00"}]
+
+        result = extract_reference_audio(paths.input, segments, paths.dir)
+
+        info = sf.info(result["SPEAKER_00"])
+        assert info.channels == 1
+        assert info.samplerate == SAMPLE_RATE
+        assert abs(_duration_ms(result["SPEAKER_00"]) - 5000) < 100
+
+
+class TestSourceHashReuse:
+    """Test reuse of previously extracted references for the same source."""
+
+    def _segments(self):
+        return [
+            {"start": 0.0, "end": 5.0, "text": "Hi", "speaker": "SPEAKER_00"},
+            {"start": 5.0, "end": 9.0, "text": "Hey", "speaker": "SPEAKER_01"},
+        ]
+
+    def test_reuses_refs_when_source_hash_matches(self, paths, monkeypatch, sine_wav):
+        import tools.reference_audio as mod
+
+        audio_path = sine_wav(10000)
+        first = extract_reference_audio(
+            audio_path, self._segments(), paths.dir, source_sha256="abc"
+        )
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("source audio should not be decoded again")
+
+        monkeypatch.setattr(mod, "_load_mono_pcm", _fail)
+        second = extract_reference_audio(
+            audio_path, self._segments(), paths.dir, source_sha256="abc"
+        )
+
+        assert second == first
+
+    def test_reextracts_when_source_hash_changes(self, paths, sine_wav):
+        audio_path = sine_wav(10000)
+        extract_reference_audio(
+            audio_path, self._segments(), paths.dir, source_sha256="abc"
+        )
+
+        extract_reference_audio(
+            audio_path, self._segments(), paths.dir, source_sha256="def"
+        )
+
+        with open(paths.metadata, encoding="utf-8") as f:
+            metadata = json.load(f)
+        assert metadata["source_sha256"] == "def"
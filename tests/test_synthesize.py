@@ -2,143 +2,295 @@
 
 import json
 import sys
-from types import ModuleType
+from types import ModuleType, SimpleNamespace
 from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
+import torch
 
+import tools.synthesize as _synth
 
-@pytest.fixture(autouse=True)
-def _fake_qwen_tts(monkeypatch):
-    """Provide a fake qwen_tts module."""
-    fake = ModuleType("qwen_tts")
-    fake.Qwen3TTSModel = MagicMock()
-    monkeypatch.setitem(sys.modules, "qwen_tts", fake)
-    yield fake
+
+@pytest.fixture(scope="module")
+def _fake_module_objects():
+    """Build the fake backend modules once; _fake_modules resets them per test."""
+    qwen = ModuleType("qwen_tts")
+    qwen.Qwen3TTSModel = MagicMock()
+    sf = ModuleType("soundfile")
+    sf.write = MagicMock()
+    indextts = ModuleType("indextts")
+    infer_v2 = ModuleType("indextts.infer_v2")
+    infer_v2.IndexTTS2 = MagicMock()
+    return SimpleNamespace(qwen=qwen, sf=sf, indextts=indextts, infer_v2=infer_v2)
 
 
 @pytest.fixture(autouse=True)
-def _fake_soundfile(monkeypatch):
-    """Provide a fake soundfile module."""
-    fake = ModuleType("soundfile")
-    fake.write = MagicMock()
-    monkeypatch.setitem(sys.modules, "soundfile", fake)
-    yield fake
+def _fake_modules(monkeypatch, _fake_module_objects):
+    """Install fake qwen_tts, soundfile and indextts.infer_v2 modules."""
+    ns = _fake_module_objects
+    for mock in (ns.qwen.Qwen3TTSModel, ns.sf.write, ns.infer_v2.IndexTTS2):
+        mock.reset_mock(return_value=True, side_effect=True)
+    monkeypatch.setitem(sys.modules, "qwen_tts", ns.qwen)
+    monkeypatch.setitem(sys.modules, "soundfile", ns.sf)
+    monkeypatch.setitem(sys.modules, "indextts", ns.indextts)
+    monkeypatch.setitem(sys.modules, "indextts.infer_v2", ns.infer_v2)
+    yield ns
+
+
+# Shared, never mutated: the code under test only passes these to sf.write.
+_EMPTY_WAV = np.zeros(1000, dtype=np.float32)
+_EMPTY_TTS_OUTPUT = ([_EMPTY_WAV], 24000)
 
 
-@pytest.fixture
-def _fake_indextts(monkeypatch):
-    """Provide fake indextts.infer_v2 module."""
-    fake_pkg = ModuleType("indextts")
-    fake_infer_v2 = ModuleType("indextts.infer_v2")
-    fake_infer_v2.IndexTTS2 = MagicMock()
-    monkeypatch.setitem(sys.modules, "indextts", fake_pkg)
-    monkeypatch.setitem(sys.modules, "indextts.infer_v2", fake_infer_v2)
-    yield fake_infer_v2
+def _batched_wavs(text, language, voice_clone_prompt):
+    return [_EMPTY_WAV] * len(text), 24000
 
 
 class TestDeviceDtypeSelection:
     """Test device/dtype/attention logic."""
 
-    def test_cpu_uses_float32_sdpa(self, monkeypatch, _fake_qwen_tts):
-        import tools.synthesize as mod
-        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
-        import torch
+    @pytest.mark.parametrize(
+        "device,expected_dtype,patch_flash",
+        [
+            ("cpu", "float32", False),
+            ("mps", "bfloat16", False),
+            ("cuda", "bfloat16", True),  # CUDA without flash_attn falls back to sdpa
+        ],
+    )
+    def test_dtype_and_sdpa_attention(
+        self, monkeypatch, _fake_modules, device, expected_dtype, patch_flash
+    ):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: device)
+        if patch_flash:
+            # A None entry in sys.modules makes `import flash_attn` raise ImportError
+            monkeypatch.setitem(sys.modules, "flash_attn", None)
 
         tts_mock = MagicMock()
-        tts_mock.generate_voice_clone.return_value = ([np.zeros(1000)], 24000)
-        _fake_qwen_tts.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
         segments = [{"start": 0.0, "end": 1.0, "text": "Hi", "text_zh": "你好", "speaker": "S0"}]
         ref_paths = {"S0": "/tmp/ref.wav"}
 
         mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="qwen3")
 
-        call_kwargs = _fake_qwen_tts.Qwen3TTSModel.from_pretrained.call_args[1]
-        assert call_kwargs["dtype"] == torch.float32
+        call_kwargs = _fake_modules.qwen.Qwen3TTSModel.from_pretrained.call_args[1]
+        assert call_kwargs["dtype"] == getattr(torch, expected_dtype)
         assert call_kwargs["attn_implementation"] == "sdpa"
 
-    def test_mps_uses_bfloat16_sdpa(self, monkeypatch, _fake_qwen_tts):
-        import tools.synthesize as mod
-        monkeypatch.setattr(mod, "get_device", lambda: "mps")
-        import torch
+
+class TestSynthesizeCallFlow:
+    """Test the TTS call sequence."""
+
+    def test_generates_wav_for_each_segment(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         tts_mock = MagicMock()
-        tts_mock.generate_voice_clone.return_value = ([np.zeros(1000)], 24000)
-        _fake_qwen_tts.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
+        tts_mock.create_voice_clone_prompt.return_value = "prompt"
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
-        segments = [{"start": 0.0, "end": 1.0, "text": "Hi", "text_zh": "你好", "speaker": "S0"}]
-        ref_paths = {"S0": "/tmp/ref.wav"}
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "Hello", "text_zh": "你好", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "World", "text_zh": "世界", "speaker": "S1"},
+            {"start": 2.0, "end": 3.0, "text": "Bye", "text_zh": "再见", "speaker": "S0"},
+        ]
+        ref_paths = {"S0": "/tmp/ref_s0.wav", "S1": "/tmp/ref_s1.wav"}
 
-        mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="qwen3")
+        result = mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="qwen3")
 
-        call_kwargs = _fake_qwen_tts.Qwen3TTSModel.from_pretrained.call_args[1]
-        assert call_kwargs["dtype"] == torch.bfloat16
-        assert call_kwargs["attn_implementation"] == "sdpa"
+        assert len(result) == 3
+        # One clone prompt per speaker, one batched generate call per speaker
+        prompt_calls = [c.kwargs for c in tts_mock.create_voice_clone_prompt.call_args_list]
+        assert prompt_calls == [
+            {"ref_audio": "/tmp/ref_s0.wav", "ref_text": "Hello"},
+            {"ref_audio": "/tmp/ref_s1.wav", "ref_text": "World"},
+        ]
+        batched_texts = [c.kwargs["text"] for c in tts_mock.generate_voice_clone.call_args_list]
+        assert batched_texts == [["你好", "再见"], ["世界"]]
 
-    def test_cuda_without_flash_attn_uses_sdpa(self, monkeypatch, _fake_qwen_tts):
-        import tools.synthesize as mod
-        monkeypatch.setattr(mod, "get_device", lambda: "cuda")
-        # Ensure flash_attn is NOT importable
-        monkeypatch.delitem(sys.modules, "flash_attn", raising=False)
-        import builtins
-        original_import = builtins.__import__
-        def _no_flash(name, *args, **kwargs):
-            if name == "flash_attn":
-                raise ImportError("no flash_attn")
-            return original_import(name, *args, **kwargs)
-        monkeypatch.setattr(builtins, "__import__", _no_flash)
-
-        import torch
+    def test_ready_batches_drive_synthesis_order(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         tts_mock = MagicMock()
-        tts_mock.generate_voice_clone.return_value = ([np.zeros(1000)], 24000)
-        _fake_qwen_tts.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
+        tts_mock.create_voice_clone_prompt.return_value = "prompt"
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
-        segments = [{"start": 0.0, "end": 1.0, "text": "Hi", "text_zh": "你好", "speaker": "S0"}]
-        ref_paths = {"S0": "/tmp/ref.wav"}
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "A", "text_zh": "甲", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "B", "text_zh": "乙", "speaker": "S0"},
+            {"start": 2.0, "end": 3.0, "text": "C", "text_zh": "丙", "speaker": "S0"},
+        ]
 
-        mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="qwen3")
+        result = mod.synthesize_segments(
+            segments,
+            {"S0": "/tmp/ref.wav"},
+            "/tmp/work",
+            tts_backend="qwen3",
+            ready_batches=iter([[2], [0, 1]]),
+        )
 
-        call_kwargs = _fake_qwen_tts.Qwen3TTSModel.from_pretrained.call_args[1]
-        assert call_kwargs["dtype"] == torch.bfloat16
-        assert call_kwargs["attn_implementation"] == "sdpa"
+        texts = [c.kwargs["text"] for c in tts_mock.generate_voice_clone.call_args_list]
+        assert texts == [["丙"], ["甲", "乙"]]
+        assert [p.rsplit("/", 1)[-1] for p in result] == [
+            "seg_0000.wav",
+            "seg_0001.wav",
+            "seg_0002.wav",
+        ]
 
+    def test_ready_batches_missing_segment_raises(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
-class TestSynthesizeCallFlow:
-    """Test the TTS call sequence."""
+        tts_mock = MagicMock()
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
-    def test_generates_wav_for_each_segment(self, monkeypatch, _fake_qwen_tts, _fake_soundfile):
-        import tools.synthesize as mod
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "A", "text_zh": "甲", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "B", "text_zh": "乙", "speaker": "S0"},
+        ]
+
+        with pytest.raises(RuntimeError):
+            mod.synthesize_segments(
+                segments,
+                {"S0": "/tmp/ref.wav"},
+                "/tmp/work",
+                tts_backend="qwen3",
+                ready_batches=iter([[0]]),
+            )
+
+    def test_batches_split_by_batch_size(self, monkeypatch, _fake_modules):
+        mod = _synth
         monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         tts_mock = MagicMock()
-        tts_mock.generate_voice_clone.return_value = ([np.zeros(1000)], 24000)
-        tts_mock.create_voice_clone_prompt.return_value = "prompt"
-        _fake_qwen_tts.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
+        tts_mock.create_voice_clone_prompt.return_value = ["prompt"]
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
         segments = [
-            {"start": 0.0, "end": 1.0, "text": "Hello", "text_zh": "你好", "speaker": "S0"},
-            {"start": 1.0, "end": 2.0, "text": "World", "text_zh": "世界", "speaker": "S1"},
-            {"start": 2.0, "end": 3.0, "text": "Bye", "text_zh": "再见", "speaker": "S0"},
+            {"start": float(i), "end": float(i + 1), "text": "x", "text_zh": "字" * (5 - i), "speaker": "S0"}
+            for i in range(5)
         ]
-        ref_paths = {"S0": "/tmp/ref_s0.wav", "S1": "/tmp/ref_s1.wav"}
 
-        result = mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="qwen3")
+        result = mod.synthesize_segments(
+            segments, {"S0": "/tmp/ref.wav"}, "/tmp/work", tts_backend="qwen3", batch_size=2
+        )
 
-        assert len(result) == 3
-        assert tts_mock.generate_voice_clone.call_count == 3
-        assert tts_mock.create_voice_clone_prompt.call_count == 2  # one per speaker
+        calls = tts_mock.generate_voice_clone.call_args_list
+        assert [len(c.kwargs["text"]) for c in calls] == [2, 2, 1]
+        # Shortest texts are batched together to limit padding
+        assert calls[0].kwargs["text"] == ["字", "字字"]
+        assert calls[0].kwargs["voice_clone_prompt"] == ["prompt", "prompt"]
+        assert len(result) == 5
+
+    def test_mismatched_batch_output_raises(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
+
+        tts_mock = MagicMock()
+        tts_mock.generate_voice_clone.return_value = _EMPTY_TTS_OUTPUT
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "A", "text_zh": "甲", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "B", "text_zh": "乙", "speaker": "S0"},
+        ]
 
-    def test_voice_clone_prompt_uses_first_segment_text(self, monkeypatch, _fake_qwen_tts, _fake_soundfile):
-        import tools.synthesize as mod
+        with pytest.raises(RuntimeError):
+            mod.synthesize_segments(segments, {"S0": "/tmp/ref.wav"}, "/tmp/work", tts_backend="qwen3")
+
+    def test_failed_clip_write_raises(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
+        monkeypatch.setattr(mod.sf, "write", MagicMock(side_effect=OSError("disk full")))
+
+        tts_mock = MagicMock()
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+
+        segments = [{"start": 0.0, "end": 1.0, "text": "A", "text_zh": "甲", "speaker": "S0"}]
+
+        with pytest.raises(OSError, match="disk full"):
+            mod.synthesize_segments(segments, {"S0": "/tmp/ref.wav"}, "/tmp/work", tts_backend="qwen3")
+
+    def test_clip_cache_hits_skip_model_load(self, tmp_path, monkeypatch, _fake_modules):
+        mod = _synth
+        from tools.tts_cache import TTSClipCache
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
+
+        def _fake_infer(spk_audio_prompt, text, output_path, verbose):
+            with open(output_path, "wb") as f:
+                f.write(text.encode("utf-8"))
+
+        tts_mock = MagicMock()
+        tts_mock.infer.side_effect = _fake_infer
+        _fake_modules.infer_v2.IndexTTS2.return_value = tts_mock
+
+        ref_path = tmp_path / "ref.wav"
+        ref_path.write_bytes(b"ref")
+        segments = [
+            {"start": 0.0, "end": 1.0, "text_zh": "你好", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text_zh": "世界", "speaker": "S0"},
+        ]
+        ref_paths = {"S0": str(ref_path)}
+
+        mod.synthesize_segments(
+            segments, ref_paths, str(tmp_path), clip_cache=TTSClipCache(str(tmp_path), "src")
+        )
+        assert tts_mock.infer.call_count == 2
+
+        _fake_modules.infer_v2.IndexTTS2.reset_mock()
+        result = mod.synthesize_segments(
+            segments, ref_paths, str(tmp_path), clip_cache=TTSClipCache(str(tmp_path), "src")
+        )
+
+        _fake_modules.infer_v2.IndexTTS2.assert_not_called()
+        with open(result[1], "rb") as f:
+            assert f.read().decode("utf-8") == "世界"
+
+    def test_repeated_text_is_synthesized_once(self, tmp_path, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
+
+        def _fake_infer(spk_audio_prompt, text, output_path, verbose):
+            with open(output_path, "wb") as f:
+                f.write(f"{spk_audio_prompt}:{text}".encode("utf-8"))
+
+        tts_mock = MagicMock()
+        tts_mock.infer.side_effect = _fake_infer
+        _fake_modules.infer_v2.IndexTTS2.return_value = tts_mock
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text_zh": "对。", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text_zh": "对。", "speaker": "S1"},
+            {"start": 2.0, "end": 3.0, "text_zh": "对。", "speaker": "S0"},
+        ]
+        ref_paths = {"S0": "s0.wav", "S1": "s1.wav"}
+
+        result = mod.synthesize_segments(
+            segments, ref_paths, str(tmp_path), ready_batches=iter([[0, 1], [2]])
+        )
+
+        # Same text, different speaker is still synthesized separately.
+        assert tts_mock.infer.call_count == 2
+        with open(result[2], "rb") as f:
+            assert f.read().decode("utf-8") == "s0.wav:对。"
+
+    def test_voice_clone_prompt_uses_first_segment_text(self, monkeypatch, _fake_modules):
+        mod = _synth
         monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         tts_mock = MagicMock()
-        tts_mock.generate_voice_clone.return_value = ([np.zeros(1000)], 24000)
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
         tts_mock.create_voice_clone_prompt.return_value = "prompt"
-        _fake_qwen_tts.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
         segments = [
             {"start": 0.0, "end": 1.0, "text": "First", "text_zh": "第一", "speaker": "S0"},
@@ -149,21 +301,19 @@ class TestSynthesizeCallFlow:
         mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="qwen3")
 
         # Should use the first segment's text as ref_text
-        tts_mock.create_voice_clone_prompt.assert_called_once_with(
-            ref_audio="/tmp/ref.wav",
-            ref_text="First",
-        )
+        prompt_calls = [c.kwargs for c in tts_mock.create_voice_clone_prompt.call_args_list]
+        assert prompt_calls == [{"ref_audio": "/tmp/ref.wav", "ref_text": "First"}]
 
     def test_voice_clone_prompt_prefers_ref_metadata_text(
-        self, tmp_path, monkeypatch, _fake_qwen_tts, _fake_soundfile
+        self, tmp_path, monkeypatch, _fake_modules
     ):
-        import tools.synthesize as mod
+        mod = _synth
         monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         tts_mock = MagicMock()
-        tts_mock.generate_voice_clone.return_value = ([np.zeros(1000)], 24000)
+        tts_mock.generate_voice_clone.side_effect = _batched_wavs
         tts_mock.create_voice_clone_prompt.return_value = "prompt"
-        _fake_qwen_tts.Qwen3TTSModel.from_pretrained.return_value = tts_mock
+        _fake_modules.qwen.Qwen3TTSModel.from_pretrained.return_value = tts_mock
 
         work_dir = tmp_path / "work"
         ref_dir = work_dir / "ref_audio"
@@ -191,13 +341,11 @@ class TestSynthesizeCallFlow:
 
         mod.synthesize_segments(segments, ref_paths, str(work_dir), tts_backend="qwen3")
 
-        tts_mock.create_voice_clone_prompt.assert_called_once_with(
-            ref_audio="/tmp/ref.wav",
-            ref_text="metadata ref text",
-        )
+        prompt_calls = [c.kwargs for c in tts_mock.create_voice_clone_prompt.call_args_list]
+        assert prompt_calls == [{"ref_audio": "/tmp/ref.wav", "ref_text": "metadata ref text"}]
 
     def test_invalid_backend_raises_value_error(self, monkeypatch):
-        import tools.synthesize as mod
+        mod = _synth
         monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         segments = [{"start": 0.0, "end": 1.0, "text_zh": "你好", "speaker": "S0"}]
@@ -206,12 +354,12 @@ class TestSynthesizeCallFlow:
         with pytest.raises(ValueError):
             mod.synthesize_segments(segments, ref_paths, "/tmp/work", tts_backend="unknown")
 
-    def test_default_backend_indextts2_calls_infer(self, monkeypatch, _fake_indextts):
-        import tools.synthesize as mod
+    def test_default_backend_indextts2_calls_infer(self, monkeypatch, _fake_modules):
+        mod = _synth
         monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
         tts_mock = MagicMock()
-        _fake_indextts.IndexTTS2.return_value = tts_mock
+        _fake_modules.infer_v2.IndexTTS2.return_value = tts_mock
 
         segments = [
             {"start": 0.0, "end": 1.0, "text_zh": "你好", "speaker": "S0"},
@@ -226,7 +374,7 @@ class TestSynthesizeCallFlow:
         )
 
         assert len(result) == 2
-        _fake_indextts.IndexTTS2.assert_called_once_with(
+        _fake_modules.infer_v2.IndexTTS2.assert_called_once_with(
             cfg_path="checkpoints/config.yaml",
             model_dir="checkpoints",
             use_fp16=False,
@@ -239,12 +387,62 @@ class TestSynthesizeCallFlow:
         assert first_call["spk_audio_prompt"] == "/tmp/ref_s0.wav"
         assert first_call["text"] == "你好"
 
-    def test_indextts2_cuda_uses_cuda0(self, monkeypatch, _fake_indextts):
-        import tools.synthesize as mod
+    def test_ready_batch_starts_with_previous_speaker(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cpu")
+
+        tts_mock = MagicMock()
+        _fake_modules.infer_v2.IndexTTS2.return_value = tts_mock
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text_zh": "一", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text_zh": "二", "speaker": "S1"},
+            {"start": 2.0, "end": 3.0, "text_zh": "三", "speaker": "S0"},
+            {"start": 3.0, "end": 4.0, "text_zh": "四", "speaker": "S1"},
+        ]
+        ref_paths = {"S0": "/tmp/ref_s0.wav", "S1": "/tmp/ref_s1.wav"}
+
+        mod.synthesize_segments(
+            segments, ref_paths, "/tmp/work", ready_batches=iter([[0, 1], [2, 3]])
+        )
+
+        prompts = [c.kwargs["spk_audio_prompt"] for c in tts_mock.infer.call_args_list]
+        # The second batch continues with S1, so the reference switches only twice.
+        assert prompts == [
+            "/tmp/ref_s0.wav",
+            "/tmp/ref_s1.wav",
+            "/tmp/ref_s1.wav",
+            "/tmp/ref_s0.wav",
+        ]
+
+    def test_index_tts_compile_passed_when_supported(self, monkeypatch, _fake_modules):
+        mod = _synth
+        monkeypatch.setattr(mod, "get_device", lambda: "cuda")
+        created = []
+
+        class _IndexTTS2:
+            def __init__(self, cfg_path, model_dir, use_fp16, device, use_cuda_kernel,
+                         use_deepspeed, use_torch_compile=False):
+                created.append(use_torch_compile)
+
+            def infer(self, **kwargs):
+                pass
+
+        monkeypatch.setattr(_fake_modules.infer_v2, "IndexTTS2", _IndexTTS2)
+        segments = [{"start": 0.0, "end": 1.0, "text_zh": "你好", "speaker": "S0"}]
+
+        mod.synthesize_segments(
+            segments, {"S0": "/tmp/ref_s0.wav"}, "/tmp/work", index_tts_compile=True
+        )
+
+        assert created == [True]
+
+    def test_indextts2_cuda_uses_cuda0(self, monkeypatch, _fake_modules):
+        mod = _synth
         monkeypatch.setattr(mod, "get_device", lambda: "cuda")
 
         tts_mock = MagicMock()
-        _fake_indextts.IndexTTS2.return_value = tts_mock
+        _fake_modules.infer_v2.IndexTTS2.return_value = tts_mock
 
         segments = [{"start": 0.0, "end": 1.0, "text_zh": "你好", "speaker": "S0"}]
         ref_paths = {"S0": "/tmp/ref_s0.wav"}
@@ -258,7 +456,7 @@ class TestSynthesizeCallFlow:
             index_tts_cfg_path="/models/index-tts2/my-config.yaml",
         )
 
-        _fake_indextts.IndexTTS2.assert_called_once_with(
+        _fake_modules.infer_v2.IndexTTS2.assert_called_once_with(
             cfg_path="/models/index-tts2/my-config.yaml",
             model_dir="/models/index-tts2",
             use_fp16=True,
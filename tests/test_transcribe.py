@@ -11,26 +11,54 @@ import pytest
 def _make_fake_whisperx():
     fake = ModuleType("whisperx")
     fake.load_model = MagicMock()
-    fake.load_audio = MagicMock(return_value="audio_array")
-    fake.load_align_model = MagicMock(return_value=("align_model", "metadata"))
+    fake.load_audio = MagicMock()
+    fake.load_align_model = MagicMock()
     fake.align = MagicMock()
     fake.assign_word_speakers = MagicMock()
     return fake
 
 
-@pytest.fixture(autouse=True)
-def _setup(monkeypatch):
-    """Inject fake whisperx and force CPU device into tools.transcribe."""
+def _reset_fake_whisperx(fake, fake_diarize) -> None:
+    """Clear calls and configured results left over from the previous test."""
+    for name in ("load_model", "load_audio", "load_align_model", "align", "assign_word_speakers"):
+        getattr(fake, name).reset_mock(return_value=True, side_effect=True)
+    fake_diarize.DiarizationPipeline.reset_mock(return_value=True, side_effect=True)
+    fake.load_audio.return_value = "audio_array"
+    fake.load_align_model.return_value = ("align_model", "metadata")
+
+
+@pytest.fixture(scope="module")
+def _fake_whisperx_modules():
+    """Build the fake whisperx modules once; tests reset them between runs."""
     fake = _make_fake_whisperx()
     fake_diarize = ModuleType("whisperx.diarize")
     fake_diarize.DiarizationPipeline = MagicMock()
+    return fake, fake_diarize
+
+
+@pytest.fixture(scope="module")
+def _transcribe_module(_fake_whisperx_modules):
+    """Import tools.transcribe once against the fake whisperx."""
+    fake, fake_diarize = _fake_whisperx_modules
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "whisperx", fake)
+        mp.setitem(sys.modules, "whisperx.diarize", fake_diarize)
+        # Reload so the module-level `import whisperx` binds the fake
+        mod = importlib.reload(importlib.import_module("tools.transcribe"))
+    return mod
 
+
+@pytest.fixture(autouse=True)
+def _setup(monkeypatch, _fake_whisperx_modules, _transcribe_module):
+    """Inject fake whisperx and force CPU device into tools.transcribe."""
+    fake, fake_diarize = _fake_whisperx_modules
+    _reset_fake_whisperx(fake, fake_diarize)
+
+    # whisperx.diarize is imported inside transcribe(), so keep the fakes installed
     monkeypatch.setitem(sys.modules, "whisperx", fake)
     monkeypatch.setitem(sys.modules, "whisperx.diarize", fake_diarize)
 
-    # Reload tools.transcribe so it picks up the fake whisperx
-    mod = importlib.import_module("tools.transcribe")
-    importlib.reload(mod)
+    mod = _transcribe_module
     # Patch get_device to return cpu by default
     monkeypatch.setattr(mod, "get_device", lambda: "cpu")
 
@@ -59,7 +87,7 @@ class TestTranscribeCallFlow:
 
         result = mod.transcribe("test.mp3", model_size="base")
 
-        whisperx.load_model.assert_called_once_with("base", "cpu", compute_type="float32")
+        whisperx.load_model.assert_called_once_with("base", "cpu", compute_type="int8")
         whisperx.load_audio.assert_called_once_with("test.mp3")
         model.transcribe.assert_called_once()
         assert len(result) == 1
@@ -81,6 +109,41 @@ class TestTranscribeCallFlow:
         whisperx.load_model.assert_called_once_with("large-v3", "cuda", compute_type="float16")
 
 
+    def test_explicit_compute_type_is_passed_through(self, _setup, monkeypatch):
+        whisperx, _, mod = _setup
+        monkeypatch.setattr(mod, "get_device", lambda: "cuda")
+        monkeypatch.delenv("HF_TOKEN", raising=False)
+
+        raw_segments = [{"start": 0.0, "end": 1.0, "text": "Hi", "speaker": "SPEAKER_00"}]
+        whisperx.align.return_value = {"segments": raw_segments}
+        model = MagicMock()
+        model.transcribe.return_value = {"segments": raw_segments, "language": "en"}
+        whisperx.load_model.return_value = model
+
+        mod.transcribe("test.mp3", compute_type="int8_float16")
+
+        whisperx.load_model.assert_called_once_with("large-v3", "cuda", compute_type="int8_float16")
+
+    def test_cpu_falls_back_from_float16_compute_type(self, _setup, monkeypatch):
+        whisperx, _, mod = _setup
+        monkeypatch.delenv("HF_TOKEN", raising=False)
+
+        raw_segments = [{"start": 0.0, "end": 1.0, "text": "Hi", "speaker": "SPEAKER_00"}]
+        whisperx.align.return_value = {"segments": raw_segments}
+        model = MagicMock()
+        model.transcribe.return_value = {"segments": raw_segments, "language": "en"}
+        whisperx.load_model.return_value = model
+
+        mod.transcribe("test.mp3", compute_type="int8_float16")
+
+        whisperx.load_model.assert_called_once_with("large-v3", "cpu", compute_type="int8")
+
+    def test_rejects_unknown_compute_type(self, _setup):
+        _, _, mod = _setup
+
+        with pytest.raises(ValueError):
+            mod.transcribe("test.mp3", compute_type="int4")
+
 class TestNoDiarization:
     """When HF_TOKEN is not set, diarization is skipped."""
 
@@ -131,3 +194,43 @@ class TestWithDiarization:
         assert result[1]["speaker"] == "SPEAKER_02"
         assert result[0]["text"] == "Hello"
         assert result[1]["text"] == "World"
+
+
+class TestCheckpointLoading:
+    """pyannote checkpoints load under a scoped allowlist, not a global patch."""
+
+    def test_loader_runs_with_allowlisted_globals(self, _setup):
+        import torch
+
+        _, _, mod = _setup
+        before = list(torch.serialization.get_safe_globals())
+        seen = []
+
+        def _loader():
+            seen.append(list(torch.serialization.get_safe_globals()))
+            return "model"
+
+        assert mod._load_pyannote_checkpoints(_loader) == "model"
+        assert len(seen) == 1
+        assert any(getattr(g, "__name__", "") == "defaultdict" for g in seen[0])
+        assert list(torch.serialization.get_safe_globals()) == before
+
+    def test_unpickling_error_retries_with_scoped_full_load(self, _setup):
+        import pickle
+
+        import torch
+
+        _, _, mod = _setup
+        original_load = torch.load
+        calls = []
+
+        def _loader():
+            calls.append(torch.load)
+            if len(calls) == 1:
+                raise pickle.UnpicklingError("Unsupported global")
+            return "model"
+
+        assert mod._load_pyannote_checkpoints(_loader) == "model"
+        assert len(calls) == 2
+        assert calls[1] is not original_load
+        assert torch.load is original_load
@@ -1,5 +1,6 @@
 """Tests for tools.translate."""
 
+import json
 from unittest.mock import MagicMock
 
 import pytest
@@ -11,6 +12,12 @@ def _set_api_keys(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "fake_openai_key")
 
 
+@pytest.fixture(autouse=True)
+def _isolate_llm_cache(monkeypatch, tmp_path):
+    import tools._llm_cache as llm_cache
+    monkeypatch.setattr(llm_cache, "CACHE_PATH", str(tmp_path / "llm.sqlite"))
+
+
 def _make_response(text: str):
     """Create a mock API response."""
     choice = MagicMock()
@@ -83,7 +90,7 @@ class TestBatching:
 
     def test_splits_into_batches(self, monkeypatch):
         import tools.translate as mod
-        monkeypatch.setattr(mod, "BATCH_SIZE", 2)
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
 
         client = MagicMock()
         client.chat.completions.create.side_effect = [
@@ -98,20 +105,231 @@ class TestBatching:
             {"start": 2.0, "end": 3.0, "text": "C", "speaker": "S0"},
         ]
 
-        result = mod.translate_segments(segments)
+        result = mod.translate_segments(segments, batch_max_segments=2)
 
         assert client.chat.completions.create.call_count == 2
         assert result[0]["text_zh"] == "翻译A"
         assert result[1]["text_zh"] == "翻译B"
         assert result[2]["text_zh"] == "翻译C"
 
+    def test_splits_batches_by_char_budget(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            _make_response("1. 翻译A\n2. 翻译B"),
+            _make_response("1. 翻译C"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "a" * 10, "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "b" * 10, "speaker": "S0"},
+            {"start": 2.0, "end": 3.0, "text": "c" * 10, "speaker": "S0"},
+        ]
+
+        result = mod.translate_segments(segments, batch_max_chars=25)
+
+        assert client.chat.completions.create.call_count == 2
+        first_msg = client.chat.completions.create.call_args_list[0].kwargs["messages"][1]["content"]
+        assert "2. bbbbbbbbbb" in first_msg
+        assert "c" * 10 not in first_msg
+        assert [seg["text_zh"] for seg in result] == ["翻译A", "翻译B", "翻译C"]
+
+
+    def test_reports_each_finished_batch(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            _make_response("1. 翻译A\n2. 翻译B"),
+            _make_response("1. 翻译C"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "A", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "B", "speaker": "S0"},
+            {"start": 2.0, "end": 3.0, "text": "C", "speaker": "S0"},
+        ]
+        finished: list[tuple[list[int], list[str]]] = []
+
+        mod.translate_segments(
+            segments,
+            batch_max_segments=2,
+            on_batch_done=lambda idx: finished.append(
+                (idx, [segments[i].get("text_zh") for i in idx])
+            ),
+        )
+
+        assert finished == [([0, 1], ["翻译A", "翻译B"]), ([2], ["翻译C"])]
+
+    def test_dispatches_batches_concurrently(self, monkeypatch):
+        import threading
+
+        import tools.translate as mod
+        monkeypatch.setattr(mod, "BATCH_SIZE", 1)
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "3")
+
+        # Every request blocks until all three are in flight at once.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def _create(**kwargs):
+            barrier.wait()
+            text = kwargs["messages"][1]["content"].rsplit("1. ", 1)[1]
+            return _make_response(f"1. 译{text}")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = _create
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": float(i), "end": float(i + 1), "text": t, "speaker": "S0"}
+            for i, t in enumerate(["A", "B", "C"])
+        ]
+
+        result = mod.translate_segments(segments)
+
+        assert [seg["text_zh"] for seg in result] == ["译A", "译B", "译C"]
+
+    def test_blank_batches_skip_the_api(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": " ", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "", "speaker": "S0"},
+            {"start": 2.0, "end": 3.0, "text": "Hello", "speaker": "S0"},
+        ]
+        finished: list[list[int]] = []
+
+        result = mod.translate_segments(
+            segments, batch_max_segments=2, on_batch_done=finished.append
+        )
+
+        assert client.chat.completions.create.call_count == 1
+        assert [seg["text_zh"] for seg in result] == ["", "", "你好"]
+        assert sorted(finished) == [[0, 1], [2]]
+
+    def test_cancel_skips_remaining_batches(self, monkeypatch):
+        import threading
+
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
+
+        cancel = threading.Event()
+
+        def _create(**kwargs):
+            cancel.set()  # e.g. synthesis failed while this batch was in flight
+            return _make_response("1. 翻译A\n2. 翻译B")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = _create
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "A", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "B", "speaker": "S0"},
+            {"start": 2.0, "end": 3.0, "text": "C", "speaker": "S0"},
+        ]
+
+        with pytest.raises(RuntimeError, match="取消"):
+            mod.translate_segments(segments, batch_max_segments=2, cancel=cancel)
+
+        assert client.chat.completions.create.call_count == 1
+        assert "text_zh" not in segments[2]
+
+    def test_already_translated_segments_are_kept(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 世界")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "Hello", "text_zh": "你好", "speaker": "S0"},
+            {"start": 1.0, "end": 2.0, "text": "World", "speaker": "S0"},
+        ]
+        finished: list[list[int]] = []
+
+        result = mod.translate_segments(segments, on_batch_done=finished.append)
+
+        assert client.chat.completions.create.call_count == 1
+        user_msg = client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "Hello" not in user_msg
+        assert [seg["text_zh"] for seg in result] == ["你好", "世界"]
+        assert finished == [[0], [1]]
+
+    def test_untranslated_fallback_is_retried(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        # An earlier run kept the English source after a parse failure.
+        segments = [{"start": 0.0, "end": 1.0, "text": "Hello", "text_zh": "Hello", "speaker": "S0"}]
+
+        result = mod.translate_segments(segments)
+
+        assert client.chat.completions.create.call_count == 1
+        assert result[0]["text_zh"] == "你好"
+
+
+class TestChooseBatchSize:
+    """Test token-budget sizing of translation batches."""
+
+    @staticmethod
+    def _segments(n: int, chars: int) -> list[dict]:
+        return [{"text": "x" * chars} for _ in range(n)]
+
+    def test_short_lines_grow_batch(self):
+        import tools.translate as mod
+
+        # 39 chars + newline ~= 10 tokens per line -> 100 lines fit 1000 tokens, capped.
+        assert mod._choose_batch_size(self._segments(500, 39), 1000) == mod.MAX_BATCH_SIZE
+        assert mod._choose_batch_size(self._segments(500, 79), 1000) == 50
+
+    def test_long_lines_fall_back_to_default(self):
+        import tools.translate as mod
+
+        assert mod._choose_batch_size(self._segments(500, 2000), 1000) == mod.BATCH_SIZE
+
+    def test_splits_across_concurrent_workers(self):
+        import tools.translate as mod
+
+        assert mod._choose_batch_size(self._segments(400, 39), 1000, concurrency=8) == 50
+
+    def test_target_tokens_env_sets_char_budget(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_TARGET_TOKENS", "5")
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 译")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        mod.translate_segments([{"text": f"{c}" * 15} for c in "abc"])
+
+        # 20-char budget holds one 16-char line per call.
+        assert client.chat.completions.create.call_count == 3
+
 
 class TestFallback:
     """Test fallback when parsing fails."""
 
-    def test_keeps_original_text_on_parse_failure(self, monkeypatch):
+    def test_retries_misaligned_batch_per_segment(self, monkeypatch):
         client = MagicMock()
-        client.chat.completions.create.return_value = _make_response("1. 只有一行")
+        client.chat.completions.create.side_effect = [
+            _make_response("1. 只有一行"),
+            _make_response("1. 第一"),
+            _make_response(""),
+            _make_response("1. 第三"),
+        ]
         import tools.translate as mod
         monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
 
@@ -123,9 +341,192 @@ class TestFallback:
 
         result = mod.translate_segments(segments)
 
-        assert result[0]["text_zh"] == "只有一行"
+        assert client.chat.completions.create.call_count == 4
+        retry_msg = client.chat.completions.create.call_args_list[1].kwargs["messages"][1]["content"]
+        assert "1. First" in retry_msg
+        assert "Second" not in retry_msg
+        assert result[0]["text_zh"] == "第一"
+        # Empty single-segment reply keeps the original text.
         assert result[1]["text_zh"] == "Second"
-        assert result[2]["text_zh"] == "Third"
+        assert result[2]["text_zh"] == "第三"
+
+    def test_single_segment_batch_keeps_original_on_empty_reply(self, monkeypatch):
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("")
+        import tools.translate as mod
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        result = mod.translate_segments(
+            [{"start": 0.0, "end": 1.0, "text": "Only", "speaker": "S0"}]
+        )
+
+        assert client.chat.completions.create.call_count == 1
+        assert result[0]["text_zh"] == "Only"
+
+
+class TestRetry:
+    """Test backoff retries around each chat request."""
+
+    @staticmethod
+    def _rate_limit_error():
+        import openai
+
+        # Skip the SDK constructor, which wants a real httpx response.
+        exc = openai.RateLimitError.__new__(openai.RateLimitError)
+        Exception.__init__(exc, "rate limited")
+        return exc
+
+    def test_retries_rate_limit_then_succeeds(self, monkeypatch):
+        import tools.translate as mod
+        sleeps: list[float] = []
+        monkeypatch.setattr(mod.time, "sleep", sleeps.append)
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            self._rate_limit_error(),
+            self._rate_limit_error(),
+            _make_response("1. 你好"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        result = mod.translate_segments(
+            [{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}]
+        )
+
+        assert result[0]["text_zh"] == "你好"
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[1] <= 2 * mod.LLM_RETRY_BASE_SECONDS
+
+    def test_keeps_original_when_retries_exhausted(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setattr(mod.time, "sleep", lambda _: None)
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = self._rate_limit_error()
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        result = mod.translate_segments(
+            [{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}]
+        )
+
+        assert client.chat.completions.create.call_count == mod.LLM_RETRY_TRIES
+        assert result[0]["text_zh"] == "Hello"
+
+    def test_each_request_has_a_timeout(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        mod.translate_segments([{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}])
+
+        call_kwargs = client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["timeout"] == mod.LLM_REQUEST_TIMEOUT_SECONDS
+
+    def test_does_not_retry_other_errors(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = ValueError("bad request")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        with pytest.raises(ValueError):
+            mod.translate_segments(
+                [{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}]
+            )
+
+        assert client.chat.completions.create.call_count == 1
+
+
+class TestRateLimiter:
+    """Test the per-minute request/token buckets in front of chat requests."""
+
+    @staticmethod
+    def _clock(monkeypatch, mod):
+        """Fake monotonic clock that sleep() advances."""
+        now = [1000.0]
+        sleeps: list[float] = []
+
+        def _sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        monkeypatch.setattr(mod.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(mod.time, "sleep", _sleep)
+        return sleeps
+
+    def test_waits_for_request_bucket_refill(self, monkeypatch):
+        import tools.translate as mod
+        sleeps = self._clock(monkeypatch, mod)
+        limiter = mod._RateLimiter(rpm=2, tpm=None)
+
+        limiter.acquire(10)
+        limiter.acquire(10)
+        assert sleeps == []
+
+        limiter.acquire(10)
+        assert sleeps == [pytest.approx(30.0)]
+
+    def test_waits_for_token_bucket_refill(self, monkeypatch):
+        import tools.translate as mod
+        sleeps = self._clock(monkeypatch, mod)
+        limiter = mod._RateLimiter(rpm=None, tpm=600)
+
+        limiter.acquire(500)
+        limiter.acquire(200)
+
+        # 100 tokens short at 10 tokens/s
+        assert sleeps == [pytest.approx(10.0)]
+
+    def test_throttle_halves_refill_rate(self, monkeypatch):
+        import tools.translate as mod
+        sleeps = self._clock(monkeypatch, mod)
+        limiter = mod._RateLimiter(rpm=60, tpm=None)
+        for _ in range(60):
+            limiter.acquire(1)
+
+        limiter.throttle()
+        limiter.acquire(1)
+
+        assert sleeps == [pytest.approx(2.0)]
+
+    def test_provider_defaults_and_env_override(self, monkeypatch):
+        import tools.translate as mod
+
+        assert mod._rate_limiter_for("deepseek") is None
+        assert mod._rate_limiter_for("openai").rpm == 500
+
+        monkeypatch.setenv("BABEL_LLM_RPM", "0")
+        monkeypatch.setenv("BABEL_LLM_TPM", "0")
+        assert mod._rate_limiter_for("openai") is None
+
+        monkeypatch.setenv("BABEL_LLM_RPM", "20")
+        assert mod._rate_limiter_for("deepseek").rpm == 20
+
+    def test_rate_limit_error_throttles_limiter(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setattr(mod.time, "sleep", lambda _: None)
+        monkeypatch.setenv("BABEL_LLM_RPM", "1000")
+        limiter = mod._rate_limiter_for("deepseek")
+        monkeypatch.setattr(limiter, "throttle", MagicMock())
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            TestRetry._rate_limit_error(),
+            _make_response("1. 你好"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        mod.translate_segments([{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}])
+
+        limiter.throttle.assert_called_once()
+
+    def test_estimate_tokens_counts_cjk_per_char(self):
+        import tools.translate as mod
+
+        assert mod._estimate_tokens("abcdefgh") == 2
+        assert mod._estimate_tokens("你好世界") == 4
 
 
 class TestProviderSelection:
@@ -149,6 +550,7 @@ class TestProviderSelection:
 
         assert captured_kwargs == {
             "api_key": "fake_deepseek_key",
+            "max_retries": 0,
             "base_url": "https://api.deepseek.com",
         }
         call_kwargs = client.chat.completions.create.call_args.kwargs
@@ -172,7 +574,7 @@ class TestProviderSelection:
             provider="openai",
         )
 
-        assert captured_kwargs == {"api_key": "fake_openai_key"}
+        assert captured_kwargs == {"api_key": "fake_openai_key", "max_retries": 0}
         call_kwargs = client.chat.completions.create.call_args.kwargs
         assert call_kwargs["model"] == "gpt-5-mini"
         assert result[0]["text_zh"] == "你好"
@@ -192,6 +594,24 @@ class TestProviderSelection:
         call_kwargs = client.chat.completions.create.call_args.kwargs
         assert call_kwargs["model"] == "gpt-5-mini-2026-01-01"
 
+    def test_client_is_reused_across_calls(self, monkeypatch):
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        created: list[dict] = []
+
+        def _openai_factory(**kwargs):
+            created.append(kwargs)
+            return client
+
+        import tools.translate as mod
+        monkeypatch.setattr(mod, "OpenAI", _openai_factory)
+
+        segments = [{"start": 0.0, "end": 1.0, "text": "Hi", "speaker": "S0"}]
+        mod.translate_segments(segments)
+        mod.summarize_translated_segments(segments)
+
+        assert len(created) == 1
+
 
 class TestMissingApiKey:
     """Test behavior when required API keys are not set."""
@@ -256,7 +676,7 @@ class TestSummary:
             model="gpt-5-mini-2026-01-01",
         )
 
-        assert captured_kwargs == {"api_key": "fake_openai_key"}
+        assert captured_kwargs == {"api_key": "fake_openai_key", "max_retries": 0}
         call_kwargs = client.chat.completions.create.call_args.kwargs
         assert call_kwargs["model"] == "gpt-5-mini-2026-01-01"
         assert "你好" in call_kwargs["messages"][1]["content"]
@@ -278,7 +698,18 @@ class TestSummary:
 class TestDetailedSummary:
     """Test detailed translation-summary generation."""
 
+    def test_chunks_are_sized_by_estimated_tokens(self):
+        import tools.translate as mod
+
+        english = ["a" * 399] * 100  # ~100 tokens per line
+        chinese = ["字" * 399] * 100  # ~400 tokens per line
+
+        assert len(mod._split_lines_into_chunks(english, max_tokens=12000)) == 1
+        chunks = mod._split_lines_into_chunks(chinese, max_tokens=12000, overlap_lines=0)
+        assert [len(c) for c in chunks] == [30, 30, 30, 10]
+
     def test_detailed_summary_uses_chunk_merge_and_final_calls(self, monkeypatch):
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
         client = MagicMock()
         client.chat.completions.create.side_effect = [
             _make_response("分块一摘要"),
@@ -295,7 +726,7 @@ class TestDetailedSummary:
         monkeypatch.setattr(
             mod,
             "_split_lines_into_chunks",
-            lambda lines, max_chars=0, overlap_lines=0: [["第一块"], ["第二块"]],
+            lambda lines, max_tokens=0, overlap_lines=0: [["第一块"], ["第二块"]],
         )
 
         summary = mod.summarize_translated_segments_detailed(
@@ -326,6 +757,113 @@ class TestDetailedSummary:
         assert "已有综合摘要" in call_kwargs_list[2]["messages"][1]["content"]
         assert "目标篇幅：1200-1800 字；主题数量：3-5" in call_kwargs_list[3]["messages"][1]["content"]
 
+    def test_detailed_summary_maps_chunks_concurrently(self, monkeypatch):
+        import threading
+
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "3")
+
+        # All three chunk requests must be in flight before any returns.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def _create(**kwargs):
+            user_msg = kwargs["messages"][1]["content"]
+            if "个分块" in user_msg:
+                barrier.wait()
+                return _make_response(f"摘要{user_msg.rsplit('1. ', 1)[1]}")
+            if "已有综合摘要" in user_msg:
+                return _make_response("合并摘要")
+            return _make_response("# 目录")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = _create
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+        monkeypatch.setattr(
+            mod,
+            "_split_lines_into_chunks",
+            lambda lines, max_tokens=0, overlap_lines=0: [["甲"], ["乙"], ["丙"]],
+        )
+
+        summary = mod.summarize_translated_segments_detailed(
+            [{"start": 0.0, "end": 60.0, "text": "x", "text_zh": "甲", "speaker": "S0"}]
+        )
+
+        assert summary == "# 目录"
+        merge_msgs = [
+            call.kwargs["messages"][1]["content"]
+            for call in client.chat.completions.create.call_args_list
+            if "已有综合摘要" in call.kwargs["messages"][1]["content"]
+        ]
+        # Merges still fold the chunk summaries in chunk order.
+        assert "已有综合摘要：\n摘要甲" in merge_msgs[0]
+        assert "新增分块摘要：\n摘要乙" in merge_msgs[0]
+        assert "新增分块摘要：\n摘要丙" in merge_msgs[1]
+
+    def test_final_detailed_summary_call_uses_long_timeout(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            _make_response("分块一摘要"),
+            _make_response("分块二摘要"),
+            _make_response("合并摘要"),
+            _make_response("# 目录"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+        monkeypatch.setattr(
+            mod,
+            "_split_lines_into_chunks",
+            lambda lines, max_tokens=0, overlap_lines=0: [["第一块"], ["第二块"]],
+        )
+
+        mod.summarize_translated_segments_detailed(
+            [{"start": 0.0, "end": 60.0, "text": "x", "text_zh": "甲", "speaker": "S0"}]
+        )
+
+        timeouts = [
+            call.kwargs["timeout"] for call in client.chat.completions.create.call_args_list
+        ]
+        assert timeouts[:-1] == [mod.LLM_REQUEST_TIMEOUT_SECONDS] * 3
+        assert timeouts[-1] == mod.LLM_LONG_REQUEST_TIMEOUT_SECONDS
+
+    def test_detailed_summary_skips_chunk_that_exhausts_retries(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
+        monkeypatch.setattr(mod.time, "sleep", lambda _: None)
+
+        def _create(**kwargs):
+            user_msg = kwargs["messages"][1]["content"]
+            if "第 1/2 个分块" in user_msg:
+                raise TestRetry._rate_limit_error()
+            if "个分块" in user_msg:
+                return _make_response("分块二摘要")
+            if "已有综合摘要" in user_msg:
+                return _make_response("合并摘要")
+            return _make_response("# 目录")
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = _create
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+        monkeypatch.setattr(
+            mod,
+            "_split_lines_into_chunks",
+            lambda lines, max_tokens=0, overlap_lines=0: [["第一块"], ["第二块"]],
+        )
+
+        summary = mod.summarize_translated_segments_detailed(
+            [{"start": 0.0, "end": 60.0, "text": "x", "text_zh": "甲", "speaker": "S0"}]
+        )
+
+        assert summary == "# 目录"
+        merge_msg = next(
+            call.kwargs["messages"][1]["content"]
+            for call in client.chat.completions.create.call_args_list
+            if "已有综合摘要" in call.kwargs["messages"][1]["content"]
+        )
+        assert "该分块未返回可用摘要" in merge_msg
+        assert "分块二摘要" in merge_msg
+
     def test_detailed_summary_returns_placeholder_on_empty_segments(self, monkeypatch):
         client = MagicMock()
         import tools.translate as mod
@@ -353,3 +891,211 @@ class TestDetailedSummary:
         import tools.translate as mod
 
         assert mod._resolve_detailed_summary_profile(duration_seconds) == expected
+
+
+class TestSummaryBatchApi:
+    """Test Batch API submission/collection for summaries."""
+
+    @staticmethod
+    def _batch_output(rows: dict[str, str]) -> str:
+        return "\n".join(
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "response": {"body": {"choices": [{"message": {"content": text}}]}},
+                },
+                ensure_ascii=False,
+            )
+            for custom_id, text in rows.items()
+        )
+
+    def test_submit_and_collect_summary_batch(self, monkeypatch):
+        client = MagicMock()
+        client.files.create.return_value = MagicMock(id="file-in")
+        client.batches.create.return_value = MagicMock(id="batch-1")
+        client.batches.retrieve.side_effect = [
+            MagicMock(status="in_progress"),
+            MagicMock(status="completed", output_file_id="file-out"),
+        ]
+        client.files.content.return_value = MagicMock(
+            text=self._batch_output({"short": "简短总结", "detailed-0": "分块摘要"})
+        )
+        client.chat.completions.create.return_value = _make_response("# 目录\n详细总结")
+
+        import tools.translate as mod
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+        monkeypatch.setattr(mod.time, "sleep", lambda _: None)
+
+        segments = [
+            {"start": 0.0, "end": 60.0, "text": "hello", "text_zh": "你好", "speaker": "S0"},
+        ]
+        job = mod.submit_summary_batch(segments, provider="openai")
+        results = mod.collect_summary_batch(job, poll_interval=0)
+
+        upload = client.files.create.call_args.kwargs
+        assert upload["purpose"] == "batch"
+        rows = [json.loads(line) for line in upload["file"][1].decode("utf-8").splitlines()]
+        assert [row["custom_id"] for row in rows] == ["short", "detailed-0"]
+        assert rows[0]["body"]["model"] == "gpt-5-mini"
+        assert client.batches.create.call_args.kwargs["input_file_id"] == "file-in"
+
+        # Only the final pass of the detailed summary runs synchronously.
+        assert client.chat.completions.create.call_count == 1
+        assert results == {"short": "简短总结", "detailed": "# 目录\n详细总结"}
+
+    def test_collect_raises_on_failed_batch(self, monkeypatch):
+        client = MagicMock()
+        client.files.create.return_value = MagicMock(id="file-in")
+        client.batches.create.return_value = MagicMock(id="batch-1")
+        client.batches.retrieve.return_value = MagicMock(status="failed")
+
+        import tools.translate as mod
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        job = mod.submit_summary_batch(
+            [{"start": 0.0, "end": 1.0, "text": "hi", "text_zh": "你好", "speaker": "S0"}],
+            provider="openai",
+            summary_mode="short",
+        )
+
+        with pytest.raises(RuntimeError, match="failed"):
+            mod.collect_summary_batch(job, poll_interval=0)
+
+    def test_submit_rejects_non_openai_provider(self):
+        import tools.translate as mod
+
+        with pytest.raises(ValueError):
+            mod.submit_summary_batch(
+                [{"start": 0.0, "end": 1.0, "text": "hi", "speaker": "S0"}],
+                provider="deepseek",
+            )
+
+
+class TestTranslateBatchApi:
+    """Test translating all batches through one Batch API job."""
+
+    def test_translates_via_batch_api_and_retries_misaligned_batch(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_TRANSLATE_CONCURRENCY", "1")
+
+        client = MagicMock()
+        client.files.create.return_value = MagicMock(id="file-in")
+        client.batches.create.return_value = MagicMock(id="batch-1")
+        client.batches.retrieve.return_value = MagicMock(
+            status="completed", output_file_id="file-out"
+        )
+        client.files.content.return_value = MagicMock(
+            text=TestSummaryBatchApi._batch_output({"b0": "1. 翻译A\n2. 翻译B", "b1": "乱码"})
+        )
+        client.chat.completions.create.side_effect = [
+            _make_response("1. 翻译C"),
+            _make_response("1. 翻译D"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        segments = [
+            {"start": float(i), "end": float(i + 1), "text": t, "speaker": "S0"}
+            for i, t in enumerate("ABCD")
+        ]
+
+        result = mod.translate_segments(
+            segments, provider="openai", batch_max_segments=2, use_batch_api=True
+        )
+
+        upload = client.files.create.call_args.kwargs
+        rows = [json.loads(line) for line in upload["file"][1].decode("utf-8").splitlines()]
+        assert [row["custom_id"] for row in rows] == ["b0", "b1"]
+        # Only the misaligned second batch is retried synchronously, per segment.
+        assert client.chat.completions.create.call_count == 2
+        assert [seg["text_zh"] for seg in result] == ["翻译A", "翻译B", "翻译C", "翻译D"]
+
+    def test_cancel_stops_waiting_and_cancels_job(self):
+        import threading
+
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.batches.retrieve.return_value = MagicMock(status="in_progress")
+        cancel = threading.Event()
+        cancel.set()
+
+        with pytest.raises(RuntimeError, match="取消"):
+            mod._wait_chat_batch(client, "batch-1", poll_interval=60, cancel=cancel)
+
+        client.batches.cancel.assert_called_once_with("batch-1")
+
+    def test_falls_back_to_sync_requests_for_deepseek(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        result = mod.translate_segments(
+            [{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}],
+            use_batch_api=True,
+        )
+
+        client.files.create.assert_not_called()
+        assert result[0]["text_zh"] == "你好"
+
+
+class TestLlmCache:
+    """Test reuse of cached chat replies across runs."""
+
+    def _segments(self):
+        return [{"start": 0.0, "end": 1.0, "text": "Hello", "speaker": "S0"}]
+
+    def test_rerun_reuses_cached_reply(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        first = mod.translate_segments(self._segments())
+        second = mod.translate_segments(self._segments())
+
+        assert client.chat.completions.create.call_count == 1
+        assert first[0]["text_zh"] == second[0]["text_zh"] == "你好"
+
+    def test_cache_key_includes_model(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        mod.translate_segments(self._segments(), provider="openai", model="model-a")
+        mod.translate_segments(self._segments(), provider="openai", model="model-b")
+
+        assert client.chat.completions.create.call_count == 2
+
+    def test_empty_reply_is_not_cached(self, monkeypatch):
+        import tools.translate as mod
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            _make_response(""),
+            _make_response("1. 你好"),
+        ]
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        mod.translate_segments(self._segments())
+        result = mod.translate_segments(self._segments())
+
+        assert client.chat.completions.create.call_count == 2
+        assert result[0]["text_zh"] == "你好"
+
+    def test_env_disables_cache(self, monkeypatch):
+        import tools.translate as mod
+        monkeypatch.setenv("BABEL_LLM_CACHE", "0")
+
+        client = MagicMock()
+        client.chat.completions.create.return_value = _make_response("1. 你好")
+        monkeypatch.setattr(mod, "OpenAI", lambda **kw: client)
+
+        mod.translate_segments(self._segments())
+        mod.translate_segments(self._segments())
+
+        assert client.chat.completions.create.call_count == 2
@@ -0,0 +1,110 @@
+"""Tests for tools.tts_cache."""
+
+import json
+
+from tools.tts_cache import TTSClipCache, file_sha256
+
+
+def _write(path, data: bytes) -> str:
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestClipCache:
+    """Test content-hash lookups and invalidation."""
+
+    def test_store_then_fetch_across_instances(self, tmp_path):
+        ref = _write(tmp_path / "ref.wav", b"ref")
+        clip = _write(tmp_path / "clip.wav", b"clip-bytes")
+
+        cache = TTSClipCache(str(tmp_path), "src1")
+        key = cache.key("qwen3", ref, "你好")
+        assert not cache.fetch(key, str(tmp_path / "out.wav"))
+        cache.store(key, clip)
+        cache.flush()
+
+        reopened = TTSClipCache(str(tmp_path), "src1")
+        out_path = tmp_path / "out.wav"
+        assert reopened.fetch(key, str(out_path))
+        assert out_path.read_bytes() == b"clip-bytes"
+
+    def test_key_depends_on_text_backend_and_ref_content(self, tmp_path):
+        ref = _write(tmp_path / "ref.wav", b"ref-a")
+        cache = TTSClipCache(str(tmp_path), "src1")
+
+        base = cache.key("qwen3", ref, "你好")
+        assert cache.key("qwen3", ref, "世界") != base
+        assert cache.key("indextts2", ref, "你好") != base
+
+        other_ref = _write(tmp_path / "other.wav", b"ref-b")
+        assert cache.key("qwen3", other_ref, "你好") != base
+
+    def test_source_change_invalidates_cache(self, tmp_path):
+        ref = _write(tmp_path / "ref.wav", b"ref")
+        clip = _write(tmp_path / "clip.wav", b"clip-bytes")
+
+        cache = TTSClipCache(str(tmp_path), "src1")
+        key = cache.key("qwen3", ref, "你好")
+        cache.store(key, clip)
+
+        changed = TTSClipCache(str(tmp_path), "src2")
+
+        assert not changed.fetch(key, str(tmp_path / "out.wav"))
+        assert changed.clips == {}
+
+    def test_corrupt_manifest_starts_empty(self, tmp_path):
+        cache_dir = tmp_path / ".cache" / "tts"
+        cache_dir.mkdir(parents=True)
+        (cache_dir / "manifest.json").write_text("{not json", encoding="utf-8")
+
+        cache = TTSClipCache(str(tmp_path), "src1")
+
+        assert cache.clips == {}
+
+    def test_manifest_is_written_on_flush_not_per_store(self, tmp_path, monkeypatch):
+        import tools.tts_cache as mod
+
+        writes = []
+        real_write = mod._write_json_atomic
+
+        def _counting_write(data, path):
+            writes.append(path)
+            real_write(data, path)
+
+        monkeypatch.setattr(mod, "_write_json_atomic", _counting_write)
+        clip = _write(tmp_path / "clip.wav", b"clip-bytes")
+        cache = TTSClipCache(str(tmp_path), "src1")
+        writes.clear()  # the fresh manifest written on open
+
+        for text in ("一", "二", "三"):
+            cache.store(cache.key("qwen3", None, text), clip)
+        assert writes == []
+
+        cache.flush()
+        cache.flush()
+        assert len(writes) == 1
+        with open(cache.manifest_path, encoding="utf-8") as f:
+            assert len(json.load(f)["clips"]) == 3
+
+    def test_unflushed_clip_is_found_by_file_name(self, tmp_path):
+        clip = _write(tmp_path / "clip.wav", b"clip-bytes")
+        cache = TTSClipCache(str(tmp_path), "src1")
+        key = cache.key("qwen3", None, "你好")
+        cache.store(key, clip)
+        cache.flush()
+        late_key = cache.key("qwen3", None, "世界")
+        cache.store(late_key, clip)  # process dies before the next flush
+
+        reopened = TTSClipCache(str(tmp_path), "src1")
+
+        assert late_key not in reopened.clips
+        assert reopened.fetch(late_key, str(tmp_path / "out.wav"))
+
+
+class TestFileSha256:
+    def test_matches_hashlib(self, tmp_path):
+        import hashlib
+
+        path = _write(tmp_path / "a.bin", b"x" * 5000)
+
+        assert file_sha256(path, chunk_size=1024) == hashlib.sha256(b"x" * 5000).hexdigest()
@@ -6,9 +6,20 @@ from types import SimpleNamespace
 
 import pytest
 
+import tools.youtube_download as _yt
 from tools.youtube_download import download_youtube_mp3, is_youtube_url
 
 
+@pytest.fixture(autouse=True)
+def _clear_lookup_caches():
+    """Each test patches shutil.which / import_module, so drop cached lookups."""
+    _yt._find_ffmpeg.cache_clear()
+    _yt._load_yt_dlp.cache_clear()
+    yield
+    _yt._find_ffmpeg.cache_clear()
+    _yt._load_yt_dlp.cache_clear()
+
+
 def _build_fake_yt_dlp():
     class _FakeYoutubeDL:
         def __init__(self, opts):
@@ -22,19 +33,23 @@ def _build_fake_yt_dlp():
 
         def extract_info(self, url, download=True):
             assert download is True
-            info = {"title": "unit_test_video"}
-            raw_path = self._raw_path(info["title"])
+            info = {"title": "unit_test_video", "id": url.rsplit("/", 1)[-1]}
+            raw_path = self._raw_path(info)
             raw_path.parent.mkdir(parents=True, exist_ok=True)
             raw_path.write_bytes(b"raw")
             raw_path.with_suffix(".mp3").write_bytes(b"mp3")
             return info
 
         def prepare_filename(self, info):
-            return str(self._raw_path(info["title"]))
+            return str(self._raw_path(info))
 
-        def _raw_path(self, title: str) -> Path:
+        def _raw_path(self, info: dict) -> Path:
             template = self.opts["outtmpl"]
-            return Path(template.replace("%(title)s", title).replace("%(ext)s", "webm"))
+            return Path(
+                template.replace("%(title)s", info["title"])
+                .replace("%(id)s", info["id"])
+                .replace("%(ext)s", "webm")
+            )
 
     return SimpleNamespace(YoutubeDL=_FakeYoutubeDL)
 
@@ -103,6 +118,56 @@ class TestDownloadYoutubeMp3:
         assert output == str(tmp_path / "unit_test_video.mp3")
         assert Path(output).is_file()
 
+    def test_lookups_happen_once_across_downloads(self, tmp_path, monkeypatch):
+        import tools.youtube_download as mod
+
+        which_calls: list[str] = []
+        import_calls: list[str] = []
+        fake = _build_fake_yt_dlp()
+        monkeypatch.setattr(mod.shutil, "which", lambda name: which_calls.append(name) or "/usr/bin/ffmpeg")
+        monkeypatch.setattr(
+            mod.importlib, "import_module", lambda name: import_calls.append(name) or fake
+        )
+
+        for _ in range(2):
+            mod.download_youtube_mp3("https://youtu.be/abc", output_dir=str(tmp_path))
+
+        assert which_calls == ["ffmpeg"]
+        assert import_calls == ["yt_dlp"]
+
+    def test_many_downloads_keep_input_order_and_dedupe(self, tmp_path, monkeypatch):
+        import tools.youtube_download as mod
+
+        calls: list[str] = []
+
+        def _fake_download(url, output_dir=None, filename_template=None):
+            calls.append(url)
+            return str(tmp_path / f"{url.rsplit('/', 1)[-1]}.mp3")
+
+        monkeypatch.setattr(mod, "download_youtube_mp3", _fake_download)
+        urls = ["https://youtu.be/b", "https://youtu.be/a", "https://youtu.be/b"]
+
+        result = mod.download_youtube_mp3_many(urls, output_dir=str(tmp_path))
+
+        assert result == [str(tmp_path / "b.mp3"), str(tmp_path / "a.mp3"), str(tmp_path / "b.mp3")]
+        assert sorted(calls) == ["https://youtu.be/a", "https://youtu.be/b"]
+
+    def test_many_downloads_keep_same_titled_videos_apart(self, tmp_path, monkeypatch):
+        import tools.youtube_download as mod
+
+        monkeypatch.setattr(mod.shutil, "which", lambda _: "/usr/bin/ffmpeg")
+        fake = _build_fake_yt_dlp()  # every video is titled "unit_test_video"
+        monkeypatch.setattr(mod.importlib, "import_module", lambda name: fake)
+
+        result = mod.download_youtube_mp3_many(
+            ["https://youtu.be/abc", "https://youtu.be/xyz"], output_dir=str(tmp_path)
+        )
+
+        assert result == [
+            str(tmp_path / "unit_test_video [abc].mp3"),
+            str(tmp_path / "unit_test_video [xyz].mp3"),
+        ]
+
     def test_downloads_and_moves_to_output_path(self, tmp_path, monkeypatch):
         import tools.youtube_download as mod
 
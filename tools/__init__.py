@@ -1,37 +1,40 @@
-"""Babel tools - 英语播客转中文播客 pipeline 各步骤."""
-
-import torch
-
-
-def get_device() -> str:
-    """Detect best available device: CUDA > MPS > CPU."""
-    if torch.cuda.is_available():
-        return "cuda"
-    if torch.backends.mps.is_available():
-        return "mps"
-    return "cpu"
-
-
-from tools.transcribe import transcribe
-from tools.reference_audio import extract_reference_audio
-from tools.translate import (
-    translate_segments,
-    summarize_translated_segments,
-    summarize_translated_segments_detailed,
-)
-from tools.synthesize import synthesize_segments
-from tools.concatenate import concatenate_audio
-from tools.youtube_download import download_youtube_mp3, is_youtube_url
-
-__all__ = [
-    "get_device",
-    "transcribe",
-    "extract_reference_audio",
-    "translate_segments",
-    "summarize_translated_segments",
-    "summarize_translated_segments_detailed",
-    "synthesize_segments",
-    "concatenate_audio",
-    "download_youtube_mp3",
-    "is_youtube_url",
-]
+"""Babel tools - 英语播客转中文播客 pipeline 各步骤.
+
+Exports are resolved on first access (PEP 562), so importing one step such as
+``tools.translate`` does not pull in torch or the other steps' dependencies.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "get_device": "tools.device",
+    "transcribe": "tools.transcribe",
+    "extract_reference_audio": "tools.reference_audio",
+    "translate_segments": "tools.translate",
+    "summarize_translated_segments": "tools.translate",
+    "summarize_translated_segments_detailed": "tools.translate",
+    "submit_summary_batch": "tools.translate",
+    "collect_summary_batch": "tools.translate",
+    "synthesize_segments": "tools.synthesize",
+    "concatenate_audio": "tools.concatenate",
+    "download_youtube_mp3": "tools.youtube_download",
+    "download_youtube_mp3_many": "tools.youtube_download",
+    "is_youtube_url": "tools.youtube_download",
+    "TTSClipCache": "tools.tts_cache",
+    "file_sha256": "tools.tts_cache",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
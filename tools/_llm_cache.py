@@ -0,0 +1,66 @@
+"""LLM 响应缓存：按 (provider, model, prompt) 哈希复用已返回的文本."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+CACHE_ENV = "BABEL_LLM_CACHE"  # set to 0 to bypass the cache
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "babel", "llm.sqlite")
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+_conn_path: str | None = None
+
+
+def enabled() -> bool:
+    return os.getenv(CACHE_ENV, "1").strip() != "0"
+
+
+def make_key(provider: str, model_name: str, system_prompt: str, user_msg: str) -> str:
+    payload = json.dumps([provider, model_name, system_prompt, user_msg], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _connection() -> sqlite3.Connection:
+    """Open (once per CACHE_PATH) the shared connection; caller holds _lock."""
+    global _conn, _conn_path
+    if _conn is None or _conn_path != CACHE_PATH:
+        if _conn is not None:
+            _conn.close()
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        # Translation batches run on worker threads; _lock serializes access.
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn_path = CACHE_PATH
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        _conn.commit()
+    return _conn
+
+
+def get(key: str) -> str | None:
+    """Return the cached reply for key, or None on a miss."""
+    try:
+        with _lock:
+            row = _connection().execute(
+                "SELECT value FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error as exc:
+        print(f"  警告: 读取 LLM 缓存失败，直接请求: {exc}")
+        return None
+    return row[0] if row else None
+
+
+def put(key: str, value: str) -> None:
+    try:
+        with _lock:
+            conn = _connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value) VALUES (?, ?)", (key, value)
+            )
+            conn.commit()
+    except sqlite3.Error as exc:
+        print(f"  警告: 写入 LLM 缓存失败: {exc}")
@@ -0,0 +1,36 @@
+"""进程内模型缓存：长驻进程多次调用各步骤时复用已加载的模型."""
+
+import os
+import threading
+from collections.abc import Callable, Hashable
+from typing import TypeVar
+
+CACHE_ENV = "BABEL_MODEL_CACHE"  # set to 1 to keep loaded models resident
+
+_T = TypeVar("_T")
+
+_lock = threading.Lock()
+_models: dict[Hashable, object] = {}
+
+
+def enabled() -> bool:
+    return os.getenv(CACHE_ENV, "0").strip() == "1"
+
+
+def get_or_load(key: Hashable, loader: Callable[[], _T]) -> _T:
+    """Return the model cached under key, calling loader on a miss.
+
+    Off by default: a one-shot CLI run should free each model (and its GPU
+    memory) once its step is done, before the next step loads its own.
+    """
+    if not enabled():
+        return loader()
+    with _lock:
+        if key not in _models:
+            _models[key] = loader()
+        return _models[key]
+
+
+def clear() -> None:
+    with _lock:
+        _models.clear()
@@ -1,6 +1,165 @@
 """Step 5: 拼接音频."""
 
-from pydub import AudioSegment
+import functools
+import os
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+FFMPEG = "ffmpeg"
+FADE_MS = 10
+MIN_GAP_MS = 100
+MAX_GAP_MS = 3000
+PREFETCH_CLIPS = 4  # clips read ahead of the encoder
+MP3_BITRATE = "192k"
+# LAME algorithm quality (0 best/slowest .. 9): 5 encodes ~25% faster than the
+# default 3 at the same CBR bitrate, inaudible for speech.
+MP3_ENCODER_PARAMETERS = ["-compression_level", "5"]
+
+
+def _gaps_ms(
+    segments: list[dict],
+    count: int,
+    use_timestamps: bool,
+    fixed_gap_ms: int | None,
+) -> list[int]:
+    """Silence before each of the first count clips, in ms (0 before the first)."""
+    gaps = np.zeros(count, dtype=np.int64)
+    if count < 2:
+        return gaps.tolist()
+    if use_timestamps:
+        # Add silence gap between segments based on original timing.
+        starts = np.fromiter((seg["start"] for seg in segments[1:count]), np.float64, count - 1)
+        ends = np.fromiter((seg["end"] for seg in segments[:count - 1]), np.float64, count - 1)
+        gaps[1:] = np.clip(((starts - ends) * 1000).astype(np.int64), MIN_GAP_MS, MAX_GAP_MS)
+    elif fixed_gap_ms is not None and fixed_gap_ms > 0:
+        gaps[1:] = fixed_gap_ms
+    return gaps.tolist()
+
+
+@functools.lru_cache(maxsize=32)
+def _silence(num_bytes: int) -> bytes:
+    """Zeroed PCM, shared across gaps: clamped gaps repeat a few lengths."""
+    return bytes(num_bytes)
+
+
+def _read_clip(path: str, info, sample_rate: int, channels: int) -> np.ndarray:
+    """Read a clip as int16 frames shaped (n, channels) at the target format."""
+    if info.samplerate == sample_rate and info.channels == channels:
+        return sf.read(path, dtype="int16", always_2d=True)[0]
+    # Rare mixed-format clips. The target is the highest rate and widest layout
+    # among the clips, so this only ever upmixes and upsamples.
+    data = sf.read(path, dtype="float32", always_2d=True)[0]
+    if data.shape[1] != channels:
+        data = np.repeat(data.mean(axis=1, keepdims=True), channels, axis=1)
+    if info.samplerate != sample_rate:
+        n_out = round(len(data) * sample_rate / info.samplerate)
+        positions = np.arange(n_out) * (info.samplerate / sample_rate)
+        source = np.arange(len(data))
+        data = np.stack(
+            [np.interp(positions, source, data[:, ch]) for ch in range(channels)], axis=1
+        )
+    return np.clip(np.round(data * 32768), -32768, 32767).astype(np.int16)
+
+
+def _apply_fades(clip: np.ndarray, fade_frames: int) -> None:
+    n = min(fade_frames, len(clip) // 2)
+    if n <= 0:
+        return
+    ramp = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)[:, None]
+    clip[:n] = (clip[:n] * ramp).astype(np.int16)
+    clip[-n:] = (clip[-n:] * ramp[::-1]).astype(np.int16)
+
+
+def _load_clip(
+    path: str, info, sample_rate: int, channels: int, length: int, fade_frames: int
+) -> np.ndarray:
+    clip = _read_clip(path, info, sample_rate, channels)[:length]
+    _apply_fades(clip, fade_frames)
+    return clip
+
+
+def _open_mp3_encoder(output_path: str, sample_rate: int, channels: int) -> subprocess.Popen:
+    """Start ffmpeg encoding s16le PCM from stdin to an MP3 at output_path."""
+    cmd = [
+        FFMPEG,
+        "-y", "-hide_banner",
+        "-loglevel", "error",
+        "-f", "s16le",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "-i", "pipe:0",
+        "-c:a", "libmp3lame",
+        "-b:a", MP3_BITRATE,
+        *MP3_ENCODER_PARAMETERS,
+        output_path,
+    ]
+    return subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+
+def _run_ffmpeg(args: list[str]) -> None:
+    result = subprocess.run(
+        [FFMPEG, "-y", "-hide_banner", "-loglevel", "error", *args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg 拼接失败: {result.stderr.decode('utf-8', 'replace').strip()}")
+
+
+def _encode_silence_mp3(path: str, gap_ms: int, sample_rate: int, channels: int) -> None:
+    encoder = _open_mp3_encoder(path, sample_rate, channels)
+    encoder.stdin.write(_silence(gap_ms * sample_rate // 1000 * 2 * channels))
+    encoder.stdin.close()
+    stderr = encoder.stderr.read()
+    if encoder.wait() != 0:
+        raise RuntimeError(f"ffmpeg 编码 MP3 失败: {stderr.decode('utf-8', 'replace').strip()}")
+
+
+def _can_stream_copy(paths: list[str], infos: list) -> bool:
+    """True when every clip is an MP3 in one sample rate / channel layout."""
+    return (
+        bool(paths)
+        and all(path.lower().endswith(".mp3") for path in paths)
+        and len({(info.samplerate, info.channels) for info in infos}) == 1
+    )
+
+
+def _concatenate_stream_copy(
+    mp3_paths: list[str],
+    gaps_ms: list[int],
+    output_path: str,
+    sample_rate: int,
+    channels: int,
+) -> None:
+    """Join MP3 clips with ffmpeg's concat demuxer and ``-c copy`` (no re-encode).
+
+    Each distinct gap length is encoded to a silent MP3 once and reused.
+    """
+    with tempfile.TemporaryDirectory(prefix="babel_concat_") as tmp_dir:
+        silence_paths: dict[int, str] = {}
+        entries: list[str] = []
+        for path, gap_ms in zip(mp3_paths, gaps_ms):
+            if gap_ms > 0:
+                if gap_ms not in silence_paths:
+                    silence_paths[gap_ms] = os.path.join(tmp_dir, f"silence_{gap_ms}ms.mp3")
+                    _encode_silence_mp3(silence_paths[gap_ms], gap_ms, sample_rate, channels)
+                entries.append(silence_paths[gap_ms])
+            entries.append(os.path.abspath(path))
+
+        list_path = os.path.join(tmp_dir, "concat.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                escaped = entry.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        _run_ffmpeg(["-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path])
 
 
 def concatenate_audio(
@@ -14,29 +173,64 @@ def concatenate_audio(
 
     When use_timestamps=True, preserve inter-segment gaps based on segment timings.
     When use_timestamps=False and fixed_gap_ms is provided, insert a fixed silence gap.
+
+    PCM is piped to one ffmpeg process clip by clip, so the full episode is
+    never held in memory. When every clip is already an MP3 in the same format,
+    the clips are joined with ``-c copy`` instead (no fades, no re-encode).
     """
     if fixed_gap_ms is not None and fixed_gap_ms < 0:
         raise ValueError("fixed_gap_ms 必须 >= 0")
 
     print("[Step 5] 拼接音频...")
-    combined = AudioSegment.empty()
-
-    for i, wav_path in enumerate(wav_paths):
-        clip = AudioSegment.from_wav(wav_path)
-        clip = clip.fade_in(10).fade_out(10)
-
-        if i > 0:
-            if use_timestamps:
-                # Add silence gap between segments based on original timing.
-                gap_ms = int((segments[i]["start"] - segments[i - 1]["end"]) * 1000)
-                gap_ms = max(gap_ms, 100)   # minimum 100ms pause
-                gap_ms = min(gap_ms, 3000)  # maximum 3s pause
-                combined += AudioSegment.silent(duration=gap_ms)
-            elif fixed_gap_ms is not None and fixed_gap_ms > 0:
-                combined += AudioSegment.silent(duration=fixed_gap_ms)
-
-        combined += clip
-
-    combined.export(output_path, format="mp3", bitrate="192k")
-    duration_s = len(combined) / 1000
+    infos = [sf.info(path) for path in wav_paths]
+    sample_rate = max((info.samplerate for info in infos), default=24000)
+    channels = max((info.channels for info in infos), default=1)
+
+    gaps_ms = _gaps_ms(segments, len(wav_paths), use_timestamps, fixed_gap_ms)
+    if _can_stream_copy(wav_paths, infos):
+        _concatenate_stream_copy(wav_paths, gaps_ms, output_path, sample_rate, channels)
+        duration_s = sum(info.frames for info in infos) / sample_rate + sum(gaps_ms) / 1000
+        print(f"[Step 5] 输出完成（直接拼接 MP3）: {output_path} ({duration_s:.1f}s)")
+        return
+
+    # Stream each gap and clip straight into the encoder, so memory stays at one
+    # clip rather than the whole episode's PCM.
+    frame_bytes = 2 * channels
+    fade_frames = FADE_MS * sample_rate // 1000
+    total_frames = 0
+    lengths = [round(info.frames * sample_rate / info.samplerate) for info in infos]
+    encoder = _open_mp3_encoder(output_path, sample_rate, channels)
+    # Read the next few clips on worker threads while the current one is being
+    # written, so disk reads overlap encoding; the window bounds memory.
+    executor = ThreadPoolExecutor(max_workers=PREFETCH_CLIPS)
+    pending: deque[Future] = deque()
+    try:
+        for i in range(len(wav_paths)):
+            while len(pending) < PREFETCH_CLIPS and i + len(pending) < len(wav_paths):
+                j = i + len(pending)
+                pending.append(executor.submit(
+                    _load_clip, wav_paths[j], infos[j], sample_rate, channels,
+                    lengths[j], fade_frames,
+                ))
+            clip = pending.popleft().result()
+            gap_frames = gaps_ms[i] * sample_rate // 1000
+            encoder.stdin.write(_silence(gap_frames * frame_bytes))
+            encoder.stdin.write(clip.tobytes())
+            # Resampled clips can come back a frame short of the header estimate.
+            encoder.stdin.write(bytes((lengths[i] - len(clip)) * frame_bytes))
+            total_frames += gap_frames + lengths[i]
+        encoder.stdin.close()
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its error is reported below
+    except BaseException:
+        encoder.kill()
+        encoder.wait()
+        raise
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    stderr = encoder.stderr.read()
+    if encoder.wait() != 0:
+        raise RuntimeError(f"ffmpeg 编码 MP3 失败: {stderr.decode('utf-8', 'replace').strip()}")
+
+    duration_s = total_frames / sample_rate
     print(f"[Step 5] 输出完成: {output_path} ({duration_s:.1f}s)")
@@ -0,0 +1,13 @@
+"""运行设备选择."""
+
+
+def get_device() -> str:
+    """Detect best available device: CUDA > MPS > CPU."""
+    # Imported here so tools that never touch a model skip loading torch.
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
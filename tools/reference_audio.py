@@ -3,9 +3,16 @@
 import json
 import math
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import soundfile as sf
 from pydub import AudioSegment
 
+MAX_REF_WORKERS = 8
+FULL_SCALE = 32768.0  # int16
+
 
 def _segment_duration(seg: dict) -> float:
     return max(float(seg["end"]) - float(seg["start"]), 0.0)
@@ -30,19 +37,16 @@ def _clamp_segment_bounds_ms(seg: dict, audio_length_ms: int) -> tuple[int, int]
     return start_ms, end_ms
 
 
-def _percentile(values: list[float], p: float) -> float:
-    if not values:
+def _percentile(values: np.ndarray, p: float) -> float:
+    """Linearly interpolated percentile via O(n) selection instead of a full sort."""
+    if not values.size:
         return 0.0
-    vals = sorted(values)
-    if len(vals) == 1:
-        return vals[0]
-    idx = (len(vals) - 1) * (p / 100.0)
+    idx = (values.size - 1) * (p / 100.0)
     lo = int(math.floor(idx))
     hi = int(math.ceil(idx))
-    if lo == hi:
-        return vals[lo]
+    part = np.partition(values, [lo, hi])
     frac = idx - lo
-    return vals[lo] * (1.0 - frac) + vals[hi] * frac
+    return float(part[lo] * (1.0 - frac) + part[hi] * frac)
 
 
 def _normalize(value: float, low: float, high: float) -> float:
@@ -62,49 +66,86 @@ def _duration_score(duration_s: float) -> float:
     return max(0.0, 1.0 - ((duration_s - 8.0) / 4.0))
 
 
-def _estimate_clip_ratio(clip: AudioSegment) -> float:
-    samples = clip.get_array_of_samples()
-    if not samples:
-        return 1.0
+def _load_mono_pcm(audio_path: str) -> tuple[np.ndarray, int]:
+    """Decode the source once into mono int16 samples; returns (samples, sample_rate)."""
+    try:
+        data, sample_rate = sf.read(audio_path, dtype="int16", always_2d=True)
+    except sf.LibsndfileError:
+        # Containers libsndfile cannot read (m4a, webm, ...) go through ffmpeg.
+        audio = AudioSegment.from_file(audio_path).set_sample_width(2)
+        data = np.frombuffer(audio.raw_data, dtype=np.int16).reshape(-1, audio.channels)
+        sample_rate = audio.frame_rate
+    if data.shape[1] == 1:
+        return np.ascontiguousarray(data[:, 0]), sample_rate
+    return data.mean(axis=1).astype(np.int16), sample_rate
 
-    sample_width = clip.sample_width
-    if sample_width <= 0:
-        return 0.0
 
-    max_int = float((1 << (8 * sample_width - 1)) - 1)
-    if max_int <= 0:
-        return 0.0
+def _length_ms(samples: np.ndarray, sample_rate: int) -> int:
+    return round(len(samples) * 1000 / sample_rate)
 
-    threshold = max_int * 0.995
-    clipped = sum(1 for sample in samples if abs(int(sample)) >= threshold)
-    return clipped / len(samples)
 
+def _slice_ms(samples: np.ndarray, sample_rate: int, start_ms: int, end_ms: int) -> np.ndarray:
+    """View of samples between two positions in ms (no copy)."""
+    return samples[start_ms * sample_rate // 1000:end_ms * sample_rate // 1000]
 
-def _frame_dbfs(clip: AudioSegment, frame_ms: int = 50, hop_ms: int = 25) -> list[float]:
-    if len(clip) <= 0:
-        return []
-    if len(clip) <= frame_ms:
-        return [clip.dBFS]
 
-    vals: list[float] = []
-    last_start = len(clip) - frame_ms
-    pos = 0
-    while pos <= last_start:
-        vals.append(clip[pos:pos + frame_ms].dBFS)
-        pos += hop_ms
+def _dbfs(samples: np.ndarray) -> float:
+    if not samples.size:
+        return -math.inf
+    # Exact integer sum of squares, so digital silence is -inf.
+    mean_square = int(np.dot(samples.astype(np.int64), samples.astype(np.int64))) / samples.size
+    if mean_square == 0:
+        return -math.inf
+    return 20.0 * math.log10(math.sqrt(mean_square) / FULL_SCALE)
 
-    if vals and last_start > 0 and (last_start % hop_ms != 0):
-        vals.append(clip[last_start:last_start + frame_ms].dBFS)
 
-    return vals
+def _estimate_clip_ratio(samples: np.ndarray) -> float:
+    if not samples.size:
+        return 1.0
+    threshold = (FULL_SCALE - 1) * 0.995
+    # Widen first: abs() of the most negative int16 overflows in place.
+    clipped = np.count_nonzero(np.abs(samples.astype(np.int32)) >= threshold)
+    return clipped / samples.size
 
 
-def _score_reference_clip(clip: AudioSegment, duration_s: float) -> tuple[float, dict[str, float]]:
-    frame_levels = [
-        (v if math.isfinite(v) else -90.0)
-        for v in _frame_dbfs(clip)
-    ]
-    if not frame_levels:
+def _frame_dbfs(
+    samples: np.ndarray, sample_rate: int, frame_ms: int = 50, hop_ms: int = 25
+) -> np.ndarray:
+    """dBFS of each frame_ms window every hop_ms, plus one window flush with the end.
+
+    Window sums come from one cumulative sum of squared samples instead of a
+    slice per window.
+    """
+    length_ms = _length_ms(samples, sample_rate)
+    if length_ms <= 0:
+        return np.empty(0)
+    if length_ms <= frame_ms:
+        return np.array([_dbfs(samples)])
+
+    last_start = length_ms - frame_ms
+    starts_ms = np.arange(0, last_start + 1, hop_ms)
+    if last_start % hop_ms != 0:
+        starts_ms = np.append(starts_ms, last_start)
+
+    # Exact integer sums, so silent windows stay at -inf.
+    squares = samples.astype(np.int64) ** 2
+    cumulative = np.concatenate(([0], np.cumsum(squares)))
+
+    start_frames = starts_ms * sample_rate // 1000
+    end_frames = (starts_ms + frame_ms) * sample_rate // 1000
+    available = np.minimum(end_frames, len(samples))
+    energy = (cumulative[available] - cumulative[start_frames]).astype(np.float64)
+    mean_square = energy / np.maximum(end_frames - start_frames, 1)
+    with np.errstate(divide="ignore"):
+        return 20.0 * np.log10(np.sqrt(mean_square) / FULL_SCALE)
+
+
+def _score_reference_clip(
+    clip: np.ndarray, sample_rate: int, duration_s: float
+) -> tuple[float, dict[str, float]]:
+    frame_levels = _frame_dbfs(clip, sample_rate)
+    frame_levels[~np.isfinite(frame_levels)] = -90.0
+    if not frame_levels.size:
         metrics = {
             "speech_ratio": 0.0,
             "snr_db": 0.0,
@@ -115,23 +156,21 @@ def _score_reference_clip(clip: AudioSegment, duration_s: float) -> tuple[float,
         return -1.0, metrics
 
     noise_floor = _percentile(frame_levels, 20.0)
-    max_level = max(frame_levels)
+    max_level = float(frame_levels.max())
     speech_threshold = max(noise_floor + 6.0, -45.0)
     speech_threshold = min(speech_threshold, max_level - 2.0)
-    speech_frames = [v for v in frame_levels if v >= speech_threshold]
+    speech_frames = frame_levels[frame_levels >= speech_threshold]
 
-    speech_ratio = len(speech_frames) / len(frame_levels)
-    speech_level = (
-        (sum(speech_frames) / len(speech_frames))
-        if speech_frames
-        else max(frame_levels)
-    )
+    speech_ratio = speech_frames.size / frame_levels.size
+    speech_level = float(speech_frames.mean()) if speech_frames.size else max_level
     noise_level = _percentile(frame_levels, 10.0)
     snr_db = max(0.0, speech_level - noise_level)
     # Suppress false high-SNR scores when only a small portion is voiced.
     snr_score = _normalize(snr_db, 6.0, 24.0) * speech_ratio
 
-    loudness_dbfs = clip.dBFS if math.isfinite(clip.dBFS) else -90.0
+    loudness_dbfs = _dbfs(clip)
+    if not math.isfinite(loudness_dbfs):
+        loudness_dbfs = -90.0
     loudness_score = 1.0 - min(abs(loudness_dbfs + 19.0) / 12.0, 1.0)
     duration_pref = _duration_score(duration_s)
 
@@ -184,12 +223,13 @@ def _build_ref_text(segments: list[dict], max_chars: int = 300) -> str:
 
 def _compose_reference_clip(
     scored_candidates: list[dict],
+    sample_rate: int,
     min_total_ms: int = 3000,
     target_total_ms: int = 7000,
     max_total_ms: int = 10000,
     max_parts: int = 4,
     gap_ms: int = 50,
-) -> tuple[AudioSegment, list[dict]] | None:
+) -> tuple[np.ndarray, list[dict]] | None:
     if not scored_candidates:
         return None
 
@@ -242,131 +282,214 @@ def _compose_reference_clip(
         return None
 
     ordered = sorted(selected, key=lambda c: (c["start_ms"], c["end_ms"]))
-    combined = AudioSegment.empty()
+    gap = np.zeros(gap_ms * sample_rate // 1000, dtype=np.int16)
+    max_samples = max_total_ms * sample_rate // 1000
+    parts: list[np.ndarray] = []
+    total_samples = 0
     for i, cand in enumerate(ordered):
-        if i > 0 and gap_ms > 0:
-            combined += AudioSegment.silent(duration=gap_ms)
-        combined += cand["clip"]
-        if len(combined) >= max_total_ms:
-            combined = combined[:max_total_ms]
+        if i > 0 and gap.size:
+            parts.append(gap)
+            total_samples += gap.size
+        parts.append(cand["clip"])
+        total_samples += cand["clip"].size
+        if total_samples >= max_samples:
             break
 
-    return combined, ordered
+    return np.concatenate(parts)[:max_samples], ordered
+
+
+def _select_speaker_reference(
+    speaker: str,
+    segs: list[dict],
+    samples: np.ndarray,
+    sample_rate: int,
+    ref_dir: str,
+) -> tuple[str, dict, str]:
+    """Pick, export and describe the reference clip for one speaker.
+
+    Candidate clips are views into samples; only the chosen one is written.
+    Returns (ref_path, metadata, log_line).
+    """
+    audio_length_ms = _length_ms(samples, sample_rate)
+    # Each duration is computed once; segment dicts are left untouched.
+    by_duration = sorted(
+        ((_segment_duration(s), s) for s in segs), key=lambda item: item[0], reverse=True
+    )
+    segs_sorted = [s for _, s in by_duration]
+    in_range = [s for duration, s in by_duration if 3.0 <= duration <= 10.0]
+    candidates = in_range if in_range else segs_sorted
+
+    scored_candidates: list[dict] = []
+
+    for idx, seg in enumerate(candidates):
+        start_ms, end_ms = _clamp_segment_bounds_ms(seg, audio_length_ms)
+        if end_ms <= start_ms:
+            continue
+
+        clip = _slice_ms(samples, sample_rate, start_ms, end_ms)
+        duration_s = (end_ms - start_ms) / 1000.0
+        score, metrics = _score_reference_clip(clip, sample_rate, duration_s=duration_s)
+        scored_candidates.append(
+            {
+                "candidate_id": idx,
+                "seg": seg,
+                "start_ms": start_ms,
+                "end_ms": end_ms,
+                "duration_ms": end_ms - start_ms,
+                "clip": clip,
+                "score": score,
+                "metrics": metrics,
+            }
+        )
+
+    best_clip: np.ndarray
+    best_ref_segments: list[dict]
+    mode = "single"
+    if scored_candidates:
+        best_single = max(
+            scored_candidates,
+            key=lambda c: (c["score"], c["duration_ms"]),
+        )
+        best_clip = best_single["clip"]
+        best_ref_segments = [best_single["seg"]]
+    else:
+        # Defensive fallback: this should rarely happen.
+        seg = segs_sorted[0]
+        start_ms, end_ms = _clamp_segment_bounds_ms(seg, audio_length_ms)
+        best_clip = _slice_ms(samples, sample_rate, start_ms, end_ms)
+        best_ref_segments = [seg]
+
+    if not in_range and scored_candidates:
+        composed = _compose_reference_clip(scored_candidates, sample_rate)
+        if composed is not None:
+            composed_clip, used_segments = composed
+            # Prefer composed ref only when it materially extends short single refs.
+            if len(used_segments) >= 2 and len(composed_clip) > len(best_clip):
+                best_clip = composed_clip
+                best_ref_segments = [c["seg"] for c in used_segments]
+                mode = f"composed/{len(used_segments)}"
+
+    best_duration_ms = _length_ms(best_clip, sample_rate)
+    best_score, best_metrics = _score_reference_clip(
+        best_clip,
+        sample_rate,
+        duration_s=max(best_duration_ms, 1) / 1000.0,
+    )
+    ref_text = _build_ref_text(
+        sorted(best_ref_segments, key=lambda seg: float(seg.get("start", 0.0))),
+    )
+    if not ref_text:
+        ref_text = "你好"
+
+    ref_path = os.path.join(ref_dir, f"{speaker}.wav")
+    sf.write(ref_path, best_clip, sample_rate, subtype="PCM_16")
+    metadata = {
+        "mode": mode,
+        "ref_path": ref_path,
+        "duration_ms": best_duration_ms,
+        "ref_text": ref_text,
+        "segments": [
+            {
+                "start": float(seg.get("start", 0.0)),
+                "end": float(seg.get("end", 0.0)),
+                "speaker": seg.get("speaker", speaker),
+                "text": (seg.get("text") or "").strip(),
+                "text_zh": (seg.get("text_zh") or "").strip(),
+            }
+            for seg in sorted(best_ref_segments, key=lambda seg: float(seg.get("start", 0.0)))
+        ],
+    }
+    summary = (
+        f"  {speaker}: {best_duration_ms / 1000:.1f}s [{mode}] "
+        f"(score={best_score:.3f}, speech={best_metrics['speech_ratio']:.2f}, "
+        f"snr={best_metrics['snr_db']:.1f}dB) → {ref_path}"
+    )
+    return ref_path, metadata, summary
+
+
+def _load_cached_reference_paths(
+    ref_dir: str, segments: list[dict], source_sha256: str
+) -> dict[str, str] | None:
+    metadata_path = os.path.join(ref_dir, "ref_metadata.json")
+    if not os.path.isfile(metadata_path):
+        return None
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if data.get("source_sha256") != source_sha256:
+        return None
+
+    speakers = data.get("speakers")
+    if not isinstance(speakers, dict):
+        return None
+    if set(speakers) != {seg["speaker"] for seg in segments}:
+        return None
+
+    ref_paths: dict[str, str] = {}
+    for speaker, info in speakers.items():
+        ref_path = info.get("ref_path") if isinstance(info, dict) else None
+        if not ref_path or not os.path.isfile(ref_path):
+            return None
+        ref_paths[speaker] = ref_path
+    return ref_paths
 
 
 def extract_reference_audio(
-    audio_path: str, segments: list[dict], work_dir: str
+    audio_path: str,
+    segments: list[dict],
+    work_dir: str,
+    source_sha256: str | None = None,
 ) -> dict[str, str]:
     """Extract a reference audio clip (3-10s) per speaker from the original audio.
 
+    When source_sha256 matches the one recorded in ref_metadata.json, the
+    previously extracted clips are reused.
+
     Returns {speaker_id: ref_wav_path}.
     """
     print("[Step 2] 提取参考音频...")
-    audio = AudioSegment.from_file(audio_path)
     ref_dir = os.path.join(work_dir, "ref_audio")
+    if source_sha256:
+        cached = _load_cached_reference_paths(ref_dir, segments, source_sha256)
+        if cached is not None:
+            print(f"[Step 2] 源音频未变化，复用已有参考音频 ({len(cached)} 个说话人)")
+            return cached
+
+    samples, sample_rate = _load_mono_pcm(audio_path)
     os.makedirs(ref_dir, exist_ok=True)
 
     # Group segments by speaker and select the best quality reference clip.
-    speaker_segments: dict[str, list[dict]] = {}
+    speaker_segments: defaultdict[str, list[dict]] = defaultdict(list)
     for seg in segments:
-        speaker_segments.setdefault(seg["speaker"], []).append(seg)
+        speaker_segments[seg["speaker"]].append(seg)
 
     ref_paths: dict[str, str] = {}
-    audio_length_ms = len(audio)
     ref_metadata: dict[str, dict] = {}
 
-    for speaker, segs in speaker_segments.items():
-        segs_sorted = sorted(segs, key=_segment_duration, reverse=True)
-        in_range = [s for s in segs_sorted if 3.0 <= _segment_duration(s) <= 10.0]
-        candidates = in_range if in_range else segs_sorted
-
-        scored_candidates: list[dict] = []
-
-        for idx, seg in enumerate(candidates):
-            start_ms, end_ms = _clamp_segment_bounds_ms(seg, audio_length_ms)
-            if end_ms <= start_ms:
-                continue
-
-            clip = audio[start_ms:end_ms]
-            duration_s = (end_ms - start_ms) / 1000.0
-            score, metrics = _score_reference_clip(clip, duration_s=duration_s)
-            scored_candidates.append(
-                {
-                    "candidate_id": idx,
-                    "seg": seg,
-                    "start_ms": start_ms,
-                    "end_ms": end_ms,
-                    "duration_ms": end_ms - start_ms,
-                    "clip": clip,
-                    "score": score,
-                    "metrics": metrics,
-                }
-            )
-
-        best_clip: AudioSegment
-        best_ref_segments: list[dict]
-        mode = "single"
-        if scored_candidates:
-            best_single = max(
-                scored_candidates,
-                key=lambda c: (c["score"], c["duration_ms"]),
+    workers = max(1, min(len(speaker_segments), os.cpu_count() or 1, MAX_REF_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            speaker: executor.submit(
+                _select_speaker_reference, speaker, segs, samples, sample_rate, ref_dir
             )
-            best_clip = best_single["clip"]
-            best_ref_segments = [best_single["seg"]]
-        else:
-            # Defensive fallback: this should rarely happen.
-            seg = segs_sorted[0]
-            start_ms, end_ms = _clamp_segment_bounds_ms(seg, audio_length_ms)
-            best_clip = audio[start_ms:end_ms]
-            best_ref_segments = [seg]
-
-        if not in_range and scored_candidates:
-            composed = _compose_reference_clip(scored_candidates)
-            if composed is not None:
-                composed_clip, used_segments = composed
-                # Prefer composed ref only when it materially extends short single refs.
-                if len(used_segments) >= 2 and len(composed_clip) > len(best_clip):
-                    best_clip = composed_clip
-                    best_ref_segments = [c["seg"] for c in used_segments]
-                    mode = f"composed/{len(used_segments)}"
-
-        best_score, best_metrics = _score_reference_clip(
-            best_clip,
-            duration_s=max(len(best_clip), 1) / 1000.0,
-        )
-        ref_text = _build_ref_text(
-            sorted(best_ref_segments, key=lambda seg: float(seg.get("start", 0.0))),
-        )
-        if not ref_text:
-            ref_text = "你好"
-
-        ref_path = os.path.join(ref_dir, f"{speaker}.wav")
-        best_clip.export(ref_path, format="wav")
-        ref_paths[speaker] = ref_path
-        ref_metadata[speaker] = {
-            "mode": mode,
-            "ref_path": ref_path,
-            "duration_ms": len(best_clip),
-            "ref_text": ref_text,
-            "segments": [
-                {
-                    "start": float(seg.get("start", 0.0)),
-                    "end": float(seg.get("end", 0.0)),
-                    "speaker": seg.get("speaker", speaker),
-                    "text": (seg.get("text") or "").strip(),
-                    "text_zh": (seg.get("text_zh") or "").strip(),
-                }
-                for seg in sorted(best_ref_segments, key=lambda seg: float(seg.get("start", 0.0)))
-            ],
+            for speaker, segs in speaker_segments.items()
         }
-        print(
-            f"  {speaker}: {len(best_clip) / 1000:.1f}s [{mode}] "
-            f"(score={best_score:.3f}, speech={best_metrics['speech_ratio']:.2f}, "
-            f"snr={best_metrics['snr_db']:.1f}dB) → {ref_path}"
-        )
+        # Collect in speaker order so logs and metadata stay deterministic.
+        for speaker, future in futures.items():
+            ref_path, metadata, summary = future.result()
+            ref_paths[speaker] = ref_path
+            ref_metadata[speaker] = metadata
+            print(summary)
 
     metadata_path = os.path.join(ref_dir, "ref_metadata.json")
     with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump({"speakers": ref_metadata}, f, ensure_ascii=False, indent=2)
+        json.dump(
+            {"source_sha256": source_sha256, "speakers": ref_metadata},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
 
     return ref_paths
@@ -1,12 +1,24 @@
 """Step 4: 声音克隆合成（Qwen3-TTS / IndexTTS2）."""
 
+import inspect
 import json
 import os
+import shutil
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import soundfile as sf
 import torch
 
-from tools import get_device
+from tools import _model_cache
+from tools.device import get_device
+from tools.tts_cache import TTSClipCache
+
+QWEN_BACKENDS = {"qwen", "qwen3", "qwen3-tts", "qwen_tts"}
+INDEXTTS2_BACKENDS = {"indextts2", "index-tts2", "index_tts2"}
+TTS_BATCH_SIZE = 8  # max segments per batched TTS forward pass
+
+ClipBatchSynthesizer = Callable[[list[tuple[dict, str]]], None]
 
 
 def synthesize_segments(
@@ -16,33 +28,144 @@ def synthesize_segments(
     tts_backend: str = "indextts2",
     index_tts_model_dir: str = "checkpoints",
     index_tts_cfg_path: str | None = None,
+    index_tts_compile: bool = False,
     progress_every: int = 10,
+    ready_batches: Iterable[list[int]] | None = None,
+    clip_cache: TTSClipCache | None = None,
+    batch_size: int | None = None,
 ) -> list[str]:
     """Synthesize Chinese speech for each segment using the selected TTS backend.
 
+    When ready_batches is given, segments are synthesized in the order their
+    batches arrive (e.g. as translation batches complete) instead of all upfront.
+    Within a batch, segments are grouped by speaker and sent to the backend up
+    to ``batch_size`` at a time. Clips found in clip_cache are reused, and a
+    text repeated with the same reference is synthesized once and copied; the
+    TTS model is only loaded on the first cache miss.
+
     Returns a list of WAV file paths in segment order.
     """
     backend = (tts_backend or "").strip().lower()
-    if backend in {"qwen", "qwen3", "qwen3-tts", "qwen_tts"}:
-        return _synthesize_with_qwen(
-            segments=segments,
-            ref_audio_paths=ref_audio_paths,
-            work_dir=work_dir,
-            progress_every=progress_every,
-        )
-    if backend in {"indextts2", "index-tts2", "index_tts2"}:
-        return _synthesize_with_indextts2(
-            segments=segments,
-            ref_audio_paths=ref_audio_paths,
-            work_dir=work_dir,
-            index_tts_model_dir=index_tts_model_dir,
-            index_tts_cfg_path=index_tts_cfg_path,
-            progress_every=progress_every,
+    if backend in QWEN_BACKENDS:
+        backend = "qwen3"
+    elif backend in INDEXTTS2_BACKENDS:
+        backend = "indextts2"
+    else:
+        raise ValueError(
+            f"不支持的 tts_backend: {tts_backend}. 可选: qwen3, indextts2"
         )
 
-    raise ValueError(
-        f"不支持的 tts_backend: {tts_backend}. 可选: qwen3, indextts2"
-    )
+    out_dir = os.path.join(work_dir, "tts_clips")
+    os.makedirs(out_dir, exist_ok=True)
+
+    if progress_every < 1:
+        progress_every = 1
+
+    if batch_size is None:
+        batch_size = TTS_BATCH_SIZE
+    batch_size = max(1, batch_size)
+
+    default_ref = next(iter(ref_audio_paths.values()), None)
+    total = len(segments)
+    wav_paths: list[str | None] = [None] * total
+    synthesize_batch: ClipBatchSynthesizer | None = None
+
+    done = 0
+    cache_hits = 0
+    # (reference, text) -> first segment synthesized with it; repeats copy that clip.
+    owners: dict[tuple[str | None, str], int] = {}
+    repeats = 0
+    last_speaker: str | None = None
+    writer = _BackgroundWriter()
+    try:
+        for batch_indices in _iter_ready_batches(total, ready_batches):
+            pending: list[tuple[int, str | None]] = []
+            copies: list[tuple[int, int]] = []
+            for i in batch_indices:
+                seg = segments[i]
+                out_path = os.path.join(out_dir, f"seg_{i:04d}.wav")
+                wav_paths[i] = out_path
+                ref_path = ref_audio_paths.get(seg.get("speaker", ""), default_ref)
+                text = _segment_text(seg)
+
+                owner = owners.get((ref_path, text))
+                if owner is not None:
+                    copies.append((owner, i))
+                    continue
+                owners[(ref_path, text)] = i
+
+                cache_key = None
+                if clip_cache is not None:
+                    cache_key = clip_cache.key(backend, ref_path, text)
+                    if clip_cache.fetch(cache_key, out_path):
+                        cache_hits += 1
+                        continue
+                pending.append((i, cache_key))
+
+            if pending and synthesize_batch is None:
+                if backend == "qwen3":
+                    synthesize_batch = _load_qwen(segments, ref_audio_paths, work_dir, writer)
+                else:
+                    synthesize_batch = _load_indextts2(
+                        ref_audio_paths,
+                        index_tts_model_dir=index_tts_model_dir,
+                        index_tts_cfg_path=index_tts_cfg_path,
+                        torch_compile=index_tts_compile,
+                    )
+
+            groups = _group_by_speaker(segments, pending, batch_size, first_speaker=last_speaker)
+            for group in groups:
+                synthesize_batch([(segments[i], wav_paths[i]) for i, _ in group])
+                last_speaker = segments[group[0][0]].get("speaker", "")
+                for i, cache_key in group:
+                    if cache_key is not None:
+                        # Queued behind the clip's own write, so it stores the finished file.
+                        writer.submit(clip_cache.store, cache_key, wav_paths[i])
+
+            # Owners were written earlier in this batch or a previous one.
+            for owner, i in copies:
+                writer.submit(shutil.copyfile, wav_paths[owner], wav_paths[i])
+            repeats += len(copies)
+
+            prev_done = done
+            done += len(batch_indices)
+            if done // progress_every != prev_done // progress_every or done == total:
+                print(f"  已合成 {done}/{total}")
+    finally:
+        try:
+            writer.close()
+        finally:
+            if clip_cache is not None:
+                # After close(), so every queued store is in the manifest.
+                clip_cache.flush()
+
+    if cache_hits:
+        print(f"[Step 4] 复用缓存片段 {cache_hits}/{total}")
+    if repeats:
+        print(f"[Step 4] 复用重复文本片段 {repeats}/{total}")
+
+    return _collect_wav_paths(wav_paths)
+
+
+class _BackgroundWriter:
+    """Run file writes on one worker thread, in submission order.
+
+    Lets the next TTS batch start while the previous batch's clips are still
+    being written. close() waits for pending writes and re-raises the first
+    failure.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures: list[Future] = []
+
+    def submit(self, fn: Callable[..., object], *args, **kwargs) -> None:
+        self._futures.append(self._executor.submit(fn, *args, **kwargs))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
 
 
 def _segment_text(seg: dict) -> str:
@@ -55,6 +178,46 @@ def _segment_text(seg: dict) -> str:
     return "你好"
 
 
+def _iter_ready_batches(
+    total: int, ready_batches: Iterable[list[int]] | None
+) -> Iterator[list[int]]:
+    if ready_batches is None:
+        if total:
+            yield list(range(total))
+        return
+    yield from ready_batches
+
+
+def _group_by_speaker(
+    segments: list[dict],
+    pending: list[tuple[int, str | None]],
+    batch_size: int,
+    first_speaker: str | None = None,
+) -> Iterator[list[tuple[int, str | None]]]:
+    """Bucket pending segments by speaker, then split into backend batches.
+
+    Each bucket is sorted by text length so batched segments pad to similar sizes.
+    first_speaker's bucket goes first, so a backend that caches the last
+    reference (IndexTTS2) does not re-encode it at the start of every batch.
+    """
+    by_speaker: dict[str, list[tuple[int, str | None]]] = {}
+    if first_speaker is not None:
+        by_speaker[first_speaker] = []
+    for item in pending:
+        by_speaker.setdefault(segments[item[0]].get("speaker", ""), []).append(item)
+    for items in by_speaker.values():
+        items.sort(key=lambda item: len(_segment_text(segments[item[0]])))
+        for start in range(0, len(items), batch_size):
+            yield items[start:start + batch_size]
+
+
+def _collect_wav_paths(wav_paths: list[str | None]) -> list[str]:
+    missing = [i for i, path in enumerate(wav_paths) if path is None]
+    if missing:
+        raise RuntimeError(f"有 {len(missing)} 个片段未合成（首个: {missing[0]}）")
+    return wav_paths
+
+
 def _load_ref_text_overrides(work_dir: str) -> dict[str, str]:
     metadata_path = os.path.join(work_dir, "ref_audio", "ref_metadata.json")
     if not os.path.isfile(metadata_path):
@@ -81,13 +244,16 @@ def _load_ref_text_overrides(work_dir: str) -> dict[str, str]:
     return overrides
 
 
-def _synthesize_with_qwen(
+def _load_qwen(
     segments: list[dict],
     ref_audio_paths: dict[str, str],
     work_dir: str,
-    progress_every: int,
-) -> list[str]:
-    """Synthesize with Qwen3-TTS voice cloning."""
+    writer: _BackgroundWriter,
+) -> ClipBatchSynthesizer:
+    """Load Qwen3-TTS and return a function that synthesizes a same-speaker batch.
+
+    Clips are handed to writer, so they land on disk after the function returns.
+    """
     from qwen_tts import Qwen3TTSModel
 
     device = get_device()
@@ -110,16 +276,16 @@ def _synthesize_with_qwen(
         except ImportError:
             attn_impl = "sdpa"
 
-    tts = Qwen3TTSModel.from_pretrained(
-        "Qwen/Qwen3-TTS-12Hz-1.7B-Base",
-        device_map=device,
-        dtype=dtype,
-        attn_implementation=attn_impl,
+    tts = _model_cache.get_or_load(
+        ("qwen3-tts", device, dtype, attn_impl),
+        lambda: Qwen3TTSModel.from_pretrained(
+            "Qwen/Qwen3-TTS-12Hz-1.7B-Base",
+            device_map=device,
+            dtype=dtype,
+            attn_implementation=attn_impl,
+        ),
     )
 
-    out_dir = os.path.join(work_dir, "tts_clips")
-    os.makedirs(out_dir, exist_ok=True)
-
     # Pre-compute voice clone prompts per speaker for efficiency
     print("[Step 4] 为每个说话人生成声音特征...")
     speaker_prompts: dict = {}
@@ -157,40 +323,37 @@ def _synthesize_with_qwen(
         )
         print(f"  {speaker}: 声音特征已提取")
 
-    wav_paths: list[str] = []
-    total = len(segments)
-
-    if progress_every < 1:
-        progress_every = 1
-
-    for i, seg in enumerate(segments):
-        speaker = seg["speaker"]
-        out_path = os.path.join(out_dir, f"seg_{i:04d}.wav")
-        prompt = speaker_prompts.get(speaker)
-
+    def _synthesize(batch: list[tuple[dict, str]]) -> None:
+        # Callers batch a single speaker, so one clone prompt serves the batch.
+        prompt = speaker_prompts.get(batch[0][0]["speaker"])
+        prompt_items = prompt if isinstance(prompt, list) else [prompt]
         wavs, sample_rate = tts.generate_voice_clone(
-            text=_segment_text(seg),
-            language="Chinese",
-            voice_clone_prompt=prompt,
+            text=[_segment_text(seg) for seg, _ in batch],
+            language=["Chinese"] * len(batch),
+            voice_clone_prompt=prompt_items * len(batch),
         )
-        sf.write(out_path, wavs[0], sample_rate)
-        wav_paths.append(out_path)
+        if len(wavs) != len(batch):
+            raise RuntimeError(
+                f"Qwen3-TTS 返回 {len(wavs)} 段音频，预期 {len(batch)} 段"
+            )
+        for wav, (_, out_path) in zip(wavs, batch):
+            # Explicit so the int16 read in concatenate.py does not depend on soundfile's default.
+            writer.submit(sf.write, out_path, wav, sample_rate, subtype="PCM_16")
 
-        if (i + 1) % progress_every == 0 or i == total - 1:
-            print(f"  已合成 {i + 1}/{total}")
-
-    return wav_paths
+    return _synthesize
 
 
-def _synthesize_with_indextts2(
-    segments: list[dict],
+def _load_indextts2(
     ref_audio_paths: dict[str, str],
-    work_dir: str,
     index_tts_model_dir: str,
     index_tts_cfg_path: str | None,
-    progress_every: int,
-) -> list[str]:
-    """Synthesize with IndexTTS2 voice cloning."""
+    torch_compile: bool = False,
+) -> ClipBatchSynthesizer:
+    """Load IndexTTS2 and return a function that synthesizes a batch of segments.
+
+    torch_compile asks IndexTTS2 to torch.compile its decoder; the first few
+    segments pay the compile cost, later ones run the compiled graph.
+    """
     from indextts.infer_v2 import IndexTTS2
 
     device = get_device()
@@ -198,43 +361,48 @@ def _synthesize_with_indextts2(
     cfg_path = index_tts_cfg_path or os.path.join(index_tts_model_dir, "config.yaml")
     use_fp16 = device == "cuda"
     use_cuda_kernel = device == "cuda"
+    extra_kwargs = {}
+    if torch_compile:
+        if _accepts_kwarg(IndexTTS2, "use_torch_compile"):
+            extra_kwargs["use_torch_compile"] = True
+        else:
+            print("[Step 4] 警告: 当前 indextts 版本不支持 use_torch_compile，忽略 --index-tts-compile")
 
     print(f"[Step 4] 加载 IndexTTS2 模型 ({index_device})...")
-    tts = IndexTTS2(
-        cfg_path=cfg_path,
-        model_dir=index_tts_model_dir,
-        use_fp16=use_fp16,
-        device=index_device,
-        use_cuda_kernel=use_cuda_kernel,
-        use_deepspeed=False,
+    tts = _model_cache.get_or_load(
+        ("indextts2", cfg_path, index_tts_model_dir, index_device, bool(extra_kwargs)),
+        lambda: IndexTTS2(
+            cfg_path=cfg_path,
+            model_dir=index_tts_model_dir,
+            use_fp16=use_fp16,
+            device=index_device,
+            use_cuda_kernel=use_cuda_kernel,
+            use_deepspeed=False,
+            **extra_kwargs,
+        ),
     )
 
-    out_dir = os.path.join(work_dir, "tts_clips")
-    os.makedirs(out_dir, exist_ok=True)
-
-    if progress_every < 1:
-        progress_every = 1
-
     default_ref = next(iter(ref_audio_paths.values()), None)
     if default_ref is None:
         raise ValueError("未找到参考音频，无法执行声音克隆")
 
-    wav_paths: list[str] = []
-    total = len(segments)
+    def _synthesize(batch: list[tuple[dict, str]]) -> None:
+        # IndexTTS2 has no batched inference entry point; run the batch serially.
+        # infer() re-encodes spk_audio_prompt only when it differs from the
+        # previous call, so same-speaker batches encode the reference once.
+        for seg, out_path in batch:
+            tts.infer(
+                spk_audio_prompt=ref_audio_paths.get(seg.get("speaker", ""), default_ref),
+                text=_segment_text(seg),
+                output_path=out_path,
+                verbose=False,
+            )
 
-    for i, seg in enumerate(segments):
-        speaker = seg.get("speaker", "")
-        ref_path = ref_audio_paths.get(speaker, default_ref)
-        out_path = os.path.join(out_dir, f"seg_{i:04d}.wav")
-        tts.infer(
-            spk_audio_prompt=ref_path,
-            text=_segment_text(seg),
-            output_path=out_path,
-            verbose=False,
-        )
-        wav_paths.append(out_path)
+    return _synthesize
 
-        if (i + 1) % progress_every == 0 or i == total - 1:
-            print(f"  已合成 {i + 1}/{total}")
 
-    return wav_paths
+def _accepts_kwarg(func: Callable, name: str) -> bool:
+    try:
+        return name in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
@@ -1,24 +1,125 @@
 """Step 1: WhisperX 转录 + 说话人分离."""
 
+import importlib
 import os
+import pickle
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
 
+import torch
 import whisperx
 
-from tools import get_device
+from tools import _model_cache
+from tools.device import get_device
 
+# PyTorch >=2.6 defaults torch.load to weights_only=True, but the pyannote
+# VAD/diarization checkpoints pickle these omegaconf/pyannote objects.
+CHECKPOINT_SAFE_GLOBALS = (
+    ("omegaconf", "DictConfig"),
+    ("omegaconf", "ListConfig"),
+    ("omegaconf.base", "ContainerMetadata"),
+    ("omegaconf.base", "Metadata"),
+    ("omegaconf.nodes", "AnyNode"),
+    ("typing", "Any"),
+    ("collections", "defaultdict"),
+    ("torch.torch_version", "TorchVersion"),
+    ("pyannote.audio.core.model", "Introspection"),
+    ("pyannote.audio.core.task", "Specifications"),
+    ("pyannote.audio.core.task", "Problem"),
+    ("pyannote.audio.core.task", "Resolution"),
+)
 
-def transcribe(audio_path: str, model_size: str = "large-v3") -> list[dict]:
+COMPUTE_TYPES = ("float16", "int8_float16", "int8", "int8_float32", "float32")
+# CTranslate2 has no float16 kernels on CPU
+CPU_UNSUPPORTED_COMPUTE_TYPES = {"float16", "int8_float16"}
+
+
+def _checkpoint_safe_globals() -> list:
+    allowed = []
+    for module_name, attr in CHECKPOINT_SAFE_GLOBALS:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        obj = getattr(module, attr, None)
+        if obj is not None:
+            allowed.append(obj)
+    return allowed
+
+
+@contextmanager
+def _full_unpickling_torch_load() -> Iterator[None]:
+    """Temporarily force weights_only=False, restoring torch.load afterwards."""
+    original_load = torch.load
+
+    def _load(*args, **kwargs):
+        kwargs["weights_only"] = False
+        return original_load(*args, **kwargs)
+
+    torch.load = _load
+    try:
+        yield
+    finally:
+        torch.load = original_load
+
+
+def _load_pyannote_checkpoints(loader: Callable, *args, **kwargs):
+    """Run a loader that reads pyannote checkpoints with only their classes allowlisted.
+
+    Falls back to full unpickling (scoped to this call) if a checkpoint pickles
+    a type missing from CHECKPOINT_SAFE_GLOBALS.
+    """
+    safe_globals = getattr(torch.serialization, "safe_globals", None)
+    scope = safe_globals(_checkpoint_safe_globals()) if safe_globals else nullcontext()
+    with scope:
+        try:
+            return loader(*args, **kwargs)
+        except pickle.UnpicklingError as exc:
+            print(f"[Step 1] 警告: 检查点含未列入白名单的类型，改用完整反序列化加载: {exc}")
+    with _full_unpickling_torch_load():
+        return loader(*args, **kwargs)
+
+
+def _resolve_compute_type(whisper_device: str, compute_type: str | None) -> str:
+    if not compute_type:
+        # int8 weights with dynamic activation quantization: roughly 2x faster
+        # than float32 on CPU and half the memory, with negligible WER change.
+        return "float16" if whisper_device == "cuda" else "int8"
+    if compute_type not in COMPUTE_TYPES:
+        raise ValueError(
+            f"不支持的 compute_type: {compute_type}. 可选: {', '.join(COMPUTE_TYPES)}"
+        )
+    if whisper_device == "cpu" and compute_type in CPU_UNSUPPORTED_COMPUTE_TYPES:
+        print(f"[Step 1] 警告: CPU 不支持 {compute_type}，改用 int8")
+        return "int8"
+    return compute_type
+
+
+def transcribe(
+    audio_path: str,
+    model_size: str = "large-v3",
+    compute_type: str | None = None,
+) -> list[dict]:
     """Transcribe audio with WhisperX and assign speaker labels.
 
+    compute_type selects the CTranslate2 precision (e.g. float16, int8); by
+    default float16 on CUDA and int8 on CPU.
+
     Returns a list of segments: [{start, end, text, speaker}, ...]
     """
     device = get_device()
     # WhisperX (faster-whisper/ctranslate2) only supports cuda and cpu
     whisper_device = "cuda" if device == "cuda" else "cpu"
-    compute_type = "float16" if whisper_device == "cuda" else "float32"
+    compute_type = _resolve_compute_type(whisper_device, compute_type)
 
-    print(f"[Step 1] 加载 WhisperX 模型 ({model_size}, {whisper_device})...")
-    model = whisperx.load_model(model_size, whisper_device, compute_type=compute_type)
+    print(f"[Step 1] 加载 WhisperX 模型 ({model_size}, {whisper_device}, {compute_type})...")
+    # load_model also loads the pyannote VAD checkpoint
+    model = _model_cache.get_or_load(
+        ("whisperx", model_size, whisper_device, compute_type),
+        lambda: _load_pyannote_checkpoints(
+            whisperx.load_model, model_size, whisper_device, compute_type=compute_type
+        ),
+    )
 
     print("[Step 1] 转录中...")
     audio = whisperx.load_audio(audio_path)
@@ -26,8 +127,11 @@ def transcribe(audio_path: str, model_size: str = "large-v3") -> list[dict]:
 
     # Align whisper output for word-level timestamps
     print("[Step 1] 对齐时间戳...")
-    align_model, metadata = whisperx.load_align_model(
-        language_code=result["language"], device=whisper_device
+    align_model, metadata = _model_cache.get_or_load(
+        ("whisperx-align", result["language"], whisper_device),
+        lambda: whisperx.load_align_model(
+            language_code=result["language"], device=whisper_device
+        ),
     )
     result = whisperx.align(
         result["segments"], align_model, metadata, audio, whisper_device,
@@ -44,8 +148,11 @@ def transcribe(audio_path: str, model_size: str = "large-v3") -> list[dict]:
 
     print("[Step 1] 说话人分离中...")
     from whisperx.diarize import DiarizationPipeline
-    diarize_pipeline = DiarizationPipeline(
-        use_auth_token=hf_token, device=whisper_device
+    diarize_pipeline = _model_cache.get_or_load(
+        ("whisperx-diarize", whisper_device),
+        lambda: _load_pyannote_checkpoints(
+            DiarizationPipeline, use_auth_token=hf_token, device=whisper_device
+        ),
     )
     diarize_segments = diarize_pipeline(audio_path)
     result = whisperx.assign_word_speakers(diarize_segments, result)
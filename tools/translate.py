@@ -1,10 +1,28 @@
 """Step 3: LLM 翻译（DeepSeek / OpenAI）."""
 
+import bisect
+import functools
+import itertools
+import json
+import math
 import os
+import random
+import re
 import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import openai
 from openai import OpenAI
 
+from tools import _llm_cache
+
+# Leading number and punctuation like "1. " or "1、"
+_NUMBER_PREFIX_RE = re.compile(r"^\d+(?:\. |[、。]|[)）] )")
+
 TRANSLATE_SYSTEM_PROMPT = (
     "你是一位专业的播客翻译。请将以下英文播客内容翻译成中文。\n"
     "要求：\n"
@@ -14,7 +32,11 @@ TRANSLATE_SYSTEM_PROMPT = (
     "4. 不要添加任何解释或标注"
 )
 
-BATCH_SIZE = 20  # segments per API call
+BATCH_SIZE = 25  # segments per API call; grown for short lines, see _choose_batch_size
+MAX_BATCH_SIZE = 80  # longer numbered lists misalign more often
+CHARS_PER_TOKEN = 4  # rough source-text estimate for English
+TRANSLATE_TARGET_TOKENS_ENV = "BABEL_TRANSLATE_TARGET_TOKENS"
+DEFAULT_TRANSLATE_TARGET_TOKENS = 1000  # source tokens per API call (~4000 chars)
 SUMMARY_MAX_SEGMENTS = 300
 SUMMARY_MAX_CHARS = 24000
 SUMMARY_SYSTEM_PROMPT = (
@@ -25,7 +47,7 @@ SUMMARY_SYSTEM_PROMPT = (
     "3. 不杜撰信息，不输出与材料无关内容\n"
     "4. 仅输出总结正文，不要标题、编号或Markdown"
 )
-DETAILED_SUMMARY_CHUNK_MAX_CHARS = 12000
+DETAILED_SUMMARY_CHUNK_MAX_TOKENS = 12000  # estimated, see _estimate_tokens
 DETAILED_SUMMARY_CHUNK_OVERLAP_LINES = 6
 DETAILED_SUMMARY_INTERMEDIATE_MAX_CHARS = 2200
 DETAILED_SUMMARY_CHUNK_SYSTEM_PROMPT = (
@@ -38,17 +60,44 @@ DETAILED_SUMMARY_MERGE_SYSTEM_PROMPT = (
 DETAILED_SUMMARY_FINAL_SYSTEM_PROMPT = (
     "你是一位资深中文播客编辑。请输出详细、准确、结构清晰的中文播客总结。"
 )
+TRANSLATE_CONCURRENCY_ENV = "BABEL_TRANSLATE_CONCURRENCY"
+DEFAULT_TRANSLATE_CONCURRENCY = 8  # in-flight chat requests; keep under provider RPM
+LLM_RETRY_TRIES = 5
+LLM_REQUEST_TIMEOUT_SECONDS = 120  # per attempt; the SDK default is 10 minutes
+# The final detailed summary asks for up to 5000 characters; slow models need longer.
+LLM_LONG_REQUEST_TIMEOUT_SECONDS = 600
+LLM_RETRY_BASE_SECONDS = 1.0
+LLM_RPM_ENV = "BABEL_LLM_RPM"  # requests per minute; 0 disables the limit
+LLM_TPM_ENV = "BABEL_LLM_TPM"  # estimated input tokens per minute; 0 disables the limit
+RATE_LIMIT_COOLDOWN_SECONDS = 30  # refill at half rate this long after a 429
+BATCH_API_POLL_INTERVAL_SECONDS = 30
+BATCH_API_MAX_POLL_INTERVAL_SECONDS = 300  # polling backs off up to this
+BATCH_API_TERMINAL_FAILURES = {"failed", "expired", "cancelling", "cancelled"}
+
+_T = TypeVar("_T")
+# Rate limits, connection errors/timeouts and 5xx; anything else is not retried.
+_TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
 
 TRANSLATE_PROVIDERS = {
     "deepseek": {
         "api_key_env": "DEEPSEEK_API_KEY",
         "base_url": "https://api.deepseek.com",
         "default_model": "deepseek-chat",
+        # DeepSeek publishes no fixed rate limit.
+        "rpm": None,
+        "tpm": None,
     },
     "openai": {
         "api_key_env": "OPENAI_API_KEY",
         "base_url": None,
         "default_model": "gpt-5-mini",
+        # Conservative usage-tier defaults; raise via BABEL_LLM_RPM / BABEL_LLM_TPM.
+        "rpm": 500,
+        "tpm": 200_000,
     },
 }
 
@@ -69,12 +118,140 @@ def _build_translate_client(provider: str) -> tuple[OpenAI, str]:
         print(f"错误: 未设置 {api_key_env}", file=sys.stderr)
         sys.exit(1)
 
-    client_kwargs = {"api_key": api_key}
-    base_url = config["base_url"]
+    client = _get_client(OpenAI, api_key, config["base_url"])
+    return client, config["default_model"]
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(factory: Callable[..., OpenAI], api_key: str, base_url: str | None) -> OpenAI:
+    """Return one client per provider/key, so its connection pool and TLS
+    sessions are reused across translation and summary calls.
+
+    The factory is part of the key so a patched ``OpenAI`` gets a fresh client.
+    """
+    # _with_retry is the only retry policy; SDK retries would multiply its attempts.
+    client_kwargs = {"api_key": api_key, "max_retries": 0}
     if base_url:
         client_kwargs["base_url"] = base_url
-    client = OpenAI(**client_kwargs)
-    return client, config["default_model"]
+    return factory(**client_kwargs)
+
+
+def _resolve_concurrency() -> int:
+    raw = os.getenv(TRANSLATE_CONCURRENCY_ENV, "").strip()
+    if not raw:
+        return DEFAULT_TRANSLATE_CONCURRENCY
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        print(
+            f"  警告: {TRANSLATE_CONCURRENCY_ENV}={raw!r} 不是整数，"
+            f"使用默认值 {DEFAULT_TRANSLATE_CONCURRENCY}"
+        )
+        return DEFAULT_TRANSLATE_CONCURRENCY
+
+
+def _resolve_target_tokens() -> int:
+    raw = os.getenv(TRANSLATE_TARGET_TOKENS_ENV, "").strip()
+    if not raw:
+        return DEFAULT_TRANSLATE_TARGET_TOKENS
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        print(
+            f"  警告: {TRANSLATE_TARGET_TOKENS_ENV}={raw!r} 不是整数，"
+            f"使用默认值 {DEFAULT_TRANSLATE_TARGET_TOKENS}"
+        )
+        return DEFAULT_TRANSLATE_TARGET_TOKENS
+
+
+def _resolve_rate_limit(env_name: str, default: int | None) -> int | None:
+    raw = os.getenv(env_name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        print(f"  警告: {env_name}={raw!r} 不是整数，使用默认值 {default}")
+        return default
+    return value if value > 0 else None
+
+
+class _RateLimiter:
+    """Thread-safe token buckets for requests and input tokens per minute.
+
+    acquire() blocks until both buckets hold enough capacity, so concurrent
+    batches stay under the provider's limits instead of bursting into 429s.
+    After a 429, throttle() halves the refill rate for a cooldown period.
+    """
+
+    def __init__(self, rpm: int | None, tpm: int | None) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self._lock = threading.Lock()
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._slow_until = 0.0
+
+    def _rate_scale(self, now: float) -> float:
+        return 0.5 if now < self._slow_until else 1.0
+
+    def _refill(self, now: float) -> None:
+        per_second = self._rate_scale(now) * (now - self._updated) / 60.0
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + self.rpm * per_second)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + self.tpm * per_second)
+
+    def acquire(self, tokens: int) -> None:
+        if self.tpm:
+            # A single request larger than the bucket still goes once it is full.
+            tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = (1 - self._requests) * 60.0 / self.rpm
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+                if not wait:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+                wait /= self._rate_scale(now)
+            time.sleep(wait)
+
+    def throttle(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._slow_until = time.monotonic() + RATE_LIMIT_COOLDOWN_SECONDS
+
+
+@functools.lru_cache(maxsize=8)
+def _get_rate_limiter(provider: str, rpm: int | None, tpm: int | None) -> _RateLimiter:
+    """One limiter per provider and limits, shared by every worker thread."""
+    return _RateLimiter(rpm, tpm)
+
+
+def _rate_limiter_for(provider: str) -> _RateLimiter | None:
+    config = TRANSLATE_PROVIDERS.get(provider, {})
+    rpm = _resolve_rate_limit(LLM_RPM_ENV, config.get("rpm"))
+    tpm = _resolve_rate_limit(LLM_TPM_ENV, config.get("tpm"))
+    if not rpm and not tpm:
+        return None
+    return _get_rate_limiter(provider, rpm, tpm)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count: CHARS_PER_TOKEN per ASCII char, one per CJK char."""
+    # Each non-ASCII (mostly CJK) character adds two extra UTF-8 bytes.
+    wide = (len(text.encode("utf-8")) - len(text)) // 2
+    return (len(text) - wide) // CHARS_PER_TOKEN + wide
 
 
 def _resolve_model_name(model: str | None, default_model: str) -> str:
@@ -92,13 +269,12 @@ def _collect_segment_text_lines(segments: list[dict]) -> list[str]:
     return lines
 
 
-def _create_chat_completion(
-    client: OpenAI,
+def _build_chat_request(
     provider: str,
     model_name: str,
     system_prompt: str,
     user_msg: str,
-) -> str:
+) -> dict:
     request_kwargs = {
         "model": model_name,
         "messages": [
@@ -106,11 +282,156 @@ def _create_chat_completion(
             {"role": "user", "content": user_msg},
         ],
     }
+    # gpt-5-mini only supports the default temperature value; avoid sending it.
     if provider == "deepseek":
         request_kwargs["temperature"] = 0.3
+    return request_kwargs
+
+
+def _with_retry(
+    fn: Callable[[], _T],
+    *,
+    tries: int = LLM_RETRY_TRIES,
+    base: float = LLM_RETRY_BASE_SECONDS,
+    on_rate_limit: Callable[[], None] | None = None,
+) -> _T:
+    """Call fn, retrying rate limits, connection errors and 5xx with jittered backoff."""
+    for attempt in range(tries):
+        try:
+            return fn()
+        except _TRANSIENT_ERRORS as exc:
+            if on_rate_limit is not None and isinstance(exc, openai.RateLimitError):
+                on_rate_limit()
+            if attempt == tries - 1:
+                raise
+            delay = random.uniform(0, base * 2**attempt)
+            print(f"  警告: LLM 请求失败（{type(exc).__name__}），{delay:.1f}s 后重试")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def _create_chat_completion(
+    client: OpenAI,
+    provider: str,
+    model_name: str,
+    system_prompt: str,
+    user_msg: str,
+    timeout: float = LLM_REQUEST_TIMEOUT_SECONDS,
+) -> str:
+    """Return the model's reply, reusing a cached reply for an identical prompt.
+
+    timeout bounds each attempt; pass a larger one for long-output requests.
+    """
+    cache_key = None
+    if _llm_cache.enabled():
+        cache_key = _llm_cache.make_key(provider, model_name, system_prompt, user_msg)
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-    response = client.chat.completions.create(**request_kwargs)
-    return (response.choices[0].message.content or "").strip()
+    request_kwargs = _build_chat_request(provider, model_name, system_prompt, user_msg)
+    limiter = _rate_limiter_for(provider)
+    if limiter is None:
+        response = _with_retry(
+            lambda: client.chat.completions.create(
+                **request_kwargs, timeout=timeout
+            )
+        )
+    else:
+        tokens = _estimate_tokens(system_prompt) + _estimate_tokens(user_msg)
+
+        def _limited_create():
+            limiter.acquire(tokens)
+            return client.chat.completions.create(
+                **request_kwargs, timeout=timeout
+            )
+
+        response = _with_retry(_limited_create, on_rate_limit=limiter.throttle)
+    content = (response.choices[0].message.content or "").strip()
+    # Empty replies are treated as failures downstream, so never cache them.
+    if cache_key is not None and content:
+        _llm_cache.put(cache_key, content)
+    return content
+
+
+def _submit_chat_batch(client: OpenAI, requests: list[tuple[str, dict]]) -> str:
+    """Upload chat requests as a Batch API JSONL file and start the batch job."""
+    rows = [
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            },
+            ensure_ascii=False,
+        )
+        for custom_id, body in requests
+    ]
+    payload = ("\n".join(rows) + "\n").encode("utf-8")
+    batch_file = _with_retry(
+        lambda: client.files.create(
+            file=("babel_batch.jsonl", payload),
+            purpose="batch",
+        )
+    )
+    batch = _with_retry(
+        lambda: client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+    )
+    return batch.id
+
+
+def _raise_if_cancelled(cancel: threading.Event | None) -> None:
+    if cancel is not None and cancel.is_set():
+        raise RuntimeError("翻译已取消")
+
+
+def _wait_chat_batch(
+    client: OpenAI,
+    batch_id: str,
+    poll_interval: float = BATCH_API_POLL_INTERVAL_SECONDS,
+    cancel: threading.Event | None = None,
+) -> dict[str, str]:
+    """Poll a Batch API job until it finishes; return {custom_id: reply_text}.
+
+    The wait between polls doubles from poll_interval up to
+    BATCH_API_MAX_POLL_INTERVAL_SECONDS, since jobs can run for hours. Setting
+    cancel stops the wait and cancels the job.
+    """
+    delay = poll_interval
+    while True:
+        batch = _with_retry(lambda: client.batches.retrieve(batch_id))
+        if batch.status == "completed":
+            break
+        if batch.status in BATCH_API_TERMINAL_FAILURES:
+            raise RuntimeError(f"Batch 任务 {batch_id} 未完成，状态: {batch.status}")
+        if cancel is None:
+            time.sleep(delay)
+        elif cancel.wait(delay):
+            try:
+                client.batches.cancel(batch_id)
+            except Exception as exc:
+                print(f"  警告: 取消 Batch 任务 {batch_id} 失败: {exc}")
+            _raise_if_cancelled(cancel)
+        delay = min(delay * 2, BATCH_API_MAX_POLL_INTERVAL_SECONDS)
+
+    replies: dict[str, str] = {}
+    if not batch.output_file_id:
+        return replies
+    content = _with_retry(lambda: client.files.content(batch.output_file_id))
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        body = (row.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        message = (choices[0].get("message") or {}) if choices else {}
+        replies[row["custom_id"]] = (message.get("content") or "").strip()
+    return replies
 
 
 def _collect_summary_source_lines(
@@ -124,38 +445,31 @@ def _collect_summary_source_lines(
         return [], 0
 
     if total_lines > max_segments:
-        sampled = [lines[int(i * total_lines / max_segments)] for i in range(max_segments)]
+        sampled = [lines[i * total_lines // max_segments] for i in range(max_segments)]
         sampled[-1] = lines[-1]
     else:
         sampled = lines
 
-    picked: list[str] = []
-    current_chars = 0
-    for line in sampled:
-        extra = len(line) + 1
-        if picked and current_chars + extra > max_chars:
-            break
-        if not picked and len(line) > max_chars:
-            picked.append(line[:max_chars])
-            break
-        picked.append(line)
-        current_chars += extra
-
-    return picked, total_lines
+    # Keep the longest prefix whose running length (one newline per line) fits.
+    running_chars = list(itertools.accumulate(len(line) + 1 for line in sampled))
+    cut = bisect.bisect_right(running_chars, max_chars)
+    if cut == 0:
+        return [sampled[0][:max_chars]], total_lines
+    return sampled[:cut], total_lines
 
 
 def _estimate_audio_duration_seconds(segments: list[dict]) -> float:
-    starts: list[float] = []
-    ends: list[float] = []
+    first_start = math.inf
+    last_end = -math.inf
     for seg in segments:
         start = seg.get("start")
         end = seg.get("end")
         if isinstance(start, (int, float)) and isinstance(end, (int, float)) and end >= start:
-            starts.append(float(start))
-            ends.append(float(end))
-    if not starts:
+            first_start = min(first_start, start)
+            last_end = max(last_end, end)
+    if first_start == math.inf:
         return 0.0
-    return max(0.0, max(ends) - min(starts))
+    return max(0.0, float(last_end) - float(first_start))
 
 
 def _resolve_detailed_summary_profile(duration_seconds: float) -> tuple[str, str]:
@@ -168,37 +482,42 @@ def _resolve_detailed_summary_profile(duration_seconds: float) -> tuple[str, str
 
 def _split_lines_into_chunks(
     lines: list[str],
-    max_chars: int = DETAILED_SUMMARY_CHUNK_MAX_CHARS,
+    max_tokens: int = DETAILED_SUMMARY_CHUNK_MAX_TOKENS,
     overlap_lines: int = DETAILED_SUMMARY_CHUNK_OVERLAP_LINES,
 ) -> list[list[str]]:
+    """Pack lines into chunks of about max_tokens, sharing overlap_lines at each seam.
+
+    Sizing by estimated tokens rather than characters lets untranslated
+    English lines fill a chunk as fully as Chinese ones.
+    """
     if not lines:
         return []
 
+    # Estimated once per line (plus its newline); overlap lines are revisited.
+    line_tokens = [_estimate_tokens(line) + 1 for line in lines]
     chunks: list[list[str]] = []
     start = 0
     total_lines = len(lines)
 
     while start < total_lines:
         chunk: list[str] = []
-        chunk_chars = 0
+        chunk_tokens = 0
         idx = start
 
         while idx < total_lines:
-            line = lines[idx]
-            line_in_chunk = line if len(line) <= max_chars else line[:max_chars]
-            extra = len(line_in_chunk) + 1
-            if chunk and chunk_chars + extra > max_chars:
+            extra = line_tokens[idx]
+            if chunk and chunk_tokens + extra > max_tokens:
                 break
-            chunk.append(line_in_chunk)
-            chunk_chars += extra
+            line = lines[idx]
+            if extra > max_tokens:
+                # Every character is estimated at one token at most.
+                line = line[:max_tokens]
+            chunk.append(line)
+            chunk_tokens += extra
             idx += 1
-            if chunk_chars >= max_chars:
+            if chunk_tokens >= max_tokens:
                 break
 
-        if not chunk:
-            chunk = [lines[start][:max_chars]]
-            idx = start + 1
-
         chunks.append(chunk)
         if idx >= total_lines:
             break
@@ -207,164 +526,336 @@ def _split_lines_into_chunks(
     return chunks
 
 
-def translate_segments(
+def _build_translation_batches(
     segments: list[dict],
-    provider: str = "deepseek",
-    model: str | None = None,
-) -> list[dict]:
-    """Translate segment texts from English to Chinese via configurable LLM API.
+    max_chars: int,
+    max_segments: int,
+) -> list[list[int]]:
+    """Group segment indices into batches bounded by segment count and characters."""
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_chars = 0
+    for idx, seg in enumerate(segments):
+        extra = len(seg["text"]) + 1
+        if current and (
+            len(current) >= max_segments or current_chars + extra > max_chars
+        ):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(idx)
+        current_chars += extra
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _choose_batch_size(segments: list[dict], target_tokens: int, concurrency: int = 1) -> int:
+    """Pick segments per call so an average batch carries about target_tokens.
 
-    Returns segments with an added 'text_zh' field.
+    Short lines get larger batches (fewer round trips), capped at MAX_BATCH_SIZE
+    and at an even split across the concurrent workers. Never below BATCH_SIZE:
+    long lines are already split by the character budget.
     """
-    provider = provider.strip().lower()
-    client, default_model = _build_translate_client(provider)
-    model_name = _resolve_model_name(model, default_model)
+    if not segments:
+        return BATCH_SIZE
+    avg_tokens = sum(len(seg["text"]) + 1 for seg in segments) / len(segments) / CHARS_PER_TOKEN
+    size = min(int(target_tokens / avg_tokens), MAX_BATCH_SIZE)
+    size = min(size, math.ceil(len(segments) / concurrency))
+    return max(size, BATCH_SIZE)
 
-    print(f"[Step 3] 使用 {provider}:{model_name} 翻译 {len(segments)} 个片段...")
-    translated = list(segments)  # shallow copy
 
-    for i in range(0, len(segments), BATCH_SIZE):
-        batch = segments[i : i + BATCH_SIZE]
-        numbered_lines = "\n".join(
-            f"{j + 1}. {seg['text']}" for j, seg in enumerate(batch)
-        )
-        user_msg = (
-            f"请翻译以下 {len(batch)} 个片段（保持编号对应）：\n\n{numbered_lines}"
-        )
+def _parse_numbered_lines(reply: str) -> list[str]:
+    stripped = (line.strip() for line in reply.splitlines())
+    return [_NUMBER_PREFIX_RE.sub("", line, count=1) for line in stripped if line]
 
-        request_kwargs = {
-            "model": model_name,
-            "messages": [
-                {"role": "system", "content": TRANSLATE_SYSTEM_PROMPT},
-                {"role": "user", "content": user_msg},
-            ],
-        }
-        # gpt-5-mini only supports the default temperature value; avoid sending it.
-        if provider == "deepseek":
-            request_kwargs["temperature"] = 0.3
 
-        response = client.chat.completions.create(**request_kwargs)
+def _number_lines(lines: list[str]) -> str:
+    # str.join materializes a generator into a list first; build the list directly.
+    return "\n".join([f"{i}. {line}" for i, line in enumerate(lines, 1)])
+
 
-        reply = response.choices[0].message.content.strip()
-        lines = reply.splitlines()
+def _build_translate_user_msg(texts: list[str]) -> str:
+    # Fixed text first and per-batch values last, so every request in a run
+    # shares one prefix for the provider's prompt cache.
+    numbered_lines = _number_lines(texts)
+    return f"请翻译以下片段（保持编号对应）：\n\n{numbered_lines}\n\n（共 {len(texts)} 个片段）"
 
-        # Parse numbered lines: strip leading "1. ", "2. " etc.
-        parsed: list[str] = []
-        for line in lines:
-            line = line.strip()
-            if not line:
+
+def _request_translations(
+    client: OpenAI,
+    provider: str,
+    model_name: str,
+    texts: list[str],
+) -> list[str]:
+    reply = _create_chat_completion(
+        client=client,
+        provider=provider,
+        model_name=model_name,
+        system_prompt=TRANSLATE_SYSTEM_PROMPT,
+        user_msg=_build_translate_user_msg(texts),
+    )
+    return _parse_numbered_lines(reply)
+
+
+def _request_translations_via_batch_api(
+    client: OpenAI,
+    provider: str,
+    model_name: str,
+    segments: list[dict],
+    batches: list[list[int]],
+    poll_interval: float = BATCH_API_POLL_INTERVAL_SECONDS,
+    cancel: threading.Event | None = None,
+) -> dict[int, list[str]]:
+    """Translate every batch in one Batch API job; return {batch_number: lines}.
+
+    Batches already in the LLM cache are answered locally and left out of the job.
+    """
+    results: dict[int, list[str]] = {}
+    requests: list[tuple[str, dict]] = []
+    cache_keys: dict[str, str] = {}
+    for i, batch_indices in enumerate(batches):
+        user_msg = _build_translate_user_msg([segments[idx]["text"] for idx in batch_indices])
+        custom_id = f"b{i}"
+        if _llm_cache.enabled():
+            cache_keys[custom_id] = _llm_cache.make_key(
+                provider, model_name, TRANSLATE_SYSTEM_PROMPT, user_msg
+            )
+            cached = _llm_cache.get(cache_keys[custom_id])
+            if cached is not None:
+                results[i] = _parse_numbered_lines(cached)
                 continue
-            # Remove leading number and punctuation like "1. " or "1、"
-            for sep in [". ", "、", "。", ") ", "） "]:
-                idx = line.find(sep)
-                if idx != -1 and line[:idx].isdigit():
-                    line = line[idx + len(sep):]
-                    break
-            parsed.append(line)
+        requests.append((
+            custom_id,
+            _build_chat_request(provider, model_name, TRANSLATE_SYSTEM_PROMPT, user_msg),
+        ))
+    if not requests:
+        return results
 
-        # Assign translations back
-        for j, seg_idx in enumerate(range(i, i + len(batch))):
-            if j < len(parsed):
-                translated[seg_idx]["text_zh"] = parsed[j]
-            else:
-                # Fallback: keep original if parsing failed
-                translated[seg_idx]["text_zh"] = batch[j]["text"]
-                print(f"  警告: 片段 {seg_idx} 翻译解析失败，保留原文")
+    batch_id = _submit_chat_batch(client, requests)
+    print(f"[Step 3] 已提交 Batch API 翻译任务: {batch_id}（{len(requests)} 个请求），等待完成...")
+    replies = _wait_chat_batch(client, batch_id, poll_interval, cancel=cancel)
+    for custom_id, _ in requests:
+        reply = replies.get(custom_id, "")
+        if reply and custom_id in cache_keys:
+            _llm_cache.put(cache_keys[custom_id], reply)
+        results[int(custom_id[1:])] = _parse_numbered_lines(reply)
+    return results
 
-        print(f"  已翻译 {min(i + BATCH_SIZE, len(segments))}/{len(segments)}")
 
-    return translated
+def _translate_batch(
+    client: OpenAI,
+    provider: str,
+    model_name: str,
+    segments: list[dict],
+    batch_indices: list[int],
+    parsed: list[str] | None = None,
+) -> list[str]:
+    """Translate one batch, retrying segment by segment if the reply misaligns.
 
+    ``parsed`` is a reply already fetched elsewhere (the Batch API); it is only
+    checked for alignment.
+    """
+    texts = [segments[seg_idx]["text"] for seg_idx in batch_indices]
+    if parsed is None:
+        try:
+            parsed = _request_translations(client, provider, model_name, texts)
+        except _TRANSIENT_ERRORS as exc:
+            # Retries are exhausted; keep the originals rather than abort the run.
+            print(f"  警告: 批次翻译请求失败，保留原文: {exc}")
+            return []
 
-def summarize_translated_segments(
+    if len(parsed) != len(batch_indices) and len(batch_indices) > 1:
+        print(
+            f"  警告: 批次返回 {len(parsed)} 行，期望 {len(batch_indices)} 行，"
+            "逐段重试"
+        )
+        parsed = []
+        for text in texts:
+            try:
+                single = _request_translations(client, provider, model_name, [text])
+            except _TRANSIENT_ERRORS as exc:
+                print(f"  警告: 单段翻译请求失败，保留原文: {exc}")
+                single = []
+            parsed.append(single[0] if single else "")
+    return parsed
+
+
+def _needs_translation(seg: dict) -> bool:
+    """True unless seg has a translation from an earlier run.
+
+    A failed batch falls back to text_zh == text, which is retried as well.
+    """
+    text_zh = (seg.get("text_zh") or "").strip()
+    return not text_zh or text_zh == seg.get("text", "").strip()
+
+
+def translate_segments(
     segments: list[dict],
     provider: str = "deepseek",
     model: str | None = None,
-) -> str:
-    """Summarize translated segments into a short Chinese text."""
+    batch_max_chars: int | None = None,
+    batch_max_segments: int | None = None,
+    on_batch_done: Callable[[list[int]], None] | None = None,
+    use_batch_api: bool = False,
+    cancel: threading.Event | None = None,
+) -> list[dict]:
+    """Translate segment texts from English to Chinese via configurable LLM API.
+
+    Segments are packed into multi-segment prompts bounded by ``batch_max_segments``
+    and ``batch_max_chars``; by default both follow ``BABEL_TRANSLATE_TARGET_TOKENS``
+    (source tokens per call, default 1000). When a reply does not line up with its batch, only that
+    batch is retried segment by segment. Segments that already have a 'text_zh'
+    other than their source text are kept and not sent. Up to ``BABEL_TRANSLATE_CONCURRENCY``
+    batches (default 8) are in flight at once. ``on_batch_done`` receives the
+    segment indices of each finished batch, in completion order, so downstream
+    steps can start early.
+
+    With ``use_batch_api`` (openai only), all batches go out as one OpenAI Batch
+    API job (about half the cost, completes within 24h); on any failure the
+    regular per-request path is used instead.
+
+    Once ``cancel`` is set, batches that have not started are skipped and
+    RuntimeError is raised; segments in those batches keep no 'text_zh'.
+
+    Sets 'text_zh' on each segment dict in place and returns the same list.
+    """
     provider = provider.strip().lower()
     client, default_model = _build_translate_client(provider)
     model_name = _resolve_model_name(model, default_model)
-    source_lines, total_lines = _collect_summary_source_lines(segments)
+    concurrency = _resolve_concurrency()
+    target_tokens = _resolve_target_tokens()
+    max_chars = batch_max_chars or target_tokens * CHARS_PER_TOKEN
 
-    if not source_lines:
-        return "（无可总结内容）"
+    print(f"[Step 3] 使用 {provider}:{model_name} 翻译 {len(segments)} 个片段...")
+    # Segments that already carry a translation (e.g. reloaded from an earlier
+    # run) are kept as is; only the rest are batched.
+    pending = [i for i, seg in enumerate(segments) if _needs_translation(seg)]
+    done = 0
+    if len(pending) < len(segments):
+        kept = sorted(set(range(len(segments))).difference(pending))
+        done = len(kept)
+        if on_batch_done is not None:
+            on_batch_done(kept)
+        print(f"  沿用已有译文 {done} 个片段")
+    pending_segments = [segments[i] for i in pending]
+    max_segments = batch_max_segments or _choose_batch_size(
+        pending_segments, target_tokens, concurrency
+    )
+    batches = [
+        [pending[j] for j in batch]
+        for batch in _build_translation_batches(pending_segments, max_chars, max_segments)
+    ]
 
-    print(f"[Step 3.5] 使用 {provider}:{model_name} 生成翻译总结...")
+    # Batches of only blank lines (silent stretches) need no request.
+    skipped_blank = 0
+    blank_batches: list[list[int]] = []
+    text_batches: list[list[int]] = []
+    for batch_indices in batches:
+        has_text = any(segments[seg_idx]["text"].strip() for seg_idx in batch_indices)
+        (text_batches if has_text else blank_batches).append(batch_indices)
+    batches = text_batches
+    if blank_batches:
+        for batch_indices in blank_batches:
+            for seg_idx in batch_indices:
+                segments[seg_idx]["text_zh"] = ""
+            skipped_blank += len(batch_indices)
+            if on_batch_done is not None:
+                on_batch_done(batch_indices)
+        done += skipped_blank
+        print(f"  跳过 {skipped_blank} 个空白片段")
+
+    prefetched: dict[int, list[str]] = {}
+    if use_batch_api:
+        if provider != "openai":
+            print(f"  警告: Batch API 仅支持 openai，当前为 {provider}，改为逐批请求")
+        else:
+            try:
+                prefetched = _request_translations_via_batch_api(
+                    client, provider, model_name, segments, batches, cancel=cancel
+                )
+            except Exception as exc:
+                _raise_if_cancelled(cancel)
+                print(f"  警告: Batch API 翻译失败，改为逐批请求: {exc}")
+
+    def _run_batch(batch_indices: list[int], parsed: list[str] | None) -> list[str]:
+        # Checked as each batch starts, so a cancel skips every queued batch.
+        _raise_if_cancelled(cancel)
+        return _translate_batch(client, provider, model_name, segments, batch_indices, parsed)
+
+    # Batches are independent network round trips, so keep several in flight.
+    # Results are assigned on this thread as each batch finishes.
+    workers = min(concurrency, len(batches)) or 1
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_run_batch, batch_indices, prefetched.get(i)): batch_indices
+            for i, batch_indices in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            batch_indices = futures[future]
+            parsed = future.result()
+
+            # Assign translations back
+            for j, seg_idx in enumerate(batch_indices):
+                if j < len(parsed) and parsed[j]:
+                    segments[seg_idx]["text_zh"] = parsed[j]
+                else:
+                    # Fallback: keep original if parsing failed
+                    segments[seg_idx]["text_zh"] = segments[seg_idx]["text"]
+                    print(f"  警告: 片段 {seg_idx} 翻译解析失败，保留原文")
+
+            done += len(batch_indices)
+            print(f"  已翻译 {done}/{len(segments)}")
+            if on_batch_done is not None:
+                on_batch_done(batch_indices)
+    finally:
+        # On error, drop batches that have not started yet.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return segments
 
-    source_text = "\n".join(f"{i + 1}. {line}" for i, line in enumerate(source_lines))
+
+def _build_summary_user_msg(source_lines: list[str], total_lines: int) -> str:
+    source_text = _number_lines(source_lines)
     sampled_hint = ""
     if total_lines > len(source_lines):
         sampled_hint = (
             f"说明：原始稿件共 {total_lines} 段，以下为抽样后的 {len(source_lines)} 段片段。\n"
         )
-    user_msg = (
+    return (
         "请根据以下中文播客稿内容写总结。\n"
         f"{sampled_hint}"
         "输出要求：300-500字，信息准确，不要标题和编号。\n\n"
         f"{source_text}"
     )
-    summary = _create_chat_completion(
-        client=client,
-        provider=provider,
-        model_name=model_name,
-        system_prompt=SUMMARY_SYSTEM_PROMPT,
-        user_msg=user_msg,
-    )
-    if not summary:
-        return "（总结生成失败：模型未返回内容）"
-    return summary
 
 
-def summarize_translated_segments_detailed(
-    segments: list[dict],
-    provider: str = "deepseek",
-    model: str | None = None,
-) -> str:
-    """Summarize translated segments into a detailed Chinese report."""
-    provider = provider.strip().lower()
-    client, default_model = _build_translate_client(provider)
-    model_name = _resolve_model_name(model, default_model)
-    source_lines = _collect_segment_text_lines(segments)
-
-    if not source_lines:
-        return "（无可总结内容）"
-
-    duration_seconds = _estimate_audio_duration_seconds(segments)
-    target_chars, topic_range = _resolve_detailed_summary_profile(duration_seconds)
-    chunks = _split_lines_into_chunks(source_lines)
-
-    print(
-        f"[Step 3.6] 使用 {provider}:{model_name} 生成详细总结..."
-        f"（分块 {len(chunks)}）"
+def _build_detailed_chunk_user_msg(idx: int, total_chunks: int, chunk_lines: list[str]) -> str:
+    source_text = _number_lines(chunk_lines)
+    # Instructions are identical for every chunk; the chunk number follows them.
+    return (
+        "请提炼中文播客稿分块的主题信息，供后续汇总。\n"
+        "输出要求：\n"
+        "1. 仅基于给定内容，不杜撰\n"
+        "2. 给出 2-5 个主题候选；每个主题包含：主题名、核心观点、关键论据、阶段性结论\n"
+        "3. 保留关键人名、术语与观点差异\n"
+        f"4. 总长度控制在 {DETAILED_SUMMARY_INTERMEDIATE_MAX_CHARS} 字以内\n"
+        "5. 输出纯文本，不要 Markdown\n\n"
+        f"以下是第 {idx + 1}/{total_chunks} 个分块：\n"
+        f"{source_text}"
     )
 
-    chunk_summaries: list[str] = []
-    for idx, chunk_lines in enumerate(chunks):
-        source_text = "\n".join(f"{i + 1}. {line}" for i, line in enumerate(chunk_lines))
-        user_msg = (
-            f"这是中文播客稿的第 {idx + 1}/{len(chunks)} 个分块。\n"
-            "请提炼该分块的主题信息，供后续汇总。\n"
-            "输出要求：\n"
-            "1. 仅基于给定内容，不杜撰\n"
-            "2. 给出 2-5 个主题候选；每个主题包含：主题名、核心观点、关键论据、阶段性结论\n"
-            "3. 保留关键人名、术语与观点差异\n"
-            f"4. 总长度控制在 {DETAILED_SUMMARY_INTERMEDIATE_MAX_CHARS} 字以内\n"
-            "5. 输出纯文本，不要 Markdown\n\n"
-            f"{source_text}"
-        )
-        chunk_summary = _create_chat_completion(
-            client=client,
-            provider=provider,
-            model_name=model_name,
-            system_prompt=DETAILED_SUMMARY_CHUNK_SYSTEM_PROMPT,
-            user_msg=user_msg,
-        )
-        if not chunk_summary:
-            chunk_summary = "（该分块未返回可用摘要）"
-        chunk_summaries.append(chunk_summary)
-        print(f"  已处理详细分块 {idx + 1}/{len(chunks)}")
 
+def _finish_detailed_summary(
+    client: OpenAI,
+    provider: str,
+    model_name: str,
+    chunk_summaries: list[str],
+    duration_seconds: float,
+) -> str:
+    """Merge per-chunk summaries and write the final detailed report."""
+    target_chars, topic_range = _resolve_detailed_summary_profile(duration_seconds)
     rolling_summary = chunk_summaries[0]
     for idx in range(1, len(chunk_summaries)):
         merge_user_msg = (
@@ -377,13 +868,17 @@ def summarize_translated_segments_detailed(
             f"已有综合摘要：\n{rolling_summary}\n\n"
             f"新增分块摘要：\n{chunk_summaries[idx]}"
         )
-        merged_summary = _create_chat_completion(
-            client=client,
-            provider=provider,
-            model_name=model_name,
-            system_prompt=DETAILED_SUMMARY_MERGE_SYSTEM_PROMPT,
-            user_msg=merge_user_msg,
-        )
+        try:
+            merged_summary = _create_chat_completion(
+                client=client,
+                provider=provider,
+                model_name=model_name,
+                system_prompt=DETAILED_SUMMARY_MERGE_SYSTEM_PROMPT,
+                user_msg=merge_user_msg,
+            )
+        except _TRANSIENT_ERRORS as exc:
+            print(f"  警告: 摘要合并请求失败，直接拼接: {exc}")
+            merged_summary = ""
         if merged_summary:
             rolling_summary = merged_summary
         else:
@@ -409,7 +904,178 @@ def summarize_translated_segments_detailed(
         model_name=model_name,
         system_prompt=DETAILED_SUMMARY_FINAL_SYSTEM_PROMPT,
         user_msg=final_user_msg,
+        timeout=LLM_LONG_REQUEST_TIMEOUT_SECONDS,
     )
     if not detailed_summary:
         return "（详细总结生成失败：模型未返回内容）"
     return detailed_summary
+
+
+def summarize_translated_segments(
+    segments: list[dict],
+    provider: str = "deepseek",
+    model: str | None = None,
+) -> str:
+    """Summarize translated segments into a short Chinese text."""
+    provider = provider.strip().lower()
+    client, default_model = _build_translate_client(provider)
+    model_name = _resolve_model_name(model, default_model)
+    source_lines, total_lines = _collect_summary_source_lines(segments)
+
+    if not source_lines:
+        return "（无可总结内容）"
+
+    print(f"[Step 3.5] 使用 {provider}:{model_name} 生成翻译总结...")
+
+    summary = _create_chat_completion(
+        client=client,
+        provider=provider,
+        model_name=model_name,
+        system_prompt=SUMMARY_SYSTEM_PROMPT,
+        user_msg=_build_summary_user_msg(source_lines, total_lines),
+    )
+    if not summary:
+        return "（总结生成失败：模型未返回内容）"
+    return summary
+
+
+def summarize_translated_segments_detailed(
+    segments: list[dict],
+    provider: str = "deepseek",
+    model: str | None = None,
+) -> str:
+    """Summarize translated segments into a detailed Chinese report."""
+    provider = provider.strip().lower()
+    client, default_model = _build_translate_client(provider)
+    model_name = _resolve_model_name(model, default_model)
+    source_lines = _collect_segment_text_lines(segments)
+
+    if not source_lines:
+        return "（无可总结内容）"
+
+    duration_seconds = _estimate_audio_duration_seconds(segments)
+    chunks = _split_lines_into_chunks(source_lines)
+
+    print(
+        f"[Step 3.6] 使用 {provider}:{model_name} 生成详细总结..."
+        f"（分块 {len(chunks)}）"
+    )
+
+    def _summarize_chunk(idx: int) -> str:
+        try:
+            chunk_summary = _create_chat_completion(
+                client=client,
+                provider=provider,
+                model_name=model_name,
+                system_prompt=DETAILED_SUMMARY_CHUNK_SYSTEM_PROMPT,
+                user_msg=_build_detailed_chunk_user_msg(idx, len(chunks), chunks[idx]),
+            )
+        except _TRANSIENT_ERRORS as exc:
+            # One chunk out of retries should not discard every other chunk.
+            print(f"  警告: 详细分块 {idx + 1} 请求失败，跳过: {exc}")
+            chunk_summary = ""
+        return chunk_summary or "（该分块未返回可用摘要）"
+
+    # Chunk summaries are independent; only the merge pass below is sequential.
+    chunk_summaries: list[str] = []
+    workers = min(_resolve_concurrency(), len(chunks))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for idx, chunk_summary in enumerate(executor.map(_summarize_chunk, range(len(chunks)))):
+            chunk_summaries.append(chunk_summary)
+            print(f"  已处理详细分块 {idx + 1}/{len(chunks)}")
+
+    return _finish_detailed_summary(
+        client, provider, model_name, chunk_summaries, duration_seconds
+    )
+
+
+def submit_summary_batch(
+    segments: list[dict],
+    provider: str = "openai",
+    model: str | None = None,
+    summary_mode: str = "both",
+) -> dict:
+    """Submit summary prompts as one OpenAI Batch API job (about half the cost).
+
+    The short summary and every detailed-summary chunk go into a single batch;
+    the merge/final passes of the detailed summary run in collect_summary_batch().
+    Returns a job dict to pass to collect_summary_batch().
+    """
+    provider = provider.strip().lower()
+    if provider != "openai":
+        raise ValueError(f"Batch API 仅支持 openai，当前为 {provider}")
+    client, default_model = _build_translate_client(provider)
+    model_name = _resolve_model_name(model, default_model)
+
+    job: dict = {"provider": provider, "model_name": model_name, "batch_id": None}
+    requests: list[tuple[str, dict]] = []
+
+    if summary_mode in {"short", "both"}:
+        source_lines, total_lines = _collect_summary_source_lines(segments)
+        job["short"] = bool(source_lines)
+        if source_lines:
+            requests.append((
+                "short",
+                _build_chat_request(
+                    provider,
+                    model_name,
+                    SUMMARY_SYSTEM_PROMPT,
+                    _build_summary_user_msg(source_lines, total_lines),
+                ),
+            ))
+
+    if summary_mode in {"detailed", "both"}:
+        chunks = _split_lines_into_chunks(_collect_segment_text_lines(segments))
+        job["detailed_chunks"] = len(chunks)
+        job["duration_seconds"] = _estimate_audio_duration_seconds(segments)
+        for idx, chunk_lines in enumerate(chunks):
+            requests.append((
+                f"detailed-{idx}",
+                _build_chat_request(
+                    provider,
+                    model_name,
+                    DETAILED_SUMMARY_CHUNK_SYSTEM_PROMPT,
+                    _build_detailed_chunk_user_msg(idx, len(chunks), chunk_lines),
+                ),
+            ))
+
+    if requests:
+        job["batch_id"] = _submit_chat_batch(client, requests)
+        print(f"[Step 3.5] 已提交 Batch API 总结任务: {job['batch_id']}（{len(requests)} 个请求）")
+    return job
+
+
+def collect_summary_batch(
+    job: dict,
+    poll_interval: float = BATCH_API_POLL_INTERVAL_SECONDS,
+) -> dict[str, str]:
+    """Wait for a job from submit_summary_batch(); return {"short": ..., "detailed": ...}."""
+    provider = job["provider"]
+    model_name = job["model_name"]
+    client, _ = _build_translate_client(provider)
+
+    replies: dict[str, str] = {}
+    if job["batch_id"]:
+        print(f"[Step 3.5] 等待 Batch API 总结任务完成: {job['batch_id']}")
+        replies = _wait_chat_batch(client, job["batch_id"], poll_interval)
+
+    results: dict[str, str] = {}
+    if "short" in job:
+        if not job["short"]:
+            results["short"] = "（无可总结内容）"
+        else:
+            results["short"] = replies.get("short") or "（总结生成失败：模型未返回内容）"
+
+    if "detailed_chunks" in job:
+        total_chunks = job["detailed_chunks"]
+        if total_chunks == 0:
+            results["detailed"] = "（无可总结内容）"
+        else:
+            chunk_summaries = [
+                replies.get(f"detailed-{idx}") or "（该分块未返回可用摘要）"
+                for idx in range(total_chunks)
+            ]
+            results["detailed"] = _finish_detailed_summary(
+                client, provider, model_name, chunk_summaries, job["duration_seconds"]
+            )
+    return results
@@ -0,0 +1,113 @@
+"""TTS 片段缓存：按内容哈希复用已合成的音频片段."""
+
+import hashlib
+import json
+import os
+import shutil
+
+CACHE_DIRNAME = ".cache"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FLUSH_EVERY = 50  # stored clips between manifest rewrites
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(data: dict, path: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class TTSClipCache:
+    """Content-addressed cache of synthesized clips under ``work_dir/.cache/tts``.
+
+    Each clip is keyed by the TTS backend, the reference audio content and the
+    text to speak. The whole cache is dropped when the source audio changes.
+    The manifest is rewritten every ``MANIFEST_FLUSH_EVERY`` stores and on
+    ``flush()``; clips stored after the last write are still found by their
+    content-hashed file names.
+    """
+
+    def __init__(self, work_dir: str, source_sha256: str):
+        self.cache_dir = os.path.join(work_dir, CACHE_DIRNAME, "tts")
+        self.manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        self.source_sha256 = source_sha256
+        self._ref_hashes: dict[str, str] = {}
+        self.clips: dict[str, str] = {}
+        self._unsaved = 0
+
+        manifest = self._load_manifest()
+        if manifest.get("source_sha256") == source_sha256:
+            clips = manifest.get("clips")
+            if isinstance(clips, dict):
+                self.clips = clips
+        else:
+            if manifest:
+                print("[Step 4] 源音频已变化，清空 TTS 片段缓存")
+            # Clip files outlive the manifest entries, so they must be dropped too.
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Record the source up front: unflushed clips belong to it.
+            _write_json_atomic(
+                {"source_sha256": source_sha256, "clips": {}}, self.manifest_path
+            )
+
+    def _load_manifest(self) -> dict:
+        if not os.path.isfile(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as exc:
+            print(f"[Step 4] 警告: 读取缓存清单失败，重建缓存: {exc}")
+            return {"source_sha256": None}
+        return data if isinstance(data, dict) else {"source_sha256": None}
+
+    def key(self, backend: str, ref_path: str | None, text: str) -> str:
+        ref_hash = ""
+        if ref_path and os.path.isfile(ref_path):
+            if ref_path not in self._ref_hashes:
+                self._ref_hashes[ref_path] = file_sha256(ref_path)
+            ref_hash = self._ref_hashes[ref_path]
+        payload = json.dumps(
+            {"backend": backend, "ref": ref_hash, "text": text},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def fetch(self, key: str, out_path: str) -> bool:
+        """Copy a cached clip to out_path. Returns False on a cache miss."""
+        rel_path = self.clips.get(key, f"{key}.wav")
+        cached_path = os.path.join(self.cache_dir, rel_path)
+        if not os.path.isfile(cached_path):
+            return False
+        if os.path.abspath(cached_path) != os.path.abspath(out_path):
+            shutil.copyfile(cached_path, out_path)
+        return True
+
+    def store(self, key: str, wav_path: str) -> None:
+        rel_path = f"{key}.wav"
+        shutil.copyfile(wav_path, os.path.join(self.cache_dir, rel_path))
+        self.clips[key] = rel_path
+        self._unsaved += 1
+        if self._unsaved >= MANIFEST_FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the manifest if clips were stored since the last write."""
+        if not self._unsaved:
+            return
+        _write_json_atomic(
+            {"source_sha256": self.source_sha256, "clips": self.clips},
+            self.manifest_path,
+        )
+        self._unsaved = 0
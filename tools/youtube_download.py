@@ -1,10 +1,19 @@
 """YouTube 下载工具：输入链接，输出 MP3 文件路径。"""
 
+import functools
 import importlib
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
+CONCURRENT_FRAGMENTS = 8  # fragments fetched in parallel per download
+HTTP_CHUNK_SIZE = 10 * 1024 * 1024  # ranged requests sidestep per-connection throttling
+MAX_DOWNLOAD_WORKERS = 4  # concurrent URLs in download_youtube_mp3_many
+FILENAME_TEMPLATE = "%(title)s.%(ext)s"
+# Concurrent downloads share one directory; the video id keeps equal titles apart.
+UNIQUE_FILENAME_TEMPLATE = "%(title)s [%(id)s].%(ext)s"
+
 
 def is_youtube_url(url: str) -> bool:
     """Check whether the given string is a YouTube URL."""
@@ -19,22 +28,37 @@ def is_youtube_url(url: str) -> bool:
     return host == "youtu.be" or host == "youtube.com" or host.endswith(".youtube.com")
 
 
+@functools.cache
+def _find_ffmpeg() -> str | None:
+    return shutil.which("ffmpeg")
+
+
+@functools.cache
+def _load_yt_dlp():
+    """Import yt_dlp on first use; babel.py imports this module for every input."""
+    try:
+        return importlib.import_module("yt_dlp")
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("未安装 yt-dlp。请先执行: pip install yt-dlp") from exc
+
+
 def download_youtube_mp3(
     youtube_url: str,
     output_dir: str | None = None,
     output_path: str | None = None,
+    filename_template: str = FILENAME_TEMPLATE,
 ) -> str:
-    """Download audio from a YouTube URL and convert it to MP3."""
+    """Download audio from a YouTube URL and convert it to MP3.
+
+    filename_template is the yt-dlp output template used inside output_dir.
+    """
     if not is_youtube_url(youtube_url):
         raise ValueError(f"无效的 YouTube 链接: {youtube_url}")
 
-    if shutil.which("ffmpeg") is None:
+    if _find_ffmpeg() is None:
         raise RuntimeError("未找到 ffmpeg，无法转换为 MP3。请先安装 ffmpeg 并加入 PATH。")
 
-    try:
-        yt_dlp = importlib.import_module("yt_dlp")
-    except ModuleNotFoundError as exc:
-        raise RuntimeError("未安装 yt-dlp。请先执行: pip install yt-dlp") from exc
+    yt_dlp = _load_yt_dlp()
 
     if output_path:
         target_path = Path(output_path).expanduser().resolve()
@@ -50,7 +74,7 @@ def download_youtube_mp3(
     ydl_opts = {
         "format": "bestaudio/best",
         "noplaylist": True,
-        "outtmpl": str(base_dir / "%(title)s.%(ext)s"),
+        "outtmpl": str(base_dir / filename_template),
         "postprocessors": [
             {
                 "key": "FFmpegExtractAudio",
@@ -58,6 +82,8 @@ def download_youtube_mp3(
                 "preferredquality": "192",
             }
         ],
+        "concurrent_fragment_downloads": CONCURRENT_FRAGMENTS,
+        "http_chunk_size": HTTP_CHUNK_SIZE,
         "quiet": True,
         "no_warnings": True,
     }
@@ -74,3 +100,35 @@ def download_youtube_mp3(
         downloaded_path = target_path
 
     return str(downloaded_path)
+
+
+def download_youtube_mp3_many(urls: list[str], output_dir: str | None = None) -> list[str]:
+    """Download several YouTube URLs into output_dir; returns MP3 paths in input order.
+
+    Downloads are network-bound, so up to MAX_DOWNLOAD_WORKERS run at once.
+    Repeated URLs are downloaded once. File names carry the video id so
+    same-titled videos do not overwrite each other.
+    """
+    for url in urls:
+        if not is_youtube_url(url):
+            raise ValueError(f"无效的 YouTube 链接: {url}")
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return []
+
+    workers = min(MAX_DOWNLOAD_WORKERS, len(unique_urls))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        paths = dict(
+            zip(
+                unique_urls,
+                executor.map(
+                    lambda url: download_youtube_mp3(
+                        url,
+                        output_dir=output_dir,
+                        filename_template=UNIQUE_FILENAME_TEMPLATE,
+                    ),
+                    unique_urls,
+                ),
+            )
+        )
+    return [paths[url] for url in urls]